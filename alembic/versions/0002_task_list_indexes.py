@@ -0,0 +1,39 @@
+"""Composite indexes for the task filter/sort hot paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+
+Every task list query filters on status and/or user_id and orders by (due_date, id). Without these
+indexes each call is a sequential scan plus a top-N sort over the whole table. The indexes are built
+CONCURRENTLY so the migration does not block writes on a large, live tasks table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_tasks_due_date_id": ["due_date", "id"],
+    "ix_tasks_user_id_due_date_id": ["user_id", "due_date", "id"],
+    "ix_tasks_status_due_date_id": ["status", "due_date", "id"],
+}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(name, "tasks", columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name="tasks", postgresql_concurrently=True, if_exists=True)
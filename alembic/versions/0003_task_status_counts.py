@@ -0,0 +1,92 @@
+"""Trigger-maintained task counts by status
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:15:00
+
+GET /api/tasks/summary/ used to run GROUP BY status over the whole tasks table. task_status_counts holds
+one row per status, kept current by statement-level triggers on tasks, and is backfilled here. Run
+`python -m eventual_backend.commands.reconcile_task_counts` to verify the counters against a recount.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+APPLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_status_counts_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO task_status_counts AS c (status, count)
+        SELECT status, count(*) FROM new_rows GROUP BY status ORDER BY status
+        ON CONFLICT (status) DO UPDATE SET count = c.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO task_status_counts AS c (status, count)
+        SELECT status, -count(*) FROM old_rows GROUP BY status ORDER BY status
+        ON CONFLICT (status) DO UPDATE SET count = c.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO task_status_counts AS c (status, count)
+        SELECT status, sum(delta) FROM (
+            SELECT status, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT status, 1 AS delta FROM new_rows
+        ) AS changes
+        GROUP BY status HAVING sum(delta) <> 0 ORDER BY status
+        ON CONFLICT (status) DO UPDATE SET count = c.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = [
+    "CREATE TRIGGER tasks_status_counts_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+    "CREATE TRIGGER tasks_status_counts_update AFTER UPDATE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+    "CREATE TRIGGER tasks_status_counts_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+]
+
+BACKFILL = """
+INSERT INTO task_status_counts (status, count)
+SELECT s.status, count(t.id)
+FROM unnest(enum_range(NULL::taskstatus)) AS s(status)
+LEFT JOIN tasks AS t ON t.status = s.status
+GROUP BY s.status
+ON CONFLICT (status) DO UPDATE SET count = EXCLUDED.count
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_status_counts",
+        sa.Column(
+            "status",
+            postgresql.ENUM("PENDING", "IN_PROGRESS", "DONE", name="taskstatus", create_type=False),
+            primary_key=True,
+        ),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+    )
+    op.execute(APPLY_FUNCTION)
+    # Block task writes while the triggers are installed and the counters seeded, so none are missed
+    op.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+    for statement in TRIGGERS:
+        op.execute(statement)
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    for operation in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS tasks_status_counts_{operation} ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_status_counts_apply()")
+    op.drop_table("task_status_counts")
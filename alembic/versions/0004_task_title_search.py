@@ -0,0 +1,60 @@
+"""Full-text and trigram indexes for task title search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:00:00
+
+GET /api/tasks/search matches titles through tasks.title_search, a stored to_tsvector('simple', title)
+column with a GIN index. Adding the generated column rewrites tasks under an exclusive lock (a few seconds
+per million rows); the indexes are then built CONCURRENTLY. The pg_trgm trigram index behind mode=fuzzy is
+only created when the extension is available on the server.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tasks",
+        sa.Column("title_search", postgresql.TSVECTOR(), sa.Computed("to_tsvector('simple', title)", persisted=True)),
+    )
+    trigram = op.get_bind().execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar()
+    if trigram:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_title_search",
+            "tasks",
+            ["title_search"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        if trigram:
+            op.create_index(
+                "ix_tasks_title_trgm",
+                "tasks",
+                ["title"],
+                postgresql_using="gin",
+                postgresql_ops={"title": "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in ("ix_tasks_title_trgm", "ix_tasks_title_search"):
+            op.drop_index(name, table_name="tasks", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("tasks", "title_search")
@@ -0,0 +1,40 @@
+"""Partial due date index over unfinished tasks
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:00:00
+
+GET /api/tasks/?overdue=true asks for unfinished tasks due before now. On ix_tasks_due_date_id that range starts
+with the oldest tasks, nearly all of them long done, and every one is read and discarded before the first open
+task turns up. ix_tasks_open_due_date_id holds only tasks whose status is not DONE, so the scan touches matches
+alone and the index stays small as the finished history grows.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_open_due_date_id",
+            "tasks",
+            ["due_date", "id"],
+            postgresql_where=sa.text("status <> 'DONE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_tasks_open_due_date_id", table_name="tasks", postgresql_concurrently=True, if_exists=True)
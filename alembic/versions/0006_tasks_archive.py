@@ -0,0 +1,87 @@
+"""Archive table for done tasks
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 13:00:00
+
+Done tasks older than TASK_ARCHIVE_AFTER_DAYS move from tasks to tasks_archive
+(python -m eventual_backend.commands.archive_tasks), keeping the hot table and its indexes small.
+ix_tasks_done_updated_at, a partial index over done tasks, lets each batch find its candidates without scanning
+tasks. Archive inserts and deletes feed task_status_counts through the existing trigger function, so the
+summary keeps counting archived tasks.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = [
+    "CREATE TRIGGER tasks_archive_status_counts_insert AFTER INSERT ON tasks_archive "
+    "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+    "CREATE TRIGGER tasks_archive_status_counts_delete AFTER DELETE ON tasks_archive "
+    "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+]
+
+# Downgrading moves archived tasks back so nothing is lost; the counters see a delete and an insert, so they
+# net out. Idempotency keys reused by a live task since archival are dropped from the restored row.
+RESTORE = """
+WITH moved AS (
+    DELETE FROM tasks_archive
+    RETURNING id, title, status, due_date, idempotency_key, user_id, created_at, updated_at
+)
+INSERT INTO tasks (id, title, status, due_date, idempotency_key, user_id, created_at, updated_at)
+SELECT m.id, m.title, m.status, m.due_date,
+       CASE WHEN EXISTS (SELECT 1 FROM tasks t WHERE t.idempotency_key = m.idempotency_key)
+            THEN NULL ELSE m.idempotency_key END,
+       m.user_id, m.created_at, m.updated_at
+FROM moved AS m
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tasks_archive",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM("PENDING", "IN_PROGRESS", "DONE", name="taskstatus", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("due_date", sa.DateTime(), nullable=False),
+        sa.Column("idempotency_key", sa.String(), nullable=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_tasks_archive_due_date_id", "tasks_archive", ["due_date", "id"])
+    op.create_index("ix_tasks_archive_user_id_due_date_id", "tasks_archive", ["user_id", "due_date", "id"])
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_done_updated_at",
+            "tasks",
+            ["updated_at"],
+            postgresql_where=sa.text("status = 'DONE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.execute(RESTORE)
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_tasks_done_updated_at", table_name="tasks", postgresql_concurrently=True, if_exists=True)
+    op.drop_table("tasks_archive")
@@ -0,0 +1,68 @@
+"""NOTIFY task_changes on task writes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 15:00:00
+
+Feeds GET /api/tasks/stream: statement-level triggers on tasks send the ids, owners and statuses of changed
+rows on the task_changes channel, 50 rows per notification, and each API worker's listener fetches the rows
+and fans them out to its SSE subscribers. Notifications are delivered on commit only, so subscribers never see
+rolled-back changes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_notify_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM pg_notify('task_changes', json_agg(item)::text) FROM (
+            SELECT json_build_array('insert', id, user_id, status) AS item, (row_number() OVER () - 1) / 50 AS part
+            FROM new_rows
+        ) AS items GROUP BY part;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('task_changes', json_agg(item)::text) FROM (
+            SELECT json_build_array('delete', id, user_id, status) AS item, (row_number() OVER () - 1) / 50 AS part
+            FROM old_rows
+        ) AS items GROUP BY part;
+    ELSE
+        PERFORM pg_notify('task_changes', json_agg(item)::text) FROM (
+            SELECT json_build_array('update', n.id, n.user_id, n.status, o.status, o.user_id) AS item,
+                   (row_number() OVER () - 1) / 50 AS part
+            FROM new_rows AS n JOIN old_rows AS o USING (id)
+        ) AS items GROUP BY part;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = [
+    "CREATE TRIGGER tasks_notify_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_changes()",
+    "CREATE TRIGGER tasks_notify_update AFTER UPDATE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_changes()",
+    "CREATE TRIGGER tasks_notify_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_changes()",
+]
+
+
+def upgrade() -> None:
+    op.execute(NOTIFY_FUNCTION)
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for operation in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS tasks_notify_{operation} ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS tasks_notify_changes()")
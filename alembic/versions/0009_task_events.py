@@ -0,0 +1,94 @@
+"""Append-only task event log
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 16:00:00
+
+task_events records every change to tasks, written by statement-level triggers in the writing transaction,
+and backs GET /api/tasks/{id}/events and `python -m eventual_backend.commands.replay_task_events`. Existing
+tasks are backfilled as created, and archived ones as created then archived, so a replay of the log rebuilds
+the current tables. Task writes are blocked while that runs.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+APPEND_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_events_append() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO task_events (task_id, type, data)
+        SELECT n.id, 'CREATED', to_jsonb(n) - 'title_search' FROM new_rows AS n;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO task_events (task_id, type, data)
+        SELECT o.id,
+               CASE WHEN EXISTS (SELECT 1 FROM tasks_archive AS a WHERE a.id = o.id) THEN 'ARCHIVED'
+                    ELSE 'DELETED' END::taskeventtype,
+               to_jsonb(o) - 'title_search'
+        FROM old_rows AS o;
+    ELSE
+        INSERT INTO task_events (task_id, type, data)
+        SELECT n.id, 'UPDATED', to_jsonb(n) - 'title_search'
+        FROM new_rows AS n JOIN old_rows AS o USING (id)
+        WHERE n IS DISTINCT FROM o;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = [
+    "CREATE TRIGGER tasks_events_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_events_append()",
+    "CREATE TRIGGER tasks_events_update AFTER UPDATE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_events_append()",
+    "CREATE TRIGGER tasks_events_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_events_append()",
+]
+
+BACKFILL = [
+    "INSERT INTO task_events (task_id, type, data) "
+    "SELECT id, 'CREATED', to_jsonb(tasks) - 'title_search' FROM tasks ORDER BY created_at, id",
+    "INSERT INTO task_events (task_id, type, data) "
+    "SELECT id, 'CREATED', to_jsonb(tasks_archive) - 'archived_at' FROM tasks_archive ORDER BY created_at, id",
+    "INSERT INTO task_events (task_id, type, data, created_at) "
+    "SELECT id, 'ARCHIVED', to_jsonb(tasks_archive) - 'archived_at', archived_at FROM tasks_archive "
+    "ORDER BY archived_at, id",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column("task_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("type", sa.Enum("CREATED", "UPDATED", "DELETED", "ARCHIVED", name="taskeventtype"), nullable=False),
+        sa.Column("data", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_task_events_task_id_id", "task_events", ["task_id", "id"])
+    op.execute(APPEND_FUNCTION)
+    # Block task writes while the triggers are installed and the log backfilled, so none are missed
+    op.execute("LOCK TABLE tasks, tasks_archive IN SHARE ROW EXCLUSIVE MODE")
+    for statement in TRIGGERS:
+        op.execute(statement)
+    for statement in BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for operation in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS tasks_events_{operation} ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_events_append()")
+    op.drop_table("task_events")
+    sa.Enum(name="taskeventtype").drop(op.get_bind(), checkfirst=True)
@@ -1,14 +1,24 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from eventual_backend.core.database import get_db
+from eventual_backend.core.database import get_db, get_db_read
+from eventual_backend.services.task_event_service import TaskEventService
 from eventual_backend.services.user_service import UserService
 from eventual_backend.services.task_service import TaskService
 
 
-def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
-    return UserService(db)
+# Sessions connect lazily, so the read session costs nothing on requests that only write
 
 
-def get_task_service(db: AsyncSession = Depends(get_db)) -> TaskService:
-    return TaskService(db)
+def get_user_service(db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_db_read)) -> UserService:
+    return UserService(db, read_db)
+
+
+def get_task_service(db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_db_read)) -> TaskService:
+    return TaskService(db, read_db)
+
+
+def get_task_event_service(
+    db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_db_read)
+) -> TaskEventService:
+    return TaskEventService(db, read_db)
@@ -0,0 +1,72 @@
+"""
+Move done tasks older than TASK_ARCHIVE_AFTER_DAYS from tasks to tasks_archive, in short batched transactions.
+
+    python -m eventual_backend.commands.archive_tasks
+    python -m eventual_backend.commands.archive_tasks --older-than-days 90 --batch-size 500 --max-batches 100
+    python -m eventual_backend.commands.archive_tasks --enqueue  # hand the run to the API's job workers
+
+Safe to run from cron alongside the API, or from several processes at once: each batch locks only the rows it
+moves and skips rows locked by anyone else.
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import timedelta
+
+from eventual_backend.core.database import AsyncSessionLocal, engine
+from eventual_backend.services.job_service import JobService
+from eventual_backend.services.task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+
+async def archive(
+    older_than: timedelta | None = None, batch_size: int | None = None, max_batches: int | None = None
+) -> int:
+    async with AsyncSessionLocal() as session:
+        return await TaskService(session).archive_done_tasks(
+            older_than=older_than, batch_size=batch_size, max_batches=max_batches
+        )
+
+
+async def archive_periodically(interval: float) -> None:
+    """Archive every interval seconds until cancelled; started by the app lifespan when
+    TASK_ARCHIVE_INTERVAL_SECONDS is set"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            moved = await archive()
+        except Exception:
+            logger.exception("Task archival failed")
+        else:
+            if moved:
+                logger.info("Archived %d done tasks", moved)
+
+
+async def run(args) -> int:
+    if args.enqueue:
+        payload = {"older_than_days": args.older_than_days, "batch_size": args.batch_size}
+        async with AsyncSessionLocal() as session:
+            job = await JobService(session).enqueue("archive_done_tasks", payload)
+        await engine.dispose()
+        print(f"Enqueued job {job.id}")
+        return 0
+    older_than = timedelta(days=args.older_than_days) if args.older_than_days is not None else None
+    moved = await archive(older_than, args.batch_size, args.max_batches)
+    await engine.dispose()
+    print(f"Archived {moved} done tasks")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=float, help="default: TASK_ARCHIVE_AFTER_DAYS")
+    parser.add_argument("--batch-size", type=int, help="tasks per transaction, default: TASK_ARCHIVE_BATCH_SIZE")
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    parser.add_argument("--enqueue", action="store_true", help="enqueue an archival job instead of running it")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
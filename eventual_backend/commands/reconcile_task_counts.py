@@ -0,0 +1,40 @@
+"""
+Recompute task counts by status and report drift from the maintained task_status_counts table.
+
+    python -m eventual_backend.commands.reconcile_task_counts        # report only, exit 1 on drift
+    python -m eventual_backend.commands.reconcile_task_counts --fix  # overwrite drifted counters
+"""
+
+import argparse
+import asyncio
+import sys
+
+from eventual_backend.core.database import AsyncSessionLocal, engine
+from eventual_backend.services.task_service import TaskService
+
+
+async def reconcile(fix: bool) -> int:
+    async with AsyncSessionLocal() as session:
+        drift = await TaskService(session).reconcile_task_summary(fix=fix)
+    await engine.dispose()
+
+    if not drift:
+        print("Task status counters are consistent")
+        return 0
+    for status, (counted, actual) in drift.items():
+        print(f"{status}: counter={counted} actual={actual} drift={counted - actual:+d}")
+    if fix:
+        print("Counters corrected")
+        return 0
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted counters with the recomputed counts")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(reconcile(args.fix)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+from eventual_backend.core.config import settings
+from eventual_backend.core.metrics import ADMISSION_REQUESTS, ADMISSION_WAIT
+
+# Outcomes of admission, the label values of http_admission_requests_total
+SERVED = "served"
+RATE_LIMITED = "rate_limited"
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+OUTCOMES = (SERVED, RATE_LIMITED, QUEUE_FULL, QUEUE_TIMEOUT)
+
+# Never limited: probes and scrapes must get through when the API is overloaded
+EXEMPT_PATHS = ("/health", "/metrics")
+# Rate limited but not counted against the cap: event streams stay open for hours without holding a pooled
+# connection (the task feed has its own)
+UNCOUNTED_PATHS = (f"{settings.API_V1_STR}/tasks/stream",)
+
+
+class TokenBuckets:
+    """Per-client token buckets: a client may send `burst` requests at once, refilled at `rate` per second.
+
+    Buckets are kept for the max_clients most recently seen clients; an evicted client comes back with a full
+    bucket, which errs on the side of admitting.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # client key -> (tokens, when they were counted)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str) -> float:
+        """Take a token from key's bucket; returns 0 if there was one, else the seconds until there will be"""
+        now = time.monotonic()
+        tokens, counted_at = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - counted_at) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionControl:
+    """Caps the requests in flight at max_in_flight (None: no cap), queueing up to queue_size more in arrival
+    order for at most queue_timeout seconds each, and rate limits clients through buckets (None: no limit).
+
+    A released slot is handed straight to the oldest waiter, so a burst cannot overtake requests already queued.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int],
+        queue_size: int = 256,
+        queue_timeout: float = 5.0,
+        retry_after: int = 1,
+        buckets: Optional[TokenBuckets] = None,
+        client_header: str = "",
+    ):
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.buckets = buckets
+        self.client_header = client_header.lower().encode("latin-1")
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.outcomes = {outcome: 0 for outcome in OUTCOMES}
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight or 0,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "rate_limited_clients": len(self.buckets) if self.buckets is not None else 0,
+        }
+
+    def record(self, outcome: str) -> None:
+        self.outcomes[outcome] += 1
+        ADMISSION_REQUESTS.inc(outcome)
+
+    def client_key(self, scope) -> str:
+        if self.client_header:
+            for name, value in scope["headers"]:
+                if name == self.client_header:
+                    # The client end of X-Forwarded-For; other headers (API keys) are used whole
+                    return value.decode("latin-1").split(",", 1)[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def rate_limit_wait(self, scope) -> float:
+        """0 if the client may proceed, else the seconds until it may"""
+        if self.buckets is None:
+            return 0.0
+        return self.buckets.take(self.client_key(scope))
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot, waiting in the queue if none is free; returns None once admitted, or the outcome to shed
+        the request with"""
+        if self.max_in_flight is None:
+            self.in_flight += 1
+            return None
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return QUEUE_FULL
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot as we gave up (timeout or client gone): pass it on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                return QUEUE_TIMEOUT
+            raise
+        return None
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot moves to the waiter; in_flight stays the same
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+def create_admission_control() -> AdmissionControl:
+    max_in_flight = settings.ADMISSION_MAX_IN_FLIGHT or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    buckets = None
+    if settings.RATE_LIMIT_PER_SECOND > 0:
+        buckets = TokenBuckets(
+            settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST, settings.RATE_LIMIT_MAX_CLIENTS
+        )
+    return AdmissionControl(
+        max_in_flight if max_in_flight > 0 else None,
+        queue_size=settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        buckets=buckets,
+        client_header=settings.RATE_LIMIT_CLIENT_HEADER,
+    )
+
+
+_admission: Optional[AdmissionControl] = None
+
+
+def get_admission_control() -> AdmissionControl:
+    """The process-wide admission control configured by the ADMISSION_* and RATE_LIMIT_* settings"""
+    global _admission
+    if _admission is None:
+        _admission = create_admission_control()
+    return _admission
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware admitting requests before they reach a route, and so before they check out a pooled
+    connection: over-rate clients get a 429, and requests finding the cap reached and the queue full, or still
+    queued after the timeout, get a 503, both with Retry-After and without touching the database.
+
+    A request holds its slot until its response, streamed bodies included, has been sent.
+    """
+
+    def __init__(self, app, control: Optional[AdmissionControl] = None):
+        self.app = app
+        self.control = control if control is not None else get_admission_control()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+        control = self.control
+
+        wait = control.rate_limit_wait(scope)
+        if wait:
+            control.record(RATE_LIMITED)
+            await _reject(send, 429, "Rate limit exceeded", wait)
+            return
+        if scope["path"].startswith(UNCOUNTED_PATHS):
+            control.record(SERVED)
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        shed = await control.acquire()
+        if shed is not None:
+            control.record(shed)
+            await _reject(send, 503, "Server is busy, retry later", control.retry_after)
+            return
+        ADMISSION_WAIT.observe(time.perf_counter() - start)
+        control.record(SERVED)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            control.release()
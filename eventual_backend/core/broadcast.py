@@ -0,0 +1,114 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable
+from typing import Any, Optional
+
+# Comment line sent on idle Server-Sent Events streams so proxies and clients keep the connection open
+SSE_HEARTBEAT = b": keepalive\n\n"
+
+
+def sse_message(data: bytes, event: Optional[str] = None) -> bytes:
+    """Frame one Server-Sent Events message; data must not contain newlines (compact JSON does not)"""
+    if event is None:
+        return b"data: " + data + b"\n\n"
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class Subscription:
+    """A subscriber's bounded queue of pre-rendered messages; see Broadcaster"""
+
+    def __init__(self, broadcaster: "Broadcaster", key: Hashable, predicate: Optional[Callable[[Any], bool]]):
+        self.broadcaster = broadcaster
+        self.key = key
+        self.predicate = predicate
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(broadcaster.maxsize)
+        self.closed = False
+
+    def _close(self, final: Optional[bytes]) -> None:
+        self.closed = True
+        if final is not None:
+            # Whatever the subscriber has not read yet is superseded by the final message
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(final)
+
+    async def sse_stream(self, heartbeat: float, retry_ms: int) -> AsyncIterator[bytes]:
+        """Messages as a Server-Sent Events body, with a comment line after heartbeat idle seconds. Ends after
+        the final message when the subscription is closed, and unsubscribes when the client goes away."""
+        try:
+            yield f"retry: {retry_ms}\n\n".encode()
+            while True:
+                try:
+                    message = await asyncio.wait_for(self.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield SSE_HEARTBEAT
+                    continue
+                yield message
+                if self.closed and self.queue.empty():
+                    return
+        finally:
+            self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """In-process fan-out of messages to many subscribers, where publishing never waits on a slow subscriber.
+
+    Subscribers are indexed by key (e.g. a user id, None for everything) so a message only visits the
+    subscribers of its keys, and may add a predicate on the published event. Messages are rendered once by the
+    publisher and shared. Each subscriber has a queue of maxsize messages; one that falls that far behind is
+    dropped with the overflow message as its last, so it knows to resynchronise rather than silently miss
+    messages, and its backlog is freed.
+    """
+
+    def __init__(self, maxsize: int = 256, overflow: Optional[bytes] = None):
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._subscribers: dict[Hashable, set[Subscription]] = defaultdict(set)
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0}
+
+    def __len__(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def subscribe(self, key: Hashable = None, predicate: Optional[Callable[[Any], bool]] = None) -> Subscription:
+        subscription = Subscription(self, key, predicate)
+        self._subscribers[key].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.key)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.key]
+
+    def publish(self, message: bytes, keys: Iterable[Hashable] = (), event: Any = None) -> int:
+        """Queue message for the subscribers of keys and of None whose predicate accepts event; returns how
+        many got it"""
+        delivered = 0
+        overflowed = []
+        for key in {None, *keys}:
+            for subscription in self._subscribers.get(key, ()):
+                if subscription.predicate is not None and not subscription.predicate(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    overflowed.append(subscription)
+                else:
+                    delivered += 1
+        for subscription in overflowed:
+            self.drop(subscription, self.overflow)
+        self.stats["published"] += 1
+        self.stats["delivered"] += delivered
+        return delivered
+
+    def drop(self, subscription: Subscription, final: Optional[bytes] = None) -> None:
+        """Unsubscribe and close a subscription, with final as the last message it reads"""
+        self.unsubscribe(subscription)
+        subscription._close(final)
+        self.stats["dropped"] += 1
+
+    def drop_all(self, final: Optional[bytes] = None) -> None:
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                self.drop(subscription, final)
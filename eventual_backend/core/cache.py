@@ -0,0 +1,208 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from eventual_backend.core.config import settings
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+class CacheBackend(ABC):
+    """Async key-value cache for JSON-serializable dicts; subclasses implement clear and the _get/_set/_delete hooks"""
+
+    name = "base"
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = await self._get(key)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        self.stats.sets += 1
+        await self._set(key, value)
+
+    async def delete(self, key: str) -> None:
+        self.stats.invalidations += 1
+        await self._delete(key)
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def _set(self, key: str, value: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def _delete(self, key: str) -> None:
+        ...
+
+
+class NullCache(CacheBackend):
+    """Caching disabled: every lookup misses"""
+
+    name = "none"
+
+    async def clear(self) -> None:
+        pass
+
+    async def _get(self, key: str) -> Optional[dict]:
+        return None
+
+    async def _set(self, key: str, value: dict) -> None:
+        pass
+
+    async def _delete(self, key: str) -> None:
+        pass
+
+
+class LRUCache(CacheBackend):
+    """In-process cache bounded to max_entries, evicting the least recently used entry, with a per-entry TTL.
+
+    Each worker process has its own copy, so writes made through another worker are only seen once the
+    entry expires; keep the TTL short or use the Redis backend when that matters.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 30.0):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    async def _get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _set(self, key: str, value: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by all workers, stored in any server speaking the Redis protocol.
+
+    `client` needs async get(key), set(key, value, ex=seconds) and delete(*keys), as provided by
+    redis.asyncio.Redis; use from_url() to build one from REDIS_URL.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, ttl: float = 30.0, prefix: str = "eventual:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl: float = 30.0) -> "RedisCache":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        return cls(redis_asyncio.from_url(url), ttl=ttl)
+
+    async def clear(self) -> None:
+        # Entries expire on their own; a shared cache is never flushed wholesale from one worker
+        pass
+
+    async def _get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def _set(self, key: str, value: dict) -> None:
+        await self.client.set(self.prefix + key, json.dumps(value, separators=(",", ":")), ex=max(1, round(self.ttl)))
+
+    async def _delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+
+def create_cache(backend: str, max_entries: int, ttl: float, redis_url: str) -> CacheBackend:
+    if backend == "memory":
+        return LRUCache(max_entries=max_entries, ttl=ttl)
+    if backend == "redis":
+        return RedisCache.from_url(redis_url, ttl=ttl)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown CACHE_BACKEND {backend!r}, expected 'memory', 'redis' or 'none'")
+
+
+_cache: Optional[CacheBackend] = None
+
+
+def get_cache() -> CacheBackend:
+    """The process-wide entity cache configured by the CACHE_* settings"""
+    global _cache
+    if _cache is None:
+        _cache = create_cache(
+            settings.CACHE_BACKEND, settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS, settings.REDIS_URL
+        )
+    return _cache
+
+
+_stats_cache: Optional[CacheBackend] = None
+
+
+def get_stats_cache() -> CacheBackend:
+    """The process-wide cache of aggregates configured by the STATS_CACHE_* settings.
+
+    Always in-process: aggregates are cheap to recompute in each worker, and a short TTL bounds how stale
+    they get without any invalidation on writes.
+    """
+    global _stats_cache
+    if _stats_cache is None:
+        if settings.STATS_CACHE_TTL_SECONDS > 0:
+            _stats_cache = LRUCache(max_entries=settings.STATS_CACHE_MAX_ENTRIES, ttl=settings.STATS_CACHE_TTL_SECONDS)
+        else:
+            _stats_cache = NullCache()
+    return _stats_cache
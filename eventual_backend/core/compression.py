@@ -0,0 +1,166 @@
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional, see the "speedups" extra in pyproject.toml
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, see the "speedups" extra in pyproject.toml
+    zstandard = None
+
+# Levels chosen for online compression: most of the size win for a fraction of the maximum-level CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+# Bodiless and partial-content responses are passed through untouched
+SKIP_STATUS_CODES = frozenset({204, 206, 304})
+
+# Event streams are passed through too: their messages are small and must reach the client one by one
+SKIP_MEDIA_TYPES = (b"text/event-stream",)
+
+
+class _GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+# Server preference when the client accepts several encodings with the same q-value
+ENCODERS = {
+    name: encoder
+    for name, encoder, available in (
+        ("zstd", _ZstdEncoder, zstandard is not None),
+        ("br", _BrotliEncoder, brotli is not None),
+        ("gzip", _GzipEncoder, True),
+    )
+    if available
+}
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best available content-coding for an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in ENCODERS:
+        q = weights.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing response bodies with zstd, br or gzip as negotiated via Accept-Encoding.
+
+    Complete bodies smaller than min_size go out uncompressed; streamed bodies (more_body) are compressed chunk
+    by chunk, flushing after each one so clients can decode rows as they arrive.
+    """
+
+    def __init__(self, app, min_size: int = 1024):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether the response is worth compressing
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is not None:
+                await send({**message, "body": encoder.chunk(body) if more_body else encoder.finish(body)})
+                return
+            if start_message is None:  # passing this response through uncompressed
+                await send(message)
+                return
+            start, start_message = start_message, None
+            headers = start["headers"]
+            skip = start["status"] in SKIP_STATUS_CODES or any(
+                name == b"content-encoding" or (name == b"content-type" and value.startswith(SKIP_MEDIA_TYPES))
+                for name, value in headers
+            )
+            if skip or (not more_body and len(body) < self.min_size):
+                await send(start)
+                await send(message)
+                return
+            encoder = ENCODERS[encoding]()
+            headers = [(name, value) for name, value in headers if name != b"content-length"]
+            headers.append((b"content-encoding", encoding.encode()))
+            headers.append((b"vary", b"Accept-Encoding"))
+            if more_body:
+                await send({**start, "headers": headers})
+                await send({**message, "body": encoder.chunk(body)})
+            else:
+                body = encoder.finish(body)
+                headers.append((b"content-length", str(len(body)).encode()))
+                await send({**start, "headers": headers})
+                await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
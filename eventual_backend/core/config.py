@@ -11,7 +11,91 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql+asyncpg://postgres@localhost/taskdb")
+    DB_ECHO: bool = False
+    # Comma-separated replica URLs for read-only queries (lists, summary, export); empty reads from the primary.
+    # Replicas failing a health check are skipped until they pass again.
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_HEALTH_CHECK_INTERVAL: float = 5.0
+
+    # Connection pool, per worker process: pool_size persistent connections plus up to max_overflow extra ones
+    # under load; checkouts wait up to DB_POOL_TIMEOUT seconds for a free slot before failing
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Prepared statements cached per connection; set to 0 behind a transaction-pooling pgbouncer
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Admission control: at most ADMISSION_MAX_IN_FLIGHT requests run at once (0: DB_POOL_SIZE + DB_MAX_OVERFLOW,
+    # so requests queue here rather than in the pool; negative: no cap). Up to ADMISSION_QUEUE_SIZE more wait
+    # ADMISSION_QUEUE_TIMEOUT_SECONDS for a slot; beyond that requests get a 503 with Retry-After at once
+    ADMISSION_MAX_IN_FLIGHT: int = 0
+    ADMISSION_QUEUE_SIZE: int = 256
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    # Per-client token buckets: RATE_LIMIT_PER_SECOND requests per second in bursts of up to RATE_LIMIT_BURST
+    # (0: no rate limit), clients keyed by the RATE_LIMIT_CLIENT_HEADER header (e.g. X-Forwarded-For behind a
+    # proxy) or else the peer address; buckets are kept for the RATE_LIMIT_MAX_CLIENTS most recent clients
+    RATE_LIMIT_PER_SECOND: float = 0.0
+    RATE_LIMIT_BURST: int = 20
+    RATE_LIMIT_CLIENT_HEADER: str = ""
+    RATE_LIMIT_MAX_CLIENTS: int = 10_000
     
+    # Bulk task creation: maximum items per request, and the batch size from which COPY replaces INSERT
+    TASK_BULK_MAX_ITEMS: int = 5000
+    TASK_BULK_COPY_THRESHOLD: int = 1000
+
+    # Maximum ids per GET /api/tasks/batch or /api/users/batch request
+    BATCH_GET_MAX_IDS: int = 100
+
+    # Rows fetched per server-side cursor batch when streaming GET /api/tasks/export
+    TASK_EXPORT_BATCH_SIZE: int = 1000
+
+    # Done tasks last updated more than TASK_ARCHIVE_AFTER_DAYS ago move to tasks_archive, TASK_ARCHIVE_BATCH_SIZE
+    # rows per transaction. With TASK_ARCHIVE_INTERVAL_SECONDS > 0 each app process runs archival on that
+    # interval; 0 leaves it to `python -m eventual_backend.commands.archive_tasks` (cron, make archive-tasks)
+    TASK_ARCHIVE_AFTER_DAYS: float = 30.0
+    TASK_ARCHIVE_BATCH_SIZE: int = 1000
+    TASK_ARCHIVE_INTERVAL_SECONDS: float = 0.0
+
+    # Events read per server-side cursor batch when replaying task_events
+    # (python -m eventual_backend.commands.replay_task_events)
+    TASK_REPLAY_BATCH_SIZE: int = 10_000
+
+    # GET /api/tasks/stream: each subscriber buffers up to TASK_STREAM_QUEUE_SIZE changes before it is cut off
+    # with a `resync` event, idle streams get a comment line every TASK_STREAM_HEARTBEAT_SECONDS, and
+    # notifications arriving within TASK_FEED_FLUSH_SECONDS share one query for the changed rows
+    TASK_STREAM_QUEUE_SIZE: int = 256
+    TASK_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    TASK_FEED_FLUSH_SECONDS: float = 0.05
+
+    # Background jobs (eventual_backend.workers), per app process: JOB_WORKERS concurrent workers (0 disables
+    # them), each holding a pool connection while it runs a job; idle workers poll every
+    # JOB_POLL_INTERVAL_SECONDS. Failed jobs retry after JOB_RETRY_BASE_SECONDS, doubling up to
+    # JOB_RETRY_MAX_SECONDS, until JOB_MAX_ATTEMPTS runs; a job still running after JOB_LEASE_SECONDS is
+    # presumed abandoned and claimed again. Shutdown waits JOB_DRAIN_TIMEOUT_SECONDS for jobs in flight.
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 2.0
+    JOB_RETRY_MAX_SECONDS: float = 600.0
+    JOB_LEASE_SECONDS: float = 300.0
+    JOB_DRAIN_TIMEOUT_SECONDS: float = 10.0
+
+    # Responses negotiated via Accept-Encoding (zstd, br, gzip) are compressed from this many bytes; streamed
+    # bodies are always compressed, except event streams
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    # Entity cache for lookups by id: "memory" (per-process LRU), "redis" (shared) or "none"
+    CACHE_BACKEND: str = "memory"
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_TTL_SECONDS: float = 30.0
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Per-user task statistics are cached in each process for this long, up to this many users; 0 disables
+    STATS_CACHE_TTL_SECONDS: float = 5.0
+    STATS_CACHE_MAX_ENTRIES: int = 1000
+
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
 
@@ -1,10 +1,155 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+import itertools
+import time
+from collections import deque
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from eventual_backend.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+class PoolStats:
+    """Checkout counters plus a rolling window of recent checkout times for percentiles"""
+
+    def __init__(self, window: int = 1024):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self.recent.append(seconds)
+
+    def as_dict(self) -> dict:
+        recent = sorted(self.recent)
+
+        def percentile(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3) if recent else 0.0
+
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_max * 1000, 3),
+            "wait_ms_p50": percentile(0.50),
+            "wait_ms_p95": percentile(0.95),
+            "wait_ms_p99": percentile(0.99),
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout takes, including waiting for a free slot,
+    opening new connections and pre-ping"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the counters across it
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def pool_status(pool: InstrumentedQueuePool) -> dict:
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **pool.stats.as_dict(),
+    }
+
+
+def create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # SQLAlchemy's prepared-statement cache and asyncpg's own; 0 disables both (needed behind pgbouncer)
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+
+class ReplicaRouter:
+    """Round-robins read sessions over the healthy replicas, falling back to the primary when none are"""
+
+    def __init__(self, urls: list[str], primary: sessionmaker, health_check_timeout: float = 2.0):
+        self.engines = [create_engine(url) for url in urls]
+        self.sessionmakers = [
+            sessionmaker(replica, class_=AsyncSession, expire_on_commit=False) for replica in self.engines
+        ]
+        # Replicas start out healthy so reads are routed before the first check completes
+        self.healthy = [True] * len(self.engines)
+        self.primary = primary
+        self.health_check_timeout = health_check_timeout
+        self._next = itertools.count()
+
+    def session_factory(self) -> sessionmaker:
+        healthy = [factory for factory, ok in zip(self.sessionmakers, self.healthy, strict=True) if ok]
+        if not healthy:
+            return self.primary
+        return healthy[next(self._next) % len(healthy)]
+
+    async def _ping(self, replica: AsyncEngine) -> bool:
+        try:
+            async with replica.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), self.health_check_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def check(self) -> None:
+        self.healthy = list(await asyncio.gather(*(self._ping(replica) for replica in self.engines)))
+
+    async def run_health_checks(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+    def status(self) -> list[dict]:
+        return [
+            {"url": replica.url.render_as_string(hide_password=True), "healthy": ok, "pool": pool_status(replica.pool)}
+            for replica, ok in zip(self.engines, self.healthy, strict=True)
+        ]
+
+
+engine = create_engine(settings.DATABASE_URL)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+replica_router = ReplicaRouter(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()], AsyncSessionLocal
+)
 
 Base = declarative_base()
 
@@ -15,3 +160,12 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+async def get_db_read() -> AsyncSession:
+    """Session for read-only queries that tolerate replication lag; a healthy replica when configured"""
+    async with replica_router.session_factory()() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
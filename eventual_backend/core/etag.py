@@ -0,0 +1,31 @@
+import hashlib
+from collections.abc import Iterable
+
+from fastapi import Response
+from fastapi import status
+
+ETAG_HEADER = "ETag"
+
+
+def version_etag(versions: Iterable) -> str:
+    """Weak ETag over (id, updated_at) pairs: changes whenever a row is updated, added or removed"""
+    digest = hashlib.blake2b(digest_size=12)
+    count = 0
+    for version in versions:
+        digest.update(f"{version.id}@{version.updated_at.isoformat() if version.updated_at else ''};".encode())
+        count += 1
+    return f'W/"{count}-{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header value against etag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str, headers: dict | None = None) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**(headers or {}), ETAG_HEADER: etag})
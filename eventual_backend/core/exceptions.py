@@ -0,0 +1,14 @@
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class UserNotFoundError(LookupError):
+    """Raised when a write references a user that does not exist."""
+
+
+class SearchUnavailableError(RuntimeError):
+    """Raised when a search mode needs a Postgres extension the database does not have."""
+
+
+class IdempotencyConflictError(RuntimeError):
+    """Raised when an idempotency key keeps colliding with a task that is deleted before it can be read."""
@@ -0,0 +1,189 @@
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in seconds; sized for API requests (1 ms to 10 s) and single statements (0.1 ms to 5 s)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+SQL_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _render_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition format; one bucket array per label set"""
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = REQUEST_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts, strict=True):
+                cumulative += count
+                labels = _render_labels(self.labels, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _render_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter in the Prometheus exposition format; one value per label set"""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.series: dict[tuple, int] = {}
+
+    def inc(self, *label_values, amount: int = 1) -> None:
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, count in self.series.items():
+            lines.append(f"{self.name}{_render_labels(self.labels, values)} {count}")
+        return lines
+
+
+def render_gauges(prefix: str, values: dict) -> list[str]:
+    lines = []
+    for key, value in values.items():
+        lines.extend([f"# TYPE {prefix}_{key} gauge", f"{prefix}_{key} {value}"])
+    return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Request duration by route template", ("method", "route", "status")
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("route",), QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = Histogram("http_request_db_duration_seconds", "Time spent in SQL per request", ("route",))
+QUERY_DURATION = Histogram("db_query_duration_seconds", "SQL statement duration", ("operation",), QUERY_BUCKETS)
+ADMISSION_REQUESTS = Counter(
+    "http_admission_requests_total", "Requests served or shed by admission control", ("outcome",)
+)
+ADMISSION_WAIT = Histogram("http_admission_wait_seconds", "Time admitted requests queued for a slot")
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request; SQLAlchemy runs the cursor hooks in a greenlet that
+# shares the request task's context, so the hooks can attribute statements to it
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+# The start time lives on the statement's execution context, which is discarded when the statement fails and
+# after_cursor_execute never runs; state kept on the connection would outlive it in the pool. Statements the
+# dialect runs without a context (connection setup) are not timed
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    words = statement[:16].split(None, 1)
+    operation = words[0].upper() if words else ""
+    QUERY_DURATION.observe(elapsed, operation if operation in SQL_OPERATIONS else "OTHER")
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each HTTP request, including streamed bodies, by route template and status.
+
+    Requests that match no route share the "unmatched" label so scanners cannot inflate the series count.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_DURATION.observe(elapsed, scope["method"], template, str(status_code))
+            REQUEST_QUERIES.observe(stats.queries, template)
+            REQUEST_DB_DURATION.observe(stats.db_seconds, template)
+
+
+def render_metrics(cache_stats: dict, pool_stats: dict, admission_stats: Optional[dict] = None) -> str:
+    lines = []
+    for metric in (
+        REQUEST_DURATION,
+        REQUEST_QUERIES,
+        REQUEST_DB_DURATION,
+        QUERY_DURATION,
+        ADMISSION_REQUESTS,
+        ADMISSION_WAIT,
+    ):
+        lines.extend(metric.render())
+    lines.extend(render_gauges("entity_cache", cache_stats))
+    lines.extend(render_gauges("db_pool", pool_stats))
+    if admission_stats:
+        lines.extend(render_gauges("admission", admission_stats))
+    return "\n".join(lines) + "\n"
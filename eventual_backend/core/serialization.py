@@ -0,0 +1,117 @@
+import enum
+import json
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra in pyproject.toml
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, see the "speedups" extra; without it every client gets JSON
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+MSGPACK_AVAILABLE = msgpack is not None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes, natively handling UUIDs, datetimes and enums; uses orjson when installed"""
+    if orjson is not None:
+        # asyncpg returns its own uuid.UUID subclass, which orjson only handles through `default`
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response for plain dicts/rows that skips FastAPI's response_model validation and jsonable_encoder.
+
+    Only return data that already matches the declared response model (e.g. rows selected with the
+    repository's response columns); the OpenAPI schema still comes from the route's response_model.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _msgpack_default(value: Any) -> Any:
+    # UUIDs as 16-byte bin and datetimes as the msgpack timestamp extension (naive values are UTC)
+    if isinstance(value, UUID):
+        return value.bytes
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return msgpack.Timestamp.from_datetime(value)
+        # Timestamp.from_datetime on naive values needs a tz-aware copy; the timedelta is about twice as fast
+        delta = value - _EPOCH
+        return msgpack.Timestamp(delta.days * 86400 + delta.seconds, delta.microseconds * 1000)
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def packb(content: Any) -> bytes:
+    """Serialize to MessagePack; requires the optional msgpack package"""
+    return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+def prefers_msgpack(accept: Optional[str]) -> bool:
+    """True when msgpack is installed and the Accept header ranks it at least as high as JSON.
+
+    Wildcards count towards JSON only, so MessagePack is sent to clients that explicitly ask for it.
+    """
+    if not MSGPACK_AVAILABLE or not accept:
+        return False
+    msgpack_q = json_q = 0.0
+    for item in accept.split(","):
+        media_type, _, params = item.partition(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            json_q = max(json_q, q)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+
+def negotiated_response(content: Any, accept: Optional[str], headers: Optional[dict] = None) -> Response:
+    """FastJSONResponse, or MsgPackResponse when the client's Accept header prefers it"""
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if prefers_msgpack(accept):
+        return MsgPackResponse(content, headers=headers)
+    return FastJSONResponse(content, headers=headers)
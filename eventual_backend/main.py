@@ -1,9 +1,19 @@
+import asyncio
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 
+from eventual_backend.commands.archive_tasks import archive_periodically
+from eventual_backend.core.admission import AdmissionMiddleware, get_admission_control
+from eventual_backend.core.cache import get_cache
 from eventual_backend.core.config import settings
 from eventual_backend.routers.api import api_router
-from eventual_backend.core.database import engine, Base
+from eventual_backend.core.database import AsyncSessionLocal, engine, Base, pool_status, replica_router
+from eventual_backend.core.compression import CompressionMiddleware
+from eventual_backend.core.metrics import MetricsMiddleware, render_metrics
+from eventual_backend.services.task_feed import close_task_feed, get_task_feed
+from eventual_backend.workers.runner import JobRunner
 
 
 @asynccontextmanager
@@ -11,13 +21,33 @@ async def lifespan(app: FastAPI):
     # Startup: Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    health_checks = None
+    if replica_router.engines:
+        await replica_router.check()
+        health_checks = asyncio.create_task(replica_router.run_health_checks(settings.DB_REPLICA_HEALTH_CHECK_INTERVAL))
+    archival = None
+    if settings.TASK_ARCHIVE_INTERVAL_SECONDS > 0:
+        archival = asyncio.create_task(archive_periodically(settings.TASK_ARCHIVE_INTERVAL_SECONDS))
+    app.state.job_runner = JobRunner(AsyncSessionLocal)
+    app.state.job_runner.start()
     yield
-    # Shutdown: Close connections
+    # Shutdown: let jobs in flight finish, then close connections
+    await app.state.job_runner.stop()
+    await close_task_feed()
+    for background in (health_checks, archival):
+        if background:
+            background.cancel()
+    await replica_router.dispose()
     await engine.dispose()
 
 
 app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json", lifespan=lifespan)
 
+# Metrics is added last so it wraps everything else and times the compression too; admission is innermost, so
+# shed requests are still timed and counted
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(CompressionMiddleware, min_size=settings.COMPRESSION_MIN_SIZE)
+app.add_middleware(MetricsMiddleware)
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
@@ -29,3 +59,43 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/cache")
+async def cache_health():
+    cache = get_cache()
+    return {"backend": cache.name, **cache.stats.as_dict()}
+
+
+@app.get("/health/pool")
+async def pool_health():
+    return pool_status(engine.pool)
+
+
+@app.get("/health/admission")
+async def admission_health():
+    control = get_admission_control()
+    return {**control.stats, **control.outcomes}
+
+
+@app.get("/health/jobs")
+async def job_health():
+    runner = getattr(app.state, "job_runner", None)
+    return {"workers": runner.concurrency if runner else 0, **(runner.stats if runner else {})}
+
+
+@app.get("/health/stream")
+async def stream_health():
+    feed = get_task_feed()
+    return {"subscribers": len(feed.broadcaster), **feed.stats, **feed.broadcaster.stats}
+
+
+@app.get("/health/replicas")
+async def replica_health():
+    return replica_router.status()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    content = render_metrics(get_cache().stats.as_dict(), pool_status(engine.pool), get_admission_control().stats)
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4")
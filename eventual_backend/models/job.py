@@ -0,0 +1,38 @@
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+import uuid
+import enum
+
+from eventual_backend.core.database import Base
+
+
+class JobStatus(enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """Deferred work for the background workers in eventual_backend.workers.
+
+    run_at is when the job may next be claimed: the enqueue time or retry time while QUEUED, and the lease
+    expiry while RUNNING, after which a job whose worker died is claimed again. Jobs are deleted once they
+    succeed; FAILED ones ran out of attempts and are kept, with their last error, for inspection.
+    """
+
+    __tablename__ = "jobs"
+    # Claimable jobs in run_at order; FAILED ones are left out so they cost the claim query nothing.
+    # Keep in sync with alembic/versions/0007_jobs.py.
+    __table_args__ = (Index("ix_jobs_run_at", "run_at", postgresql_where=text("status <> 'FAILED'")),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, DDL, String, DateTime, Enum, ForeignKey, Index, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 import uuid
 import enum
@@ -7,6 +8,10 @@ import enum
 from eventual_backend.core.database import Base
 
 
+# Text search configuration for titles: no stemming or stop words, so prefix queries match what users type
+TITLE_SEARCH_CONFIG = "simple"
+
+
 class TaskStatus(enum.Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -15,6 +20,21 @@ class TaskStatus(enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Composite indexes matching the filter + (due_date, id) ordering of TaskRepository.get_with_filters,
+    # so every list query is an index range scan that can also serve keyset pagination.
+    # Keep in sync with alembic/versions/0002_task_list_indexes.py.
+    # ix_tasks_title_search serves GET /api/tasks/search; see alembic/versions/0004_task_title_search.py.
+    # ix_tasks_open_due_date_id covers only unfinished tasks, so overdue=true skips the finished history;
+    # see alembic/versions/0005_task_open_due_date_index.py.
+    # ix_tasks_done_updated_at finds the done tasks due for archival; see alembic/versions/0006_tasks_archive.py.
+    __table_args__ = (
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        Index("ix_tasks_user_id_due_date_id", "user_id", "due_date", "id"),
+        Index("ix_tasks_status_due_date_id", "status", "due_date", "id"),
+        Index("ix_tasks_title_search", "title_search", postgresql_using="gin"),
+        Index("ix_tasks_open_due_date_id", "due_date", "id", postgresql_where=text("status <> 'DONE'")),
+        Index("ix_tasks_done_updated_at", "updated_at", postgresql_where=text("status = 'DONE'")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
@@ -24,3 +44,69 @@ class Task(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Maintained by Postgres from title; deferred so ORM loads and RETURNING never fetch it
+    title_search = deferred(Column(TSVECTOR, Computed(f"to_tsvector('{TITLE_SEARCH_CONFIG}', title)", persisted=True)))
+
+
+# Trigram index for fuzzy title search, created only where the pg_trgm extension can be installed; without it
+# GET /api/tasks/search?mode=fuzzy answers 501. Keep in sync with alembic/versions/0004_task_title_search.py.
+TITLE_TRIGRAM_INDEX = """
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX IF NOT EXISTS ix_tasks_title_trgm ON tasks USING gin (title gin_trgm_ops);
+EXCEPTION WHEN feature_not_supported OR undefined_file OR insufficient_privilege THEN
+    RAISE NOTICE 'pg_trgm is not available, fuzzy task search is disabled';
+END
+$$
+"""
+
+event.listen(Task.__table__, "after_create", DDL(TITLE_TRIGRAM_INDEX))
+
+
+# Change feed behind GET /api/tasks/stream: statement-level triggers NOTIFY the task_changes channel with
+# the ids (not the contents) of changed tasks, as JSON arrays of [op, id, user_id, status, old_status,
+# old_user_id] items, 50 rows per notification to stay well under the 8000-byte payload limit, so a bulk write
+# costs one pg_notify per 50 rows. Keep in sync with alembic/versions/0008_task_change_notify.py.
+TASK_CHANGES_CHANNEL = "task_changes"
+
+TASK_NOTIFY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION tasks_notify_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM pg_notify('{TASK_CHANGES_CHANNEL}', json_agg(item)::text) FROM (
+            SELECT json_build_array('insert', id, user_id, status) AS item, (row_number() OVER () - 1) / 50 AS part
+            FROM new_rows
+        ) AS items GROUP BY part;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('{TASK_CHANGES_CHANNEL}', json_agg(item)::text) FROM (
+            SELECT json_build_array('delete', id, user_id, status) AS item, (row_number() OVER () - 1) / 50 AS part
+            FROM old_rows
+        ) AS items GROUP BY part;
+    ELSE
+        PERFORM pg_notify('{TASK_CHANGES_CHANNEL}', json_agg(item)::text) FROM (
+            SELECT json_build_array('update', n.id, n.user_id, n.status, o.status, o.user_id) AS item,
+                   (row_number() OVER () - 1) / 50 AS part
+            FROM new_rows AS n JOIN old_rows AS o USING (id)
+        ) AS items GROUP BY part;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TASK_NOTIFY_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_notify_insert ON tasks",
+    "CREATE TRIGGER tasks_notify_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_changes()",
+    "DROP TRIGGER IF EXISTS tasks_notify_update ON tasks",
+    "CREATE TRIGGER tasks_notify_update AFTER UPDATE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_changes()",
+    "DROP TRIGGER IF EXISTS tasks_notify_delete ON tasks",
+    "CREATE TRIGGER tasks_notify_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_changes()",
+]
+
+for statement in [TASK_NOTIFY_FUNCTION, *TASK_NOTIFY_TRIGGERS]:
+    event.listen(Task.__table__, "after_create", DDL(statement))
@@ -0,0 +1,51 @@
+from sqlalchemy import Column, DDL, DateTime, Enum, ForeignKey, Index, String, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from eventual_backend.core.database import Base
+from eventual_backend.models.task import TaskStatus
+from eventual_backend.models.task_status_count import TaskStatusCount
+
+
+class TaskArchive(Base):
+    """Done tasks moved out of tasks once they reach TASK_ARCHIVE_AFTER_DAYS, with the columns they had there.
+
+    Keeping finished work out of tasks keeps the hot table and its indexes small; reads opt into archived
+    rows with include_archived. Archived tasks are read-only.
+    """
+
+    __tablename__ = "tasks_archive"
+    # The list ordering's indexes, so include_archived reads merge two ordered index scans.
+    # Keep in sync with alembic/versions/0006_tasks_archive.py.
+    __table_args__ = (
+        Index("ix_tasks_archive_due_date_id", "due_date", "id"),
+        Index("ix_tasks_archive_user_id_due_date_id", "user_id", "due_date", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    title = Column(String, nullable=False)
+    status = Column(Enum(TaskStatus), nullable=False)
+    due_date = Column(DateTime, nullable=False)
+    # Not unique here: an idempotency key only guards tasks while they are live
+    idempotency_key = Column(String, nullable=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+# Archived tasks stay in task_status_counts: moving a task deletes it from tasks (decrementing DONE) and inserts
+# it here (incrementing it back), so the summary keeps counting every task. Reuses the counters' trigger function.
+TASK_ARCHIVE_COUNT_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_archive_status_counts_insert ON tasks_archive",
+    "CREATE TRIGGER tasks_archive_status_counts_insert AFTER INSERT ON tasks_archive "
+    "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+    "DROP TRIGGER IF EXISTS tasks_archive_status_counts_delete ON tasks_archive",
+    "CREATE TRIGGER tasks_archive_status_counts_delete AFTER DELETE ON tasks_archive "
+    "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+]
+
+# The trigger function is created along with task_status_counts
+TaskArchive.__table__.add_is_dependent_on(TaskStatusCount.__table__)
+for statement in TASK_ARCHIVE_COUNT_TRIGGERS:
+    event.listen(TaskArchive.__table__, "after_create", DDL(statement))
@@ -0,0 +1,81 @@
+import enum
+
+from sqlalchemy import BigInteger, Column, DDL, DateTime, Enum, Identity, Index, event
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from eventual_backend.core.database import Base
+from eventual_backend.models.task import Task
+
+
+class TaskEventType(enum.Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ARCHIVED = "archived"
+
+
+class TaskEvent(Base):
+    """Append-only history of tasks: one row per created, updated, deleted or archived task, holding the task
+    as it was after the change (before it, for deletions and archival).
+
+    Written by statement-level triggers on tasks in the writing transaction, so every write path is logged
+    and a bulk INSERT or COPY appends its events in one INSERT ... SELECT. Events of a task are ordered by id.
+    """
+
+    __tablename__ = "task_events"
+    # Keep in sync with alembic/versions/0009_task_events.py.
+    __table_args__ = (Index("ix_task_events_task_id_id", "task_id", "id"),)
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    # No foreign key: the history outlives the task
+    task_id = Column(UUID(as_uuid=True), nullable=False)
+    type = Column(Enum(TaskEventType), nullable=False)
+    data = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+# data is the row as JSON without the derived title_search. A deleted task found in tasks_archive was moved
+# there by archival (the archive's insert runs in the same statement). Updates that change nothing are not
+# logged. Keep in sync with alembic/versions/0009_task_events.py.
+TASK_EVENTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_events_append() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO task_events (task_id, type, data)
+        SELECT n.id, 'CREATED', to_jsonb(n) - 'title_search' FROM new_rows AS n;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO task_events (task_id, type, data)
+        SELECT o.id,
+               CASE WHEN EXISTS (SELECT 1 FROM tasks_archive AS a WHERE a.id = o.id) THEN 'ARCHIVED'
+                    ELSE 'DELETED' END::taskeventtype,
+               to_jsonb(o) - 'title_search'
+        FROM old_rows AS o;
+    ELSE
+        INSERT INTO task_events (task_id, type, data)
+        SELECT n.id, 'UPDATED', to_jsonb(n) - 'title_search'
+        FROM new_rows AS n JOIN old_rows AS o USING (id)
+        WHERE n IS DISTINCT FROM o;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TASK_EVENTS_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_events_insert ON tasks",
+    "CREATE TRIGGER tasks_events_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_events_append()",
+    "DROP TRIGGER IF EXISTS tasks_events_update ON tasks",
+    "CREATE TRIGGER tasks_events_update AFTER UPDATE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_events_append()",
+    "DROP TRIGGER IF EXISTS tasks_events_delete ON tasks",
+    "CREATE TRIGGER tasks_events_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_events_append()",
+]
+
+# Installed whenever Base.metadata.create_all creates the table (app startup, tests)
+TaskEvent.__table__.add_is_dependent_on(Task.__table__)
+for statement in [TASK_EVENTS_FUNCTION, *TASK_EVENTS_TRIGGERS]:
+    event.listen(TaskEvent.__table__, "after_create", DDL(statement))
@@ -0,0 +1,75 @@
+from sqlalchemy import BigInteger, Column, DDL, Enum, event
+
+from eventual_backend.core.database import Base
+from eventual_backend.models.task import Task, TaskStatus
+
+
+class TaskStatusCount(Base):
+    """Number of tasks per status, maintained by statement-level triggers on tasks.
+
+    The triggers read the statement's transition tables, so a bulk INSERT or COPY costs one counter update
+    per status rather than one per row, and every write path (ORM, bulk, raw SQL) stays consistent.
+    """
+
+    __tablename__ = "task_status_counts"
+
+    status = Column(Enum(TaskStatus), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+# Counter rows are upserted in status order so concurrent transactions lock them in the same order.
+# Keep in sync with alembic/versions/0003_task_status_counts.py.
+TASK_STATUS_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_status_counts_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO task_status_counts AS c (status, count)
+        SELECT status, count(*) FROM new_rows GROUP BY status ORDER BY status
+        ON CONFLICT (status) DO UPDATE SET count = c.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO task_status_counts AS c (status, count)
+        SELECT status, -count(*) FROM old_rows GROUP BY status ORDER BY status
+        ON CONFLICT (status) DO UPDATE SET count = c.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO task_status_counts AS c (status, count)
+        SELECT status, sum(delta) FROM (
+            SELECT status, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT status, 1 AS delta FROM new_rows
+        ) AS changes
+        GROUP BY status HAVING sum(delta) <> 0 ORDER BY status
+        ON CONFLICT (status) DO UPDATE SET count = c.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TASK_STATUS_COUNTS_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_status_counts_insert ON tasks",
+    "CREATE TRIGGER tasks_status_counts_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+    "DROP TRIGGER IF EXISTS tasks_status_counts_update ON tasks",
+    "CREATE TRIGGER tasks_status_counts_update AFTER UPDATE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+    "DROP TRIGGER IF EXISTS tasks_status_counts_delete ON tasks",
+    "CREATE TRIGGER tasks_status_counts_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_status_counts_apply()",
+]
+
+# Seed the counters from any existing tasks, with a zero row for every status
+TASK_STATUS_COUNTS_BACKFILL = """
+INSERT INTO task_status_counts (status, count)
+SELECT s.status, count(t.id)
+FROM unnest(enum_range(NULL::taskstatus)) AS s(status)
+LEFT JOIN tasks AS t ON t.status = s.status
+GROUP BY s.status
+ON CONFLICT (status) DO UPDATE SET count = EXCLUDED.count
+"""
+
+# Installed whenever Base.metadata.create_all creates the table (app startup, tests); the triggers live on
+# tasks, so make sure it is created first
+TaskStatusCount.__table__.add_is_dependent_on(Task.__table__)
+for statement in [TASK_STATUS_COUNTS_FUNCTION, *TASK_STATUS_COUNTS_TRIGGERS, TASK_STATUS_COUNTS_BACKFILL]:
+    event.listen(TaskStatusCount.__table__, "after_create", DDL(statement))
@@ -1,25 +1,122 @@
-from typing import Generic, TypeVar, Type, Optional, List
+import enum
+from datetime import datetime
+from typing import Dict, Generic, Iterable, TypeVar, Type, Optional, List, Sequence
 from uuid import UUID
+from sqlalchemy import ColumnElement, Select, delete, inspect, update
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
+from eventual_backend.core.cache import CacheBackend, get_cache
 from eventual_backend.core.database import Base
+from eventual_backend.repositories.dataloader import DataLoader, session_loader
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 
 class BaseRepository(Generic[ModelType]):
-    def __init__(self, model: Type[ModelType], db: AsyncSession):
+    def __init__(self, model: Type[ModelType], db: AsyncSession, cache: Optional[CacheBackend] = None):
         self.model = model
         self.db = db
+        self.cache = cache if cache is not None else get_cache()
+        self._columns = [attr.columns[0] for attr in inspect(model).column_attrs if not attr.deferred]
+
+    def _cache_key(self, id: UUID) -> str:
+        return f"{self.model.__tablename__}:{id}"
+
+    def _to_cache(self, db_obj: ModelType) -> dict:
+        """Snapshot the loaded columns of db_obj as JSON-compatible values"""
+        values = {}
+        for column in self._columns:
+            value = getattr(db_obj, column.key)
+            if isinstance(value, UUID):
+                value = str(value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, enum.Enum):
+                value = value.name
+            values[column.key] = value
+        return values
+
+    async def _from_cache(self, values: dict) -> ModelType:
+        """Rebuild an instance from a cache snapshot and attach it to the session without a query"""
+        decoded = {}
+        for column in self._columns:
+            value = values.get(column.key)
+            if value is not None:
+                enum_class = getattr(column.type, "enum_class", None)
+                if enum_class is not None:
+                    value = enum_class[value]
+                elif column.type.python_type is UUID:
+                    value = UUID(value)
+                elif column.type.python_type is datetime:
+                    value = datetime.fromisoformat(value)
+            decoded[column.key] = value
+        db_obj = self.model(**decoded)
+        make_transient_to_detached(db_obj)
+        return await self.db.merge(db_obj, load=False)
+
+    async def invalidate(self, id: UUID) -> None:
+        await self.cache.delete(self._cache_key(id))
+
+    async def _fetch_many(self, ids: List[UUID]) -> Dict[UUID, ModelType]:
+        result = await self.db.execute(select(self.model).where(self.model.id.in_(ids)))
+        return {db_obj.id: db_obj for db_obj in result.scalars()}
+
+    @property
+    def loader(self) -> DataLoader:
+        """Request-scoped loader batching concurrent get() misses for this model into one IN query"""
+        return session_loader(self.db, self.model, self._fetch_many)
 
     async def get(self, id: UUID) -> Optional[ModelType]:
-        result = await self.db.execute(select(self.model).where(self.model.id == id))
-        return result.scalar_one_or_none()
+        key = self._cache_key(id)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return await self._from_cache(cached)
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
+        db_obj = await self.loader.load(id)
+        if db_obj is not None:
+            await self.cache.set(key, self._to_cache(db_obj))
+        return db_obj
+
+    async def get_many(self, ids: Iterable[UUID]) -> Dict[UUID, ModelType]:
+        """Instances for the given ids that exist, served from the cache where possible and otherwise with a
+        single IN query"""
+        found = {}
+        missing = []
+        for id in dict.fromkeys(ids):
+            cached = await self.cache.get(self._cache_key(id))
+            if cached is not None:
+                found[id] = await self._from_cache(cached)
+            else:
+                missing.append(id)
+        if missing:
+            fetched = await self._fetch_many(missing)
+            for id, db_obj in fetched.items():
+                await self.cache.set(self._cache_key(id), self._to_cache(db_obj))
+            found.update(fetched)
+        return found
+
+    def _page_query(self, query: Select, skip: int = 0, limit: int = 100, after: Optional[UUID] = None) -> Select:
+        query = query.order_by(self.model.id)
+        if after is not None:
+            # Keyset pagination: seek past the last id of the previous page instead of skipping rows
+            query = query.where(self.model.id > after)
+        else:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    async def get_all(self, skip: int = 0, limit: int = 100, after: Optional[UUID] = None) -> List[ModelType]:
+        result = await self.db.execute(self._page_query(select(self.model), skip, limit, after))
         return result.scalars().all()
 
+    async def get_all_rows(
+        self, columns: Sequence[ColumnElement], skip: int = 0, limit: int = 100, after: Optional[UUID] = None
+    ) -> Sequence[Row]:
+        """Like get_all, but returns plain rows of the given columns without building ORM instances"""
+        result = await self.db.execute(self._page_query(select(*columns), skip, limit, after))
+        return result.all()
+
     async def create(self, obj_in: dict) -> ModelType:
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
@@ -27,18 +124,25 @@ class BaseRepository(Generic[ModelType]):
         await self.db.refresh(db_obj)
         return db_obj
 
-    async def update(self, db_obj: ModelType, obj_in: dict) -> ModelType:
-        for field, value in obj_in.items():
-            if value is not None:
-                setattr(db_obj, field, value)
+    async def update(self, id: UUID, obj_in: dict) -> Optional[ModelType]:
+        """Apply the non-None values of obj_in with a single UPDATE ... RETURNING; None if no row has this id"""
+        values = {field: value for field, value in obj_in.items() if value is not None}
+        if not values:
+            return await self.get(id)
+        stmt = update(self.model).where(self.model.id == id).values(**values).returning(self.model)
+        result = await self.db.execute(stmt)
+        db_obj = result.scalar_one_or_none()
         await self.db.commit()
-        await self.db.refresh(db_obj)
+        if db_obj is not None:
+            await self.invalidate(id)
         return db_obj
 
     async def delete(self, id: UUID) -> bool:
-        db_obj = await self.get(id)
-        if db_obj:
-            await self.db.delete(db_obj)
-            await self.db.commit()
-            return True
-        return False
+        """Delete with a single DELETE ... RETURNING; False if no row has this id"""
+        stmt = delete(self.model).where(self.model.id == id).returning(self.model.id)
+        result = await self.db.execute(stmt)
+        deleted = result.scalar_one_or_none() is not None
+        await self.db.commit()
+        if deleted:
+            await self.invalidate(id)
+        return deleted
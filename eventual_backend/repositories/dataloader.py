@@ -0,0 +1,63 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any, Generic, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+BatchLoadFn = Callable[[list], Awaitable[dict]]
+
+
+class DataLoader(Generic[KeyType, ValueType]):
+    """Coalesces load() calls made in the same event loop tick into one batch_load_fn call.
+
+    batch_load_fn receives the distinct keys and returns a dict of the ones it found; missing keys resolve to
+    None. Results are not memoized beyond the batch, so a later load sees writes made in between.
+    """
+
+    def __init__(self, batch_load_fn: BatchLoadFn):
+        self.batch_load_fn = batch_load_fn
+        self._pending: dict[KeyType, asyncio.Future] = {}
+        self.batches = 0
+
+    async def load(self, key: KeyType) -> Optional[ValueType]:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                # Runs after every coroutine already scheduled for this tick has had the chance to add its key
+                loop.call_soon(self._dispatch)
+            future = self._pending[key] = loop.create_future()
+        return await future
+
+    async def load_many(self, keys: Iterable[KeyType]) -> list[Optional[ValueType]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self.batches += 1
+        asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending: dict[KeyType, asyncio.Future]) -> None:
+        try:
+            found = await self.batch_load_fn(list(pending))
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+def session_loader(db: AsyncSession, name: Any, batch_load_fn: BatchLoadFn) -> DataLoader:
+    """The DataLoader registered under name on this session, so every repository sharing a request's session
+    shares its loaders too"""
+    loaders = db.info.setdefault("dataloaders", {})
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = DataLoader(batch_load_fn)
+    return loader
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import delete, func, literal, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from eventual_backend.core.cache import CacheBackend, NullCache
+from eventual_backend.models.job import Job, JobStatus
+from eventual_backend.repositories.base import BaseRepository
+
+
+# Rendered inline so the claim condition matches the ix_jobs_run_at partial index predicate
+FAILED = literal(JobStatus.FAILED, Job.status.type, literal_execute=True)
+
+
+class JobRepository(BaseRepository[Job]):
+    """The jobs table as a queue. A claimed job is identified by (id, attempts): once its lease expires another
+    worker may claim it again, and the first worker's late complete/retry/fail then matches no row."""
+
+    def __init__(self, db: AsyncSession, cache: Optional[CacheBackend] = None):
+        # Jobs change on every claim, so they never go through the entity cache
+        super().__init__(Job, db, cache if cache is not None else NullCache())
+
+    async def enqueue(self, kind: str, payload: dict, max_attempts: int, delay: Optional[timedelta] = None) -> Job:
+        values = {"kind": kind, "payload": payload, "max_attempts": max_attempts}
+        if delay:
+            values["run_at"] = func.localtimestamp() + delay
+        result = await self.db.execute(insert(Job).values(**values).returning(Job))
+        job = result.scalar_one()
+        await self.db.commit()
+        return job
+
+    async def claim(self, lease: timedelta) -> Optional[Job]:
+        """Take the next due job, or one whose lease expired, with a single UPDATE ... RETURNING.
+
+        FOR UPDATE SKIP LOCKED lets concurrent workers each take a different job instead of queueing on the
+        same row. The job's run_at becomes its lease expiry and attempts counts this run.
+        """
+        ready = (
+            select(Job.id)
+            .where(Job.status != FAILED, Job.run_at <= func.localtimestamp())
+            .order_by(Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        statement = (
+            update(Job)
+            .where(Job.id == ready)
+            .values(status=JobStatus.RUNNING, attempts=Job.attempts + 1, run_at=func.localtimestamp() + lease)
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        job = (await self.db.execute(statement)).scalar_one_or_none()
+        await self.db.commit()
+        return job
+
+    async def _finish(self, statement, id: UUID, attempts: int) -> bool:
+        result = await self.db.execute(
+            statement.where(Job.id == id, Job.attempts == attempts).execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def complete(self, id: UUID, attempts: int) -> bool:
+        return await self._finish(delete(Job), id, attempts)
+
+    async def retry(self, id: UUID, attempts: int, error: str, delay: timedelta) -> bool:
+        values = {"status": JobStatus.QUEUED, "run_at": func.localtimestamp() + delay, "last_error": error}
+        return await self._finish(update(Job).values(**values), id, attempts)
+
+    async def fail(self, id: UUID, attempts: int, error: str) -> bool:
+        return await self._finish(update(Job).values(status=JobStatus.FAILED, last_error=error), id, attempts)
+
+    async def release(self, id: UUID, attempts: int) -> bool:
+        """Put back a job interrupted by shutdown, due now and without counting the interrupted attempt"""
+        values = {"status": JobStatus.QUEUED, "run_at": func.localtimestamp(), "attempts": Job.attempts - 1}
+        return await self._finish(update(Job).values(**values), id, attempts)
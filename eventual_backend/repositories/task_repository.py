@@ -1,55 +1,569 @@
-from typing import List, Optional
+import re
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, List, NoReturn, Optional, Sequence, Tuple
 from uuid import UUID
+import asyncpg
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc, asc
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import Select
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Float,
+    bindparam,
+    cast,
+    delete,
+    desc,
+    asc,
+    func,
+    literal,
+    literal_column,
+    text,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+from sqlalchemy.exc import DBAPIError, IntegrityError
 
-from eventual_backend.models.task import Task, TaskStatus
+from eventual_backend.core.exceptions import IdempotencyConflictError, SearchUnavailableError, UserNotFoundError
+from eventual_backend.models.task import TITLE_SEARCH_CONFIG, Task, TaskStatus
+from eventual_backend.models.task_archive import TaskArchive
+from eventual_backend.models.task_status_count import TaskStatusCount
+from eventual_backend.core.cache import CacheBackend
 from eventual_backend.repositories.base import BaseRepository
 
 
+# Columns of TaskResponse, in its field order, for the row-based list paths
+RESPONSE_COLUMNS = (
+    Task.title,
+    Task.status,
+    Task.due_date,
+    Task.idempotency_key,
+    Task.user_id,
+    Task.id,
+    Task.created_at,
+    Task.updated_at,
+)
+
+# Enough of each row to compute a page's ETag and next cursor without loading the full rows
+VERSION_COLUMNS = (Task.id, Task.due_date, Task.updated_at)
+
+EXPORT_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.status,
+    Task.due_date,
+    Task.idempotency_key,
+    Task.user_id,
+    Task.created_at,
+    Task.updated_at,
+)
+
+# DONE rendered inline, so that conditions on it match the predicates of the partial indexes
+# ix_tasks_open_due_date_id and ix_tasks_done_updated_at: a bound parameter would keep the planner from proving
+# an index applies once it switches to a generic plan
+DONE = literal(TaskStatus.DONE, Task.status.type, literal_execute=True)
+
+# Task mapped over tasks UNION ALL tasks_archive, for reads with include_archived. Postgres flattens the union
+# into an append of both tables, pushing filters into each side and merging their ordered index scans
+ARCHIVE_COLUMNS = [column.key for column in EXPORT_COLUMNS]
+TaskWithArchived = aliased(
+    Task,
+    union_all(
+        select(*[Task.__table__.c[key] for key in ARCHIVE_COLUMNS]),
+        select(*[TaskArchive.__table__.c[key] for key in ARCHIVE_COLUMNS]),
+    ).subquery("tasks_with_archived"),
+)
+
+SEARCH_MODES = ("text", "fuzzy")
+
+# Inserts retried when the task holding an idempotency key is deleted between the conflict and the lookup
+IDEMPOTENT_INSERT_ATTEMPTS = 3
+
+
+def empty_user_task_summary() -> dict:
+    """The statistics of a user without tasks, in the shape of TaskRepository.get_user_task_summaries"""
+    return {**{status.value: 0 for status in TaskStatus}, "overdue": 0, "next_due_date": None}
+
+
+def search_terms(query: str) -> List[str]:
+    """The words of a search query; punctuation and tsquery operators are dropped"""
+    return re.findall(r"[^\W_]+", query.lower())
+
+
+def search_clauses(query: str, mode: str = "text") -> Tuple[ColumnElement, ColumnElement]:
+    """(match condition, rank) for a title search.
+
+    text:  search-as-you-type over the title_search GIN index, ranked by ts_rank: every word must appear in the
+           title, the last one possibly still being typed (`production dep` finds "Deploy to production").
+           Only the last word is a prefix because partial matches make the GIN scan several times slower
+    fuzzy: trigram word similarity, tolerant of typos, via the pg_trgm index when installed
+    """
+    if mode == "fuzzy":
+        value = bindparam("search_query", query)
+        return value.op("<%")(Task.title), func.word_similarity(value, Task.title)
+    tsquery = func.to_tsquery(
+        literal_column(f"'{TITLE_SEARCH_CONFIG}'::regconfig"),
+        bindparam("search_query", " & ".join(search_terms(query)) + ":*"),
+    )
+    return Task.title_search.op("@@")(tsquery), func.ts_rank(Task.title_search, tsquery)
+
+
 class TaskRepository(BaseRepository[Task]):
-    def __init__(self, db: AsyncSession):
-        super().__init__(Task, db)
+    def __init__(self, db: AsyncSession, cache: Optional[CacheBackend] = None):
+        super().__init__(Task, db, cache)
 
     async def get_by_idempotency_key(self, key: str) -> Optional[Task]:
         result = await self.db.execute(select(Task).where(Task.idempotency_key == key))
         return result.scalar_one_or_none()
 
+    async def get_by_idempotency_keys(self, keys: Iterable[str]) -> Dict[str, Task]:
+        result = await self.db.execute(select(Task).where(Task.idempotency_key.in_(list(keys))))
+        return {task.idempotency_key: task for task in result.scalars().all()}
+
+    async def _raise_integrity_error(self, error: IntegrityError, user_id: Optional[UUID] = None) -> NoReturn:
+        """Roll back a failed insert and raise UserNotFoundError if tasks.user_id's foreign key rejected it"""
+        await self.db.rollback()
+        if getattr(error.orig, "sqlstate", None) == asyncpg.ForeignKeyViolationError.sqlstate:
+            raise UserNotFoundError(user_id) from error
+        raise error
+
+    async def create(self, obj_in: dict) -> Task:
+        """Insert a task with a single INSERT ... RETURNING.
+
+        The user_id foreign key validates the user as part of the insert, so there is no separate lookup.
+        """
+        try:
+            task = await self.db.scalar(insert(Task).values(**obj_in).returning(Task))
+        except IntegrityError as error:
+            await self._raise_integrity_error(error, obj_in["user_id"])
+        await self.db.commit()
+        return task
+
+    async def create_idempotent(self, obj_in: dict) -> Task:
+        """Insert a task keyed by idempotency_key, or return the task already stored under that key.
+
+        A single INSERT ... ON CONFLICT DO NOTHING RETURNING covers the common case; only when the key
+        already exists is there a second statement to fetch the stored task. Concurrent requests with the
+        same key never raise: the losing insert waits for the winner to commit and then reads its row. If
+        that task is deleted before it can be read, the key is free again and the insert is retried, up to
+        IDEMPOTENT_INSERT_ATTEMPTS times before raising IdempotencyConflictError.
+        """
+        statement = (
+            insert(Task).values(**obj_in).on_conflict_do_nothing(index_elements=[Task.idempotency_key]).returning(Task)
+        )
+        for _ in range(IDEMPOTENT_INSERT_ATTEMPTS):
+            try:
+                task = await self.db.scalar(statement)
+            except IntegrityError as error:
+                await self._raise_integrity_error(error, obj_in["user_id"])
+            if task is None:
+                task = await self.get_by_idempotency_key(obj_in["idempotency_key"])
+            if task is not None:
+                await self.db.commit()
+                return task
+        await self.db.rollback()
+        raise IdempotencyConflictError(obj_in["idempotency_key"])
+
+    async def create_many(self, rows: List[dict]) -> List[Task]:
+        """Insert rows with batched multi-row INSERT ... RETURNING statements in one transaction.
+
+        Rows must carry their own ids; the returned tasks are not guaranteed to be in input order. Rows whose
+        idempotency_key is already stored are skipped (ON CONFLICT DO NOTHING) and absent from the result.
+        Raises UserNotFoundError, with nothing inserted, if a row's user does not exist.
+        """
+        if not rows:
+            return []
+        statement = insert(Task).on_conflict_do_nothing(index_elements=[Task.idempotency_key]).returning(Task)
+        try:
+            result = await self.db.scalars(statement, rows)
+        except IntegrityError as error:
+            await self._raise_integrity_error(error)
+        tasks = result.all()
+        await self.db.commit()
+        return tasks
+
+    async def copy_many(self, rows: List[dict]) -> List[Task]:
+        """Load rows with the COPY protocol, then read them back; faster than INSERT for very large batches.
+
+        COPY cannot skip conflicting rows, so if a concurrent request stored one of the idempotency keys in
+        the meantime the batch falls back to create_many. Raises UserNotFoundError, with nothing inserted, if a
+        row's user does not exist.
+        """
+        if not rows:
+            return []
+        columns = ["id", "title", "status", "due_date", "idempotency_key", "user_id"]
+        records = [
+            (row["id"], row["title"], row["status"].name, row["due_date"], row.get("idempotency_key"), row["user_id"])
+            for row in rows
+        ]
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        try:
+            await raw_connection.driver_connection.copy_records_to_table(
+                Task.__tablename__, records=records, columns=columns
+            )
+        except asyncpg.UniqueViolationError:
+            await self.db.rollback()
+            return await self.create_many(rows)
+        except asyncpg.ForeignKeyViolationError as error:
+            await self.db.rollback()
+            raise UserNotFoundError() from error
+        result = await self.db.execute(select(Task).where(Task.id.in_([row["id"] for row in rows])))
+        tasks = result.scalars().all()
+        await self.db.commit()
+        return tasks
+
     async def get_by_user_id(self, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Task]:
-        result = await self.db.execute(select(Task).where(Task.user_id == user_id).offset(skip).limit(limit))
+        result = await self.db.execute(
+            select(Task)
+            .where(Task.user_id == user_id)
+            .order_by(asc(Task.due_date), asc(Task.id))
+            .offset(skip)
+            .limit(limit)
+        )
         return result.scalars().all()
 
-    async def get_with_filters(
+    async def get_rows_by_user_id(
+        self, user_id: UUID, skip: int = 0, limit: int = 100, columns: Sequence = RESPONSE_COLUMNS
+    ) -> Sequence[Row]:
+        """get_by_user_id as plain rows of the given columns"""
+        result = await self.db.execute(
+            select(*columns)
+            .where(Task.user_id == user_id)
+            .order_by(asc(Task.due_date), asc(Task.id))
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def get_rows_by_ids(self, ids: Iterable[UUID], columns: Sequence = RESPONSE_COLUMNS) -> Sequence[Row]:
+        """Rows of the given columns for the tasks that exist among ids, in no particular order"""
+        result = await self.db.execute(select(*columns).where(Task.id.in_(list(ids))))
+        return result.all()
+
+    def _filter(
         self,
+        query: Select,
         status: Optional[TaskStatus] = None,
         user_id: Optional[UUID] = None,
-        order_by: str = "due_date_asc",
-        skip: int = 0,
-        limit: int = 100,
-    ) -> List[Task]:
-        query = select(Task)
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        overdue: bool = False,
+        created_since: Optional[datetime] = None,
+        source=Task,
+    ) -> Select:
+        """Apply the list filters to the columns of source (Task or TaskWithArchived). Datetimes are naive UTC,
+        like the stored due dates.
 
+        The due date bounds are a half-open range [due_after, due_before) on the indexed due_date, so with the
+        (due_date, id) ordering they narrow the index range scan rather than filtering rows after the fact.
+        """
         if status:
-            query = query.where(Task.status == status)
+            query = query.where(source.status == status)
         if user_id:
-            query = query.where(Task.user_id == user_id)
+            query = query.where(source.user_id == user_id)
+        if due_after is not None:
+            query = query.where(source.due_date >= due_after)
+        if due_before is not None:
+            query = query.where(source.due_date < due_before)
+        if overdue:
+            query = query.where(source.due_date < func.timezone("UTC", func.now()), source.status != DONE)
+        if created_since is not None:
+            # created_at defaults to now() in the session's TimeZone, not UTC: move the bound into that frame
+            session_since = cast(func.timezone("UTC", cast(created_since, DateTime)), DateTime)
+            query = query.where(source.created_at >= session_since)
+        return query
 
-        # Ordering
+    def _order(
+        self, query: Select, order_by: str = "due_date_asc", after: Optional[Tuple] = None, source=Task
+    ) -> Select:
+        """Order by (due_date, id), id being a tie-breaker so pages are stable across equal due dates, and seek
+        past the keyset cursor `after`"""
         if order_by == "due_date_desc":
-            query = query.order_by(desc(Task.due_date))
+            query = query.order_by(desc(source.due_date), desc(source.id))
+            if after is not None:
+                query = query.where(tuple_(source.due_date, source.id) < tuple_(*after))
         else:  # due_date_asc default
-            query = query.order_by(asc(Task.due_date))
+            query = query.order_by(asc(source.due_date), asc(source.id))
+            if after is not None:
+                query = query.where(tuple_(source.due_date, source.id) > tuple_(*after))
+        return query
+
+    def build_filter_query(
+        self,
+        status: Optional[TaskStatus] = None,
+        user_id: Optional[UUID] = None,
+        order_by: str = "due_date_asc",
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        overdue: bool = False,
+        created_since: Optional[datetime] = None,
+        include_archived: bool = False,
+        columns: Optional[Sequence] = None,
+    ) -> Select:
+        """Build the statement behind get_with_filters; each filter/order combination is backed by an index.
+
+        limit=None builds the unbounded query used for exports. columns (Task attributes) selects plain rows
+        instead of Task instances; include_archived reads tasks_archive as well.
+        """
+        source = TaskWithArchived if include_archived else Task
+        selected = [getattr(source, column.key) for column in columns] if columns else [source]
+        query = self._filter(
+            select(*selected),
+            status=status,
+            user_id=user_id,
+            due_after=due_after,
+            due_before=due_before,
+            overdue=overdue,
+            created_since=created_since,
+            source=source,
+        )
+        query = self._order(query, order_by=order_by, after=after, source=source)
 
-        query = query.offset(skip).limit(limit)
+        # Keyset pagination seeks straight to the cursor position, so skip only applies without one
+        if after is None and skip:
+            query = query.offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    async def get_with_filters(
+        self,
+        status: Optional[TaskStatus] = None,
+        user_id: Optional[UUID] = None,
+        order_by: str = "due_date_asc",
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        **filters,
+    ) -> List[Task]:
+        query = self.build_filter_query(
+            status=status, user_id=user_id, order_by=order_by, skip=skip, limit=limit, after=after, **filters
+        )
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def get_task_summary(self) -> dict:
-        from sqlalchemy import func
+    async def get_rows_with_filters(
+        self,
+        status: Optional[TaskStatus] = None,
+        user_id: Optional[UUID] = None,
+        order_by: str = "due_date_asc",
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        columns: Sequence = RESPONSE_COLUMNS,
+        **filters,
+    ) -> Sequence[Row]:
+        """get_with_filters as plain rows of the given columns, skipping ORM instance construction"""
+        query = self.build_filter_query(
+            status=status,
+            user_id=user_id,
+            order_by=order_by,
+            skip=skip,
+            limit=limit,
+            after=after,
+            columns=columns,
+            **filters,
+        )
+        result = await self.db.execute(query)
+        return result.all()
+
+    def build_search_query(
+        self,
+        query: str,
+        mode: str = "text",
+        status: Optional[TaskStatus] = None,
+        user_id: Optional[UUID] = None,
+        order_by: str = "rank",
+        limit: int = 100,
+        after: Optional[Tuple] = None,
+        columns: Sequence = RESPONSE_COLUMNS,
+    ) -> Select:
+        """Tasks whose title matches query, with the list filters applied; rows carry their score as "rank".
 
-        result = await self.db.execute(select(Task.status, func.count(Task.id)).group_by(Task.status))
+        order_by="rank" (best match first, pages keyed on (rank, id)) has to score every match, which for a very
+        common word means visiting tens of thousands of rows. The due_date orders reuse the list ordering and
+        keyset cursor, so the planner can instead walk ix_tasks_due_date_id and stop after one page.
+        """
+        match, rank = search_clauses(query, mode)
+        statement = self._filter(select(*columns, rank.label("rank")).where(match), status=status, user_id=user_id)
+        if order_by != "rank":
+            return self._order(statement, order_by=order_by, after=after).limit(limit)
+        if after is not None:
+            statement = statement.where(tuple_(rank, Task.id) < tuple_(*after, types=(Float(), Task.id.type)))
+        return statement.order_by(desc(rank), desc(Task.id)).limit(limit)
+
+    async def search_rows(
+        self,
+        query: str,
+        mode: str = "text",
+        status: Optional[TaskStatus] = None,
+        user_id: Optional[UUID] = None,
+        order_by: str = "rank",
+        limit: int = 100,
+        after: Optional[Tuple] = None,
+    ) -> Sequence[Row]:
+        statement = self.build_search_query(
+            query, mode=mode, status=status, user_id=user_id, order_by=order_by, limit=limit, after=after
+        )
+        try:
+            result = await self.db.execute(statement)
+        except DBAPIError as error:
+            # word_similarity and <% come from pg_trgm
+            if getattr(error.orig, "sqlstate", None) == asyncpg.UndefinedFunctionError.sqlstate:
+                await self.db.rollback()
+                raise SearchUnavailableError(f"{mode} search requires the pg_trgm extension") from error
+            raise
+        return result.all()
+
+    async def stream_with_filters(
+        self,
+        status: Optional[TaskStatus] = None,
+        user_id: Optional[UUID] = None,
+        order_by: str = "due_date_asc",
+        batch_size: int = 1000,
+        **filters,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield every matching task as batches of plain rows read through a server-side cursor.
+
+        Rows are fetched batch_size at a time and never become ORM instances, so memory stays constant
+        however many tasks match. filters are the remaining build_filter_query keywords (due dates, overdue,
+        created_since, include_archived).
+        """
+        query = self.build_filter_query(
+            status=status, user_id=user_id, order_by=order_by, limit=None, columns=EXPORT_COLUMNS, **filters
+        )
+        query = query.execution_options(yield_per=batch_size)
+        result = await self.db.stream(query)
+        async for partition in result.partitions():
+            yield partition
+
+    async def archive_done(self, older_than: timedelta, batch_size: int = 1000) -> List[UUID]:
+        """Move up to batch_size tasks last updated (marked done) over older_than ago into tasks_archive, and
+        commit.
+
+        One statement: pick the oldest candidates through the ix_tasks_done_updated_at partial index, lock them
+        FOR UPDATE SKIP LOCKED, DELETE ... RETURNING them from tasks and insert the returned rows into
+        tasks_archive. Row locks are held only for this batch, rows another transaction is writing are left for
+        a later run rather than waited on, and concurrent archivers split the work instead of colliding.
+        Returns the ids moved; fewer than batch_size means nothing is left to archive.
+        """
+        batch = (
+            select(Task.id)
+            .where(Task.status == DONE, Task.updated_at < func.localtimestamp() - older_than)
+            .order_by(Task.updated_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        moved = (
+            delete(Task)
+            .where(Task.id.in_(select(batch.c.id)))
+            .returning(*[Task.__table__.c[key] for key in ARCHIVE_COLUMNS])
+            .cte("moved")
+        )
+        statement = (
+            insert(TaskArchive)
+            .from_select(ARCHIVE_COLUMNS, select(*[moved.c[key] for key in ARCHIVE_COLUMNS]))
+            .returning(TaskArchive.id)
+        )
+        ids = (await self.db.execute(statement)).scalars().all()
+        await self.db.commit()
+        for id in ids:
+            await self.invalidate(id)
+        return ids
+
+    async def get_archived(self, id: UUID) -> Optional[TaskArchive]:
+        return await self.db.get(TaskArchive, id)
+
+    async def get_task_summary(self) -> dict:
+        # Primary-key read of the trigger-maintained counters instead of a GROUP BY over tasks
+        result = await self.db.execute(select(TaskStatusCount.status, TaskStatusCount.count))
         summary = {status.value: 0 for status in TaskStatus}
         for status, count in result.all():
             summary[status.value] = count
         return summary
+
+    async def get_user_task_summaries(self, user_id: Optional[UUID] = None) -> Dict[UUID, dict]:
+        """Per-user task counts by status, overdue count and next due date of open tasks, keyed by user id in
+        id order, for every user with tasks or only user_id. Archived tasks are counted as done, like the task
+        summary counts them.
+
+        One GROUP BY user_id, status over tasks and tasks_archive, with the overdue count and next due date
+        computed in the same pass by FILTER aggregates, then folded into one dict per user.
+        """
+        source = TaskWithArchived
+        now = func.timezone("UTC", func.now())
+        is_open = source.status != DONE
+        query = select(
+            source.user_id,
+            source.status,
+            func.count(),
+            func.count().filter(is_open, source.due_date < now),
+            func.min(source.due_date).filter(is_open, source.due_date >= now),
+        )
+        if user_id is not None:
+            query = query.where(source.user_id == user_id)
+        result = await self.db.execute(query.group_by(source.user_id, source.status).order_by(source.user_id))
+
+        summaries: Dict[UUID, dict] = {}
+        for row_user_id, status, count, overdue, next_due_date in result.all():
+            summary = summaries.get(row_user_id)
+            if summary is None:
+                summary = summaries[row_user_id] = empty_user_task_summary()
+            summary[status.value] = count
+            summary["overdue"] += overdue
+            if next_due_date is not None:
+                summary["next_due_date"] = min(next_due_date, summary["next_due_date"] or next_due_date)
+        return summaries
+
+    async def reconcile_task_summary(self, fix: bool = False) -> Dict[str, Tuple[int, int]]:
+        """Recount tasks by status and compare with the maintained counters.
+
+        Returns {status: (counted, actual)} for every status whose counter has drifted. The counters include
+        archived tasks, so both tables are recounted. Checking runs in a REPEATABLE READ snapshot and does not
+        block writers; fixing takes a SHARE lock on both tables so no write can land between the recount and
+        the overwrite.
+        """
+        if fix:
+            await self.db.execute(text("LOCK TABLE tasks, tasks_archive IN SHARE MODE"))
+        else:
+            await self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        actual = {status: 0 for status in TaskStatus}
+        result = await self.db.execute(select(TaskWithArchived.status, func.count()).group_by(TaskWithArchived.status))
+        actual.update(result.all())
+        counted = await self.get_task_status_counts()
+
+        drift = {
+            status.value: (counted[status], actual[status])
+            for status in TaskStatus
+            if counted[status] != actual[status]
+        }
+        if fix and drift:
+            await self.set_task_status_counts(actual)
+        await self.db.commit()
+        return drift
+
+    async def get_task_status_counts(self) -> Dict[TaskStatus, int]:
+        counted = {status: 0 for status in TaskStatus}
+        result = await self.db.execute(select(TaskStatusCount.status, TaskStatusCount.count))
+        counted.update(result.all())
+        return counted
+
+    async def set_task_status_counts(self, counts: Dict[TaskStatus, int]) -> None:
+        """Overwrite the maintained counters, without committing"""
+        statement = insert(TaskStatusCount).values(
+            [{"status": status, "count": count} for status, count in counts.items()]
+        )
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[TaskStatusCount.status], set_={"count": statement.excluded.count}
+            )
+        )
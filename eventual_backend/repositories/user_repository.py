@@ -1,16 +1,25 @@
-from typing import Optional
+from typing import Iterable, Optional, Set
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from eventual_backend.models.user import User
+from eventual_backend.core.cache import CacheBackend
 from eventual_backend.repositories.base import BaseRepository
 
 
+# Columns of UserResponse, in its field order, for the row-based list path
+RESPONSE_COLUMNS = (User.name, User.email, User.phone_number, User.id)
+
+
 class UserRepository(BaseRepository[User]):
-    def __init__(self, db: AsyncSession):
-        super().__init__(User, db)
+    def __init__(self, db: AsyncSession, cache: Optional[CacheBackend] = None):
+        super().__init__(User, db, cache)
 
     async def get_by_email(self, email: str) -> Optional[User]:
         result = await self.db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
+
+    async def get_existing_ids(self, ids: Iterable[UUID]) -> Set[UUID]:
+        result = await self.db.execute(select(User.id).where(User.id.in_(list(ids))))
+        return set(result.scalars().all())
@@ -1,11 +1,45 @@
+import random
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
 
+import asyncpg
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi import status as http_status  # list_tasks shadows `status` with its query parameter
+
+from eventual_backend.core.config import settings
+from eventual_backend.core.etag import ETAG_HEADER, etag_matches, not_modified, version_etag
+from eventual_backend.core.exceptions import (
+    IdempotencyConflictError,
+    InvalidCursorError,
+    SearchUnavailableError,
+    UserNotFoundError,
+)
+from eventual_backend.core.pagination import NEXT_CURSOR_HEADER
+from eventual_backend.core.serialization import (
+    MSGPACK_AVAILABLE,
+    MSGPACK_MEDIA_TYPE,
+    negotiated_response,
+    prefers_msgpack,
+)
+from eventual_backend.repositories.task_repository import search_terms
+from eventual_backend.services.task_event_service import TaskEventService
+from eventual_backend.services.task_feed import TaskFeed, get_task_feed
 from eventual_backend.services.task_service import TaskService
 from eventual_backend.services.user_service import UserService
-from eventual_backend.schemas.task_schema import TaskCreate, TaskUpdate, TaskResponse, TaskSummary, TaskStatusEnum
-from eventual_backend.api.dependencies import get_task_service, get_user_service
+from eventual_backend.schemas.task_schema import (
+    TaskBulkCreate,
+    TaskBulkCreateResponse,
+    TaskCreate,
+    TaskEventResponse,
+    TaskUpdate,
+    TaskResponse,
+    TaskSearchResult,
+    TaskSummary,
+    TaskStatusEnum,
+)
+from eventual_backend.api.dependencies import get_task_event_service, get_task_service, get_user_service
 
 router = APIRouter()
 
@@ -17,30 +51,218 @@ async def list_tasks(
     order_by: str = Query("due_date_asc", pattern="^(due_date_asc|due_date_desc)$"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(
+        None, description=f"Opaque cursor from a previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    due_after: Optional[datetime] = Query(None, description="Only tasks due at or after this time"),
+    due_before: Optional[datetime] = Query(None, description="Only tasks due before this time"),
+    overdue: bool = Query(False, description="Only tasks that are not done and were due before now"),
+    created_since: Optional[datetime] = Query(None, description="Only tasks created at or after this time"),
+    include_archived: bool = Query(False, description="Also list done tasks moved to the archive"),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
     task_service: TaskService = Depends(get_task_service),
 ):
-    return await task_service.get_tasks(status=status, user_id=user_id, order_by=order_by, skip=skip, limit=limit)
+    """List tasks by due date. Naive datetimes are taken as UTC; due_after=now&due_before=<now + 1 day> lists
+    what falls due in the next day."""
+    filters = {
+        "status": status,
+        "user_id": user_id,
+        "order_by": order_by,
+        "skip": skip,
+        "limit": limit,
+        "cursor": cursor,
+        "due_after": due_after,
+        "due_before": due_before,
+        "overdue": overdue,
+        "created_since": created_since,
+        "include_archived": include_archived,
+    }
+
+    def page_headers(rows) -> dict:
+        headers = {ETAG_HEADER: version_etag(rows)}
+        next_cursor = task_service.next_cursor(rows, limit)
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        return headers
+
+    try:
+        if if_none_match:
+            # Conditional poll: compare the page's row versions before loading and serializing full rows
+            versions = await task_service.get_tasks(**filters, versions_only=True)
+            headers = page_headers(versions)
+            if etag_matches(if_none_match, headers[ETAG_HEADER]):
+                return not_modified(headers[ETAG_HEADER], headers)
+        tasks = await task_service.get_tasks(**filters)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+
+    return negotiated_response([task._asdict() for task in tasks], accept, headers=page_headers(tasks))
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(
-    task_create: TaskCreate,
+async def create_task(task_create: TaskCreate, task_service: TaskService = Depends(get_task_service)):
+    # The tasks.user_id foreign key validates the user as part of the INSERT
+    try:
+        return await task_service.create_task(task_create)
+    except UserNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found") from None
+    except IdempotencyConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Idempotency key conflict, retry the request"
+        ) from None
+
+
+@router.post("/bulk", response_model=TaskBulkCreateResponse)
+async def create_tasks_bulk(task_bulk_create: TaskBulkCreate, task_service: TaskService = Depends(get_task_service)):
+    """Create many tasks at once; each item reports created, existing (idempotency key) or user_not_found"""
+    try:
+        return await task_service.create_tasks_bulk(task_bulk_create.tasks)
+    except UserNotFoundError:
+        # Users kept being deleted while the batch was retried without them
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found") from None
+    except IdempotencyConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Idempotency key conflict, retry the request"
+        ) from None
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv", "msgpack": MSGPACK_MEDIA_TYPE}
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv|msgpack)$"),
+    status: Optional[TaskStatusEnum] = Query(None),
+    user_id: Optional[UUID] = Query(None),
+    order_by: str = Query("due_date_asc", pattern="^(due_date_asc|due_date_desc)$"),
+    due_after: Optional[datetime] = Query(None),
+    due_before: Optional[datetime] = Query(None),
+    overdue: bool = Query(False),
+    created_since: Optional[datetime] = Query(None),
+    include_archived: bool = Query(False),
+    accept: Optional[str] = Header(None),
     task_service: TaskService = Depends(get_task_service),
-    user_service: UserService = Depends(get_user_service),
 ):
-    # Verify user exists
-    user = await user_service.get_user(task_create.user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    """Stream every task matching the list filters as NDJSON, CSV or MessagePack maps, in constant memory.
+
+    Without an explicit format, MessagePack is chosen when the Accept header prefers it, NDJSON otherwise.
+    """
+    if format is None:
+        format = "msgpack" if prefers_msgpack(accept) else "ndjson"
+    elif format == "msgpack" and not MSGPACK_AVAILABLE:
+        raise HTTPException(status_code=http_status.HTTP_406_NOT_ACCEPTABLE, detail="MessagePack is not available")
+    return StreamingResponse(
+        task_service.export_tasks(
+            format=format,
+            status=status,
+            user_id=user_id,
+            order_by=order_by,
+            due_after=due_after,
+            due_before=due_before,
+            overdue=overdue,
+            created_since=created_since,
+            include_archived=include_archived,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"', "Vary": "Accept"},
+    )
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_tasks(
+    status: Optional[TaskStatusEnum] = Query(None, description="Only tasks entering or leaving this status"),
+    user_id: Optional[UUID] = Query(None),
+    feed: TaskFeed = Depends(get_task_feed),
+):
+    """Server-Sent Events stream of task changes as they are committed.
 
-    return await task_service.create_task(task_create)
+    `insert`, `update` and `delete` events carry JSON with op, id, user_id, status, old_status (updates only)
+    and the task as it is now (null once deleted). A `resync` event ends the stream when changes may have been
+    missed, because the client fell behind or the server lost its database listener: reconnect, then refetch.
+    """
+    try:
+        subscription = await feed.subscribe(user_id, status)
+    except (OSError, asyncpg.PostgresError):
+        raise HTTPException(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE, detail="Task stream unavailable"
+        ) from None
+    # Spread reconnections out, so a resync sent to every subscriber at once does not come back all at once
+    retry_ms = random.randint(1000, 3000)
+    return StreamingResponse(
+        subscription.sse_stream(settings.TASK_STREAM_HEARTBEAT_SECONDS, retry_ms),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/search", response_model=List[TaskSearchResult])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    mode: str = Query("text", pattern="^(text|fuzzy)$"),
+    status: Optional[TaskStatusEnum] = Query(None),
+    user_id: Optional[UUID] = Query(None),
+    order_by: str = Query("rank", pattern="^(rank|due_date_asc|due_date_desc)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(
+        None, description=f"Opaque cursor from a previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    accept: Optional[str] = Header(None),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Search task titles, best match first.
+
+    mode=text matches every word of q, the last one as a prefix; mode=fuzzy tolerates typos (needs pg_trgm).
+    For very common words, ordering by due date is much cheaper than by rank.
+    """
+    if mode == "text" and not search_terms(q):
+        raise HTTPException(status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY, detail="q contains no words")
+    try:
+        rows = await task_service.search_tasks(
+            q, mode=mode, status=status, user_id=user_id, order_by=order_by, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+    except SearchUnavailableError as e:
+        raise HTTPException(status_code=http_status.HTTP_501_NOT_IMPLEMENTED, detail=str(e)) from None
+
+    headers = {}
+    next_cursor = task_service.search_cursor(rows, limit, order_by)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return negotiated_response([row._asdict() for row in rows], accept, headers=headers)
+
+
+@router.get("/batch", response_model=List[TaskResponse])
+async def get_tasks_batch(
+    # Not Query(...): with FastAPI 0.104 a missing required list parameter fails with a 500 instead of a 422
+    ids: List[UUID] = Query([], description=f"Repeat for each task id, 1 to {settings.BATCH_GET_MAX_IDS}"),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Fetch several tasks in one request and one query; ids that do not exist are left out"""
+    if not 1 <= len(ids) <= settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Between 1 and {settings.BATCH_GET_MAX_IDS} ids are required",
+        )
+    return await task_service.get_tasks_by_ids(ids)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: UUID, task_service: TaskService = Depends(get_task_service)):
-    task = await task_service.get_task(task_id)
+async def get_task(
+    task_id: UUID,
+    response: Response,
+    include_archived: bool = Query(False, description="Fall back to the archive; archived tasks are read-only"),
+    if_none_match: Optional[str] = Header(None),
+    task_service: TaskService = Depends(get_task_service),
+):
+    task = await task_service.get_task(task_id, include_archived=include_archived)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    etag = version_etag([task])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers[ETAG_HEADER] = etag
     return task
 
 
@@ -59,20 +281,55 @@ async def delete_task(task_id: UUID, task_service: TaskService = Depends(get_tas
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
 
+@router.get("/{task_id}/events", response_model=List[TaskEventResponse])
+async def get_task_events(
+    task_id: UUID,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(
+        None, description=f"Opaque cursor from a previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    task_event_service: TaskEventService = Depends(get_task_event_service),
+):
+    """A task's history, oldest first: every change with the task as it was after it (before it for deleted and
+    archived). Kept after the task is deleted or archived."""
+    try:
+        events = await task_event_service.get_task_events(task_id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+    if not events and cursor is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    next_cursor = task_event_service.next_cursor(events, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return events
+
+
 @router.get("/user/{user_id}", response_model=List[TaskResponse])
 async def get_user_tasks(
     user_id: UUID,
     skip: int = 0,
     limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
     task_service: TaskService = Depends(get_task_service),
     user_service: UserService = Depends(get_user_service),
 ):
-    # Verify user exists
-    user = await user_service.get_user(user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    async def verify_user(rows) -> None:
+        # A non-empty page proves the user exists (tasks.user_id is a foreign key), so only an empty page needs
+        # the extra lookup
+        if not rows and not await user_service.get_user(user_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return await task_service.get_user_tasks(user_id, skip=skip, limit=limit)
+    if if_none_match:
+        versions = await task_service.get_user_tasks(user_id, skip=skip, limit=limit, versions_only=True)
+        await verify_user(versions)
+        etag = version_etag(versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    tasks = await task_service.get_user_tasks(user_id, skip=skip, limit=limit)
+    await verify_user(tasks)
+    return negotiated_response([task._asdict() for task in tasks], accept, headers={ETAG_HEADER: version_etag(tasks)})
 
 
 @router.get("/summary/", response_model=TaskSummary)
@@ -1,17 +1,68 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+
+from eventual_backend.core.config import settings
+from eventual_backend.core.exceptions import InvalidCursorError
+from eventual_backend.core.pagination import NEXT_CURSOR_HEADER
+from eventual_backend.core.serialization import negotiated_response
 
 from eventual_backend.services.user_service import UserService
-from eventual_backend.schemas.user_schema import UserCreate, UserUpdate, UserResponse
+from eventual_backend.schemas.user_schema import UserCreate, UserUpdate, UserResponse, UserTaskStats
 from eventual_backend.api.dependencies import get_user_service
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[UserResponse])
-async def list_users(skip: int = 0, limit: int = 100, user_service: UserService = Depends(get_user_service)):
-    return await user_service.get_users(skip=skip, limit=limit)
+async def list_users(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(
+        None, description=f"Opaque cursor from a previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    accept: Optional[str] = Header(None),
+    user_service: UserService = Depends(get_user_service),
+):
+    try:
+        users = await user_service.get_users(skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+
+    headers = {}
+    next_cursor = user_service.next_cursor(users, limit)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return negotiated_response([user._asdict() for user in users], accept, headers=headers)
+
+
+@router.get("/batch", response_model=List[UserResponse])
+async def get_users_batch(
+    # Not Query(...): with FastAPI 0.104 a missing required list parameter fails with a 500 instead of a 422
+    ids: List[UUID] = Query([], description=f"Repeat for each user id, 1 to {settings.BATCH_GET_MAX_IDS}"),
+    user_service: UserService = Depends(get_user_service),
+):
+    """Fetch several users in one request and one query; ids that do not exist are left out"""
+    if not 1 <= len(ids) <= settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Between 1 and {settings.BATCH_GET_MAX_IDS} ids are required",
+        )
+    return await user_service.get_users_by_ids(ids)
+
+
+@router.get("/stats", response_model=List[UserTaskStats])
+async def get_users_stats(user_service: UserService = Depends(get_user_service)):
+    """Task counts by status, overdue count and next due date for every user with tasks, from one query;
+    up to STATS_CACHE_TTL_SECONDS stale"""
+    return await user_service.get_user_stats()
+
+
+@router.get("/{user_id}/stats", response_model=UserTaskStats)
+async def get_user_stats(user_id: UUID, user_service: UserService = Depends(get_user_service)):
+    if not await user_service.get_user(user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return (await user_service.get_user_stats(user_id))[0]
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -1,9 +1,10 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from datetime import datetime
 import uuid
 from enum import Enum
 
+from eventual_backend.core.config import settings
 from eventual_backend.models.task import TaskStatus
 
 
@@ -44,7 +45,51 @@ class TaskResponse(TaskInDB):
     pass
 
 
+class TaskSearchResult(TaskResponse):
+    rank: float
+
+
+class TaskEventTypeEnum(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ARCHIVED = "archived"
+
+
+class TaskEventResponse(BaseModel):
+    id: int
+    task_id: uuid.UUID
+    type: TaskEventTypeEnum
+    # The task after the change; before it for deleted and archived
+    task: TaskResponse
+    created_at: datetime
+
+
 class TaskSummary(BaseModel):
     pending: int
     in_progress: int
     done: int
+
+
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+
+class TaskBulkItemStatus(str, Enum):
+    CREATED = "created"
+    EXISTING = "existing"  # idempotency key matched a stored task or an earlier item in the batch
+    USER_NOT_FOUND = "user_not_found"
+
+
+class TaskBulkItemResult(BaseModel):
+    index: int
+    status: TaskBulkItemStatus
+    task: Optional[TaskResponse] = None
+    detail: Optional[str] = None
+
+
+class TaskBulkCreateResponse(BaseModel):
+    created: int
+    existing: int
+    failed: int
+    results: List[TaskBulkItemResult]
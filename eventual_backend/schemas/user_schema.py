@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr, ConfigDict
+from datetime import datetime
 from typing import Optional
 import uuid
 
@@ -25,3 +26,13 @@ class UserInDB(UserBase):
 
 class UserResponse(UserInDB):
     pass
+
+
+class UserTaskStats(BaseModel):
+    user_id: uuid.UUID
+    pending: int
+    in_progress: int
+    done: int
+    # Open tasks past their due date, and the earliest due date still ahead among the open ones
+    overdue: int
+    next_due_date: Optional[datetime] = None
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eventual_backend.core.config import settings
+from eventual_backend.models.job import Job
+from eventual_backend.repositories.job_repository import JobRepository
+from eventual_backend.workers import runner
+
+
+class JobService:
+    def __init__(self, db: AsyncSession):
+        self.repository = JobRepository(db)
+
+    async def enqueue(
+        self, kind: str, payload: dict | None = None, delay: timedelta | None = None, max_attempts: int | None = None
+    ) -> Job:
+        """Store a job for the background workers and return at once; it is durable when this returns.
+
+        payload must be JSON-serializable. The job runs no earlier than delay from now, and is retried with
+        backoff until max_attempts (default JOB_MAX_ATTEMPTS) runs have failed.
+        """
+        job = await self.repository.enqueue(
+            kind, payload or {}, max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS, delay=delay
+        )
+        if delay is None:
+            runner.notify()
+        return job
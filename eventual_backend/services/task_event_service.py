@@ -0,0 +1,149 @@
+from collections import Counter
+from collections.abc import Sequence
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eventual_backend.core.config import settings
+from eventual_backend.core.pagination import decode_cursor, next_cursor
+from eventual_backend.models.task import TaskStatus
+from eventual_backend.models.task_event import TaskEvent, TaskEventType
+from eventual_backend.repositories.task_event_repository import TaskEventRepository
+from eventual_backend.repositories.task_repository import TaskRepository
+
+# Event type names, as replays read them: after CREATED or UPDATED the task is in tasks
+LIVE_TYPES = (TaskEventType.CREATED.name, TaskEventType.UPDATED.name)
+DELETED = TaskEventType.DELETED.name
+ARCHIVED = TaskEventType.ARCHIVED.name
+
+
+class TaskReplayReport(NamedTuple):
+    events: int
+    # Tasks as the log has them (live and archived); deleted tasks are not counted
+    tasks: int
+    # Live tasks that differ from their last event, or that the log has as deleted or archived (only the deleted
+    # ones are removed by fix)
+    drifted: list[UUID]
+    # Tasks the log has as live that are not in tasks
+    missing: list[UUID]
+    # Live tasks with no events at all
+    unlogged: list[UUID]
+    # Archived tasks that differ from the log or are missing from either side; reported, never fixed
+    archive_drifted: list[UUID]
+    # {status: (counter, count from the log)} for every task_status_counts counter that disagrees with the log,
+    # unlogged tasks included
+    status_drift: dict[str, tuple[int, int]]
+
+    @property
+    def consistent(self) -> bool:
+        return not (self.drifted or self.missing or self.unlogged or self.archive_drifted or self.status_drift)
+
+
+def _event_view(event: TaskEvent) -> dict:
+    # data is the row as the triggers saw it, with the status enum's name
+    task = {**event.data, "status": TaskStatus[event.data["status"]].value}
+    return {
+        "id": event.id,
+        "task_id": event.task_id,
+        "type": event.type.value,
+        "task": task,
+        "created_at": event.created_at,
+    }
+
+
+class TaskEventService:
+    def __init__(self, db: AsyncSession, read_db: AsyncSession | None = None):
+        self.db = db
+        self.repository = TaskEventRepository(db)
+        self.read_repository = TaskEventRepository(read_db) if read_db is not None else self.repository
+
+    async def get_task_events(self, task_id: UUID, limit: int = 100, cursor: str | None = None) -> list[dict]:
+        """A task's history, oldest first; it stays available after the task is deleted or archived"""
+        after = decode_cursor(cursor, int)[0] if cursor else None
+        events = await self.read_repository.get_for_task(task_id, after=after, limit=limit)
+        return [_event_view(event) for event in events]
+
+    def next_cursor(self, events: Sequence[dict], limit: int) -> str | None:
+        return next_cursor(events, limit, key=lambda event: (event["id"],))
+
+    async def replay_tasks(self, fix: bool = False, batch_size: int | None = None) -> TaskReplayReport:
+        """Rebuild every task's state from the log and compare it with tasks, tasks_archive and the status
+        counters.
+
+        One pass over the log in id order keeps each task's last event; rows are compared by digest (see
+        TaskEventRepository.stream), so memory is a small tuple per task. Checking runs in a REPEATABLE READ
+        snapshot and does not block writers. fix takes a SHARE lock on the tables, so no write lands in
+        between, then rewrites drifted and missing live tasks from their last event, deletes live tasks the log
+        has as deleted, logs unlogged tasks as created, and overwrites the counters with the log's counts. The
+        repairs are themselves logged.
+        """
+        batch_size = batch_size or settings.TASK_REPLAY_BATCH_SIZE
+        task_repository = TaskRepository(self.db)
+        if fix:
+            await self.db.execute(text("LOCK TABLE tasks, tasks_archive, task_status_counts IN SHARE MODE"))
+        else:
+            await self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        # Also begins the transaction, and the snapshot, that the streams below read in
+        counted = await task_repository.get_task_status_counts()
+
+        # task id -> (last event id, its type name, status name, digest of the task)
+        states: dict[UUID, tuple[int, str, str, int]] = {}
+        events = 0
+        async for rows in self.repository.stream(batch_size):
+            events += len(rows)
+            for event_id, task_id, event_type, status, digest in rows:
+                states[task_id] = (event_id, event_type, status, digest)
+        counts = Counter(TaskStatus[state[2]] for state in states.values() if state[1] != DELETED)
+        tasks = sum(counts.values())
+
+        drifted, unlogged, restore_events, delete_ids = [], [], [], []
+        async for rows in self.repository.stream_documents(batch_size=batch_size):
+            for task_id, status, row_digest in rows:
+                state = states.pop(task_id, None)
+                if state is None:
+                    unlogged.append(task_id)
+                    counts[TaskStatus[status]] += 1
+                    continue
+                event_id, event_type, _, digest = state
+                if event_type in LIVE_TYPES and digest == row_digest:
+                    continue
+                drifted.append(task_id)
+                if event_type in LIVE_TYPES:
+                    restore_events.append(event_id)
+                elif event_type == DELETED:
+                    delete_ids.append(task_id)
+
+        archive_drifted = []
+        async for rows in self.repository.stream_documents(archived=True, batch_size=batch_size):
+            for task_id, _, row_digest in rows:
+                state = states.pop(task_id, None)
+                if state is None or state[1] != ARCHIVED or state[3] != row_digest:
+                    archive_drifted.append(task_id)
+
+        missing = []
+        for task_id, (event_id, event_type, _, _) in states.items():
+            if event_type in LIVE_TYPES:
+                missing.append(task_id)
+                restore_events.append(event_id)
+            elif event_type == ARCHIVED:
+                archive_drifted.append(task_id)
+
+        if fix:
+            await self.repository.restore_tasks(restore_events, delete_ids)
+            await self.repository.adopt_tasks(unlogged)
+            # The counter triggers have applied the repairs
+            counted = await task_repository.get_task_status_counts()
+        status_drift = {
+            status.value: (counted[status], counts[status])
+            for status in TaskStatus
+            if counted[status] != counts[status]
+        }
+        if fix and status_drift:
+            await task_repository.set_task_status_counts({status: counts[status] for status in TaskStatus})
+        await self.db.commit()
+        if fix:
+            for task_id in [*drifted, *missing]:
+                await task_repository.invalidate(task_id)
+        return TaskReplayReport(events, tasks, drifted, missing, unlogged, archive_drifted, status_drift)
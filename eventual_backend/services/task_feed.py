@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from eventual_backend.core.broadcast import Broadcaster, Subscription, sse_message
+from eventual_backend.core.config import settings
+from eventual_backend.core.database import AsyncSessionLocal
+from eventual_backend.core.serialization import dumps
+from eventual_backend.models.task import TASK_CHANGES_CHANNEL, TaskStatus
+from eventual_backend.repositories.task_repository import TaskRepository
+from eventual_backend.schemas.task_schema import TaskStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Last message of a stream whose subscriber fell too far behind or whose changes may have been missed (listener
+# connection lost): the client should reconnect and refetch what it shows
+RESYNC_MESSAGE = sse_message(b"{}", event="resync")
+
+
+class TaskChange(NamedTuple):
+    op: str
+    id: str
+    user_id: str
+    status: TaskStatus
+    old_status: Optional[TaskStatus] = None
+    old_user_id: Optional[str] = None
+
+    @classmethod
+    def from_notification(cls, item: list) -> "TaskChange":
+        op, id, user_id, status, *old = item
+        old_status, old_user_id = old or (None, None)
+        return cls(op, id, user_id, TaskStatus[status], TaskStatus[old_status] if old_status else None, old_user_id)
+
+
+def listen_dsn(database_url: str) -> str:
+    """asyncpg DSN for a SQLAlchemy URL such as postgresql+asyncpg://..."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class TaskFeed:
+    """Task creates, updates and deletes from the task_changes channel, fanned out to in-process subscribers.
+
+    A single connection per process, outside the pool, LISTENs for the notifications sent by the triggers on
+    tasks. Notifications arriving within flush_interval of each other are handled together: the changed rows
+    are fetched in one query and each change is rendered once as an SSE message shared by every subscriber.
+    Publishing never blocks (see Broadcaster); subscribers that fall queue_size messages behind, and all of
+    them when the listener connection is lost, get a final `resync` message. The listener connects on the
+    first subscription and again on the first one after it was lost.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        session_factory: async_sessionmaker[AsyncSession],
+        queue_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.dsn = dsn
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval if flush_interval is not None else settings.TASK_FEED_FLUSH_SECONDS
+        self.broadcaster = Broadcaster(
+            queue_size if queue_size is not None else settings.TASK_STREAM_QUEUE_SIZE, overflow=RESYNC_MESSAGE
+        )
+        self.stats = {"notifications": 0, "changes": 0, "connects": 0}
+        self._connection: Optional[asyncpg.Connection] = None
+        self._connecting = asyncio.Lock()
+        self._pending: list[TaskChange] = []
+        self._flush: Optional[asyncio.Task] = None
+
+    async def subscribe(self, user_id: Optional[UUID] = None, status: Optional[TaskStatusEnum] = None) -> Subscription:
+        """Subscribe to changes of user_id's tasks (all tasks when None) that had or now have status"""
+        await self.start()
+        predicate = None
+        if status is not None:
+            db_status = TaskStatus(status.value)
+
+            def predicate(change: TaskChange) -> bool:
+                return change.status == db_status or change.old_status == db_status
+
+        return self.broadcaster.subscribe(str(user_id) if user_id is not None else None, predicate)
+
+    async def start(self) -> None:
+        async with self._connecting:
+            if self._connection is not None and not self._connection.is_closed():
+                return
+            connection = await asyncpg.connect(self.dsn)
+            connection.add_termination_listener(self._on_lost)
+            await connection.add_listener(TASK_CHANGES_CHANNEL, self._on_notify)
+            self._connection = connection
+            self.stats["connects"] += 1
+
+    async def stop(self) -> None:
+        connection, self._connection = self._connection, None
+        if self._flush is not None:
+            self._flush.cancel()
+        if connection is not None and not connection.is_closed():
+            connection.remove_termination_listener(self._on_lost)
+            await connection.close()
+        self.broadcaster.drop_all(RESYNC_MESSAGE)
+
+    def _on_lost(self, connection: asyncpg.Connection) -> None:
+        if connection is self._connection:
+            logger.warning("Task feed listener connection lost; subscribers told to resync")
+            self._connection = None
+            self.broadcaster.drop_all(RESYNC_MESSAGE)
+
+    def _on_notify(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        self.stats["notifications"] += 1
+        self._pending.extend(TaskChange.from_notification(item) for item in json.loads(payload))
+        if self._flush is None:
+            self._flush = asyncio.create_task(self._flush_pending())
+
+    async def _flush_pending(self) -> None:
+        # One flush at a time, so changes are published in the order they were committed
+        try:
+            while self._pending:
+                await asyncio.sleep(self.flush_interval)
+                changes, self._pending = self._pending, []
+                try:
+                    rows = await self._fetch_rows({change.id for change in changes if change.op != "delete"})
+                except Exception:
+                    logger.exception("Fetching changed tasks failed; subscribers told to resync")
+                    self.broadcaster.drop_all(RESYNC_MESSAGE)
+                    continue
+                for change in changes:
+                    self.publish(change, rows.get(change.id))
+        finally:
+            self._flush = None
+
+    async def _fetch_rows(self, ids: set[str]) -> dict[str, dict]:
+        if not ids:
+            return {}
+        async with self.session_factory() as session:
+            rows = await TaskRepository(session).get_rows_by_ids(ids)
+        return {str(row.id): row._asdict() for row in rows}
+
+    def publish(self, change: TaskChange, task: Optional[dict]) -> int:
+        """Send a change, with the task as it is now (None once deleted), to its subscribers"""
+        self.stats["changes"] += 1
+        data = {"op": change.op, "id": change.id, "user_id": change.user_id, "status": change.status.value}
+        if change.old_status is not None:
+            data["old_status"] = change.old_status.value
+        data["task"] = task
+        keys = (change.user_id, change.old_user_id) if change.old_user_id else (change.user_id,)
+        return self.broadcaster.publish(sse_message(dumps(data), event=change.op), keys, change)
+
+
+_feed: Optional[TaskFeed] = None
+
+
+def get_task_feed() -> TaskFeed:
+    """The process-wide task feed; rows are read from the primary, which replicas may lag behind"""
+    global _feed
+    if _feed is None:
+        _feed = TaskFeed(listen_dsn(settings.DATABASE_URL), AsyncSessionLocal)
+    return _feed
+
+
+async def close_task_feed() -> None:
+    if _feed is not None:
+        await _feed.stop()
@@ -1,15 +1,103 @@
+import csv
+import enum
+import io
+import uuid
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from eventual_backend.core.config import settings
+from eventual_backend.core.exceptions import IdempotencyConflictError, UserNotFoundError
+from eventual_backend.core.pagination import decode_cursor, next_cursor
+from eventual_backend.core.serialization import dumps, packb
 from eventual_backend.models.task import Task, TaskStatus
-from eventual_backend.repositories.task_repository import TaskRepository
-from eventual_backend.schemas.task_schema import TaskCreate, TaskStatusEnum, TaskSummary, TaskUpdate
+from eventual_backend.models.task_archive import TaskArchive
+from eventual_backend.repositories.task_repository import (
+    EXPORT_COLUMNS,
+    RESPONSE_COLUMNS,
+    VERSION_COLUMNS,
+    TaskRepository,
+)
+from eventual_backend.repositories.user_repository import UserRepository
+from eventual_backend.schemas.task_schema import (
+    TaskBulkCreateResponse,
+    TaskBulkItemResult,
+    TaskBulkItemStatus,
+    TaskCreate,
+    TaskResponse,
+    TaskStatusEnum,
+    TaskSummary,
+    TaskUpdate,
+)
+
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+# Inserts retried when a user or a conflicting task is deleted between the checks and the write
+BULK_CREATE_ATTEMPTS = 3
+
+
+def _export_value(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    """value as the naive UTC datetime stored in tasks, for writes and filter bounds alike; naive input is taken
+    to be UTC already"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _list_filters(
+    due_after: datetime | None,
+    due_before: datetime | None,
+    overdue: bool,
+    created_since: datetime | None,
+    include_archived: bool,
+) -> dict:
+    return {
+        "due_after": _naive_utc(due_after),
+        "due_before": _naive_utc(due_before),
+        "overdue": overdue,
+        "created_since": _naive_utc(created_since),
+        "include_archived": include_archived,
+    }
+
+
+def _render_ndjson(rows: Sequence) -> bytes:
+    return b"".join(dumps(dict(zip(EXPORT_FIELDS, row, strict=True))) + b"\n" for row in rows)
+
+
+def _render_msgpack(rows: Sequence) -> bytes:
+    # Concatenated maps, which msgpack.Unpacker reads back one at a time from a stream
+    return b"".join(packb(dict(zip(EXPORT_FIELDS, row, strict=True))) for row in rows)
+
+
+def _render_csv(rows: Sequence, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
 
 
 class TaskService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, read_db: AsyncSession | None = None):
         self.repository = TaskRepository(db)
+        self.user_repository = UserRepository(db)
+        # Lists, exports and the summary tolerate replication lag; lookups by id and writes stay on the primary
+        self.read_repository = TaskRepository(read_db) if read_db is not None else self.repository
 
     def _prepare_task_data(self, data: dict) -> dict:
         """Prepare task data for database operations by converting enums and datetimes"""
@@ -18,18 +106,21 @@ class TaskService:
             data["status"] = TaskStatus(data["status"])
 
         # Convert timezone-aware datetime to naive datetime (UTC)
-        if (
-            "due_date" in data
-            and data["due_date"] is not None
-            and hasattr(data["due_date"], "tzinfo")
-            and data["due_date"].tzinfo is not None
-        ):
-            data["due_date"] = data["due_date"].replace(tzinfo=None)
+        if "due_date" in data:
+            data["due_date"] = _naive_utc(data["due_date"])
 
         return data
 
-    async def get_task(self, task_id: UUID) -> Task | None:
-        return await self.repository.get(task_id)
+    async def get_task(self, task_id: UUID, include_archived: bool = False) -> Task | TaskArchive | None:
+        task = await self.repository.get(task_id)
+        if task is None and include_archived:
+            return await self.repository.get_archived(task_id)
+        return task
+
+    async def get_tasks_by_ids(self, task_ids: Sequence[UUID]) -> list[Task]:
+        """The tasks that exist among task_ids, in the order requested and without duplicates"""
+        found = await self.repository.get_many(task_ids)
+        return [found[task_id] for task_id in dict.fromkeys(task_ids) if task_id in found]
 
     async def get_tasks(
         self,
@@ -38,41 +129,244 @@ class TaskService:
         order_by: str = "due_date_asc",
         skip: int = 0,
         limit: int = 100,
-    ) -> list[Task]:
+        cursor: str | None = None,
+        versions_only: bool = False,
+        due_after: datetime | None = None,
+        due_before: datetime | None = None,
+        overdue: bool = False,
+        created_since: datetime | None = None,
+        include_archived: bool = False,
+    ) -> Sequence[Row]:
+        """Rows of TaskResponse's columns, ready for FastJSONResponse without ORM or Pydantic overhead.
+
+        With versions_only, just (id, due_date, updated_at) per row: enough for the page's ETag and next cursor.
+        Tasks can be restricted to due dates in [due_after, due_before), to overdue ones (not done and due before
+        now) and to those created since a point in time; all of it is evaluated in SQL. Archived tasks are
+        left out unless include_archived.
+        """
         # Convert TaskStatusEnum to TaskStatus if provided
         db_status = None
         if status is not None:
             db_status = TaskStatus(status.value)
 
-        return await self.repository.get_with_filters(
-            status=db_status, user_id=user_id, order_by=order_by, skip=skip, limit=limit
+        after = decode_cursor(cursor, datetime.fromisoformat, UUID) if cursor else None
+        return await self.read_repository.get_rows_with_filters(
+            status=db_status,
+            user_id=user_id,
+            order_by=order_by,
+            skip=skip,
+            limit=limit,
+            after=after,
+            columns=VERSION_COLUMNS if versions_only else RESPONSE_COLUMNS,
+            **_list_filters(due_after, due_before, overdue, created_since, include_archived),
         )
 
-    async def create_task(self, task_create: TaskCreate) -> Task:
-        # Check for idempotency key
-        if task_create.idempotency_key:
-            existing_task = await self.repository.get_by_idempotency_key(task_create.idempotency_key)
-            if existing_task:
-                return existing_task
+    async def search_tasks(
+        self,
+        query: str,
+        mode: str = "text",
+        status: TaskStatusEnum | None = None,
+        user_id: UUID | None = None,
+        order_by: str = "rank",
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> Sequence[Row]:
+        """Rows of TaskSearchResult's columns, best match first by default; cursor comes from search_cursor"""
+        db_status = TaskStatus(status.value) if status is not None else None
+        after = None
+        if cursor:
+            after = decode_cursor(cursor, float if order_by == "rank" else datetime.fromisoformat, UUID)
+        return await self.read_repository.search_rows(
+            query, mode=mode, status=db_status, user_id=user_id, order_by=order_by, limit=limit, after=after
+        )
 
+    def search_cursor(self, rows: Sequence[Row], limit: int, order_by: str = "rank") -> str | None:
+        """Cursor for the page following search results, keyed on (rank, id) or (due_date, id)"""
+        if order_by == "rank":
+            return next_cursor(rows, limit, key=lambda row: (row.rank, row.id))
+        return self.next_cursor(rows, limit)
+
+    async def export_tasks(
+        self,
+        format: str = "ndjson",
+        status: TaskStatusEnum | None = None,
+        user_id: UUID | None = None,
+        order_by: str = "due_date_asc",
+        due_after: datetime | None = None,
+        due_before: datetime | None = None,
+        overdue: bool = False,
+        created_since: datetime | None = None,
+        include_archived: bool = False,
+    ) -> AsyncIterator[str | bytes]:
+        """Render every matching task as NDJSON lines, CSV or MessagePack maps, one chunk per database batch"""
+        db_status = TaskStatus(status.value) if status is not None else None
+        batches = self.read_repository.stream_with_filters(
+            status=db_status,
+            user_id=user_id,
+            order_by=order_by,
+            batch_size=settings.TASK_EXPORT_BATCH_SIZE,
+            **_list_filters(due_after, due_before, overdue, created_since, include_archived),
+        )
+        if format == "csv":
+            yield _render_csv([], header=True)
+        render = {"csv": _render_csv, "msgpack": _render_msgpack}.get(format, _render_ndjson)
+        async for rows in batches:
+            yield render(rows)
+
+    def next_cursor(self, tasks: Sequence[Row], limit: int) -> str | None:
+        """Cursor for the page following tasks, keyed on (due_date, id)"""
+        return next_cursor(tasks, limit, key=lambda task: (task.due_date, task.id))
+
+    async def create_task(self, task_create: TaskCreate) -> Task:
         task_data = task_create.model_dump()
         task_data = self._prepare_task_data(task_data)
+
+        # With an idempotency key, insert-or-fetch in one statement so retries cannot race each other
+        if task_create.idempotency_key:
+            return await self.repository.create_idempotent(task_data)
         return await self.repository.create(task_data)
 
+    async def create_tasks_bulk(self, task_creates: list[TaskCreate]) -> TaskBulkCreateResponse:
+        """Create a batch of tasks with a fixed number of round trips regardless of batch size.
+
+        Referenced users are checked in one query, idempotency keys are resolved in one query (including
+        duplicates within the batch), and the new rows go out as a multi-row INSERT ... RETURNING, or via
+        COPY once the batch reaches TASK_BULK_COPY_THRESHOLD.
+        """
+        existing_users = await self.user_repository.get_existing_ids({task.user_id for task in task_creates})
+        keys = {task.idempotency_key for task in task_creates if task.idempotency_key}
+        existing_tasks = await self.repository.get_by_idempotency_keys(keys) if keys else {}
+
+        results: list[TaskBulkItemResult | None] = [None] * len(task_creates)
+        rows = []
+        row_indexes = []  # position in task_creates of each row
+        batch_keys = {}  # idempotency key -> row id of its first occurrence in this batch
+        duplicates = []  # (index, row id) of repeated keys within the batch
+        for index, task_create in enumerate(task_creates):
+            key = task_create.idempotency_key
+            if task_create.user_id not in existing_users:
+                results[index] = TaskBulkItemResult(
+                    index=index, status=TaskBulkItemStatus.USER_NOT_FOUND, detail="User not found"
+                )
+            elif key and key in existing_tasks:
+                results[index] = TaskBulkItemResult(
+                    index=index,
+                    status=TaskBulkItemStatus.EXISTING,
+                    task=TaskResponse.model_validate(existing_tasks[key]),
+                )
+            elif key and key in batch_keys:
+                duplicates.append((index, batch_keys[key]))
+            else:
+                row = self._prepare_task_data(task_create.model_dump())
+                row["id"] = uuid.uuid4()
+                rows.append(row)
+                row_indexes.append(index)
+                if key:
+                    batch_keys[key] = row["id"]
+
+        # A user deleted since the check above fails the whole insert on the foreign key: recheck the users and
+        # retry without their rows
+        for attempt in range(BULK_CREATE_ATTEMPTS):
+            try:
+                if len(rows) >= settings.TASK_BULK_COPY_THRESHOLD:
+                    created = await self.repository.copy_many(rows)
+                else:
+                    created = await self.repository.create_many(rows)
+                break
+            except UserNotFoundError:
+                if attempt == BULK_CREATE_ATTEMPTS - 1:
+                    raise
+                existing_users = await self.user_repository.get_existing_ids({row["user_id"] for row in rows})
+                kept = []
+                for index, row in zip(row_indexes, rows, strict=True):
+                    if row["user_id"] in existing_users:
+                        kept.append((index, row))
+                    else:
+                        results[index] = TaskBulkItemResult(
+                            index=index, status=TaskBulkItemStatus.USER_NOT_FOUND, detail="User not found"
+                        )
+                row_indexes = [index for index, _ in kept]
+                rows = [row for _, row in kept]
+
+        tasks_by_id = {task.id: TaskResponse.model_validate(task) for task in created}
+        created_count = len(tasks_by_id)
+
+        # Rows skipped by ON CONFLICT lost a race with a concurrent request storing the same idempotency key.
+        # If that task is deleted before it can be read, the key is free again and the row is inserted after all
+        conflicted = {row["idempotency_key"]: row for row in rows if row["id"] not in tasks_by_id}
+        existing_ids = set()
+        for _ in range(BULK_CREATE_ATTEMPTS):
+            if not conflicted:
+                break
+            stored = await self.repository.get_by_idempotency_keys(conflicted)
+            for key in stored.keys() & conflicted.keys():
+                row_id = conflicted.pop(key)["id"]
+                tasks_by_id[row_id] = TaskResponse.model_validate(stored[key])
+                existing_ids.add(row_id)
+            for task in await self.repository.create_many(list(conflicted.values())):
+                tasks_by_id[task.id] = TaskResponse.model_validate(task)
+                created_count += 1
+                del conflicted[task.idempotency_key]
+        if conflicted:
+            raise IdempotencyConflictError(next(iter(conflicted)))
+
+        for index, row in zip(row_indexes, rows, strict=True):
+            status = TaskBulkItemStatus.EXISTING if row["id"] in existing_ids else TaskBulkItemStatus.CREATED
+            results[index] = TaskBulkItemResult(index=index, status=status, task=tasks_by_id[row["id"]])
+        for index, row_id in duplicates:
+            first = tasks_by_id.get(row_id)
+            if first is None:
+                # Its first occurrence belonged to a user deleted in the meantime
+                results[index] = TaskBulkItemResult(
+                    index=index, status=TaskBulkItemStatus.USER_NOT_FOUND, detail="User not found"
+                )
+            else:
+                results[index] = TaskBulkItemResult(index=index, status=TaskBulkItemStatus.EXISTING, task=first)
+
+        return TaskBulkCreateResponse(
+            created=created_count,
+            existing=sum(result.status == TaskBulkItemStatus.EXISTING for result in results),
+            failed=sum(result.status == TaskBulkItemStatus.USER_NOT_FOUND for result in results),
+            results=results,
+        )
+
     async def update_task(self, task_id: UUID, task_update: TaskUpdate) -> Task | None:
-        task = await self.repository.get(task_id)
-        if not task:
-            return None
         update_data = task_update.model_dump(exclude_unset=True)
         update_data = self._prepare_task_data(update_data)
-        return await self.repository.update(task, update_data)
+        return await self.repository.update(task_id, update_data)
 
     async def delete_task(self, task_id: UUID) -> bool:
         return await self.repository.delete(task_id)
 
-    async def get_user_tasks(self, user_id: UUID, skip: int = 0, limit: int = 100) -> list[Task]:
-        return await self.repository.get_by_user_id(user_id, skip, limit)
+    async def get_user_tasks(
+        self, user_id: UUID, skip: int = 0, limit: int = 100, versions_only: bool = False
+    ) -> Sequence[Row]:
+        columns = VERSION_COLUMNS if versions_only else RESPONSE_COLUMNS
+        return await self.read_repository.get_rows_by_user_id(user_id, skip, limit, columns=columns)
+
+    async def archive_done_tasks(
+        self,
+        older_than: timedelta | None = None,
+        batch_size: int | None = None,
+        max_batches: int | None = None,
+    ) -> int:
+        """Move done tasks older than older_than (default TASK_ARCHIVE_AFTER_DAYS) to the archive, one short
+        transaction per batch, until none are left or max_batches ran. Returns the number of tasks moved."""
+        if older_than is None:
+            older_than = timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+        batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+        moved = batches = 0
+        while max_batches is None or batches < max_batches:
+            ids = await self.repository.archive_done(older_than, batch_size)
+            moved += len(ids)
+            batches += 1
+            if len(ids) < batch_size:
+                break
+        return moved
 
     async def get_task_summary(self) -> TaskSummary:
-        summary_data = await self.repository.get_task_summary()
+        summary_data = await self.read_repository.get_task_summary()
         return TaskSummary(**summary_data)
+
+    async def reconcile_task_summary(self, fix: bool = False) -> dict[str, tuple[int, int]]:
+        return await self.repository.reconcile_task_summary(fix=fix)
@@ -1,35 +1,66 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from uuid import UUID
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from eventual_backend.core.cache import get_stats_cache
+from eventual_backend.core.pagination import decode_cursor, next_cursor
 from eventual_backend.models.user import User
 from eventual_backend.schemas.user_schema import UserCreate, UserUpdate
-from eventual_backend.repositories.user_repository import UserRepository
+from eventual_backend.repositories.task_repository import TaskRepository, empty_user_task_summary
+from eventual_backend.repositories.user_repository import RESPONSE_COLUMNS, UserRepository
 
 
 class UserService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
         self.repository = UserRepository(db)
+        self.read_repository = UserRepository(read_db) if read_db is not None else self.repository
+        # Statistics tolerate replication lag, and are cached for a few seconds on top of it
+        self.task_repository = TaskRepository(read_db if read_db is not None else db)
+        self.stats_cache = get_stats_cache()
 
     async def get_user(self, user_id: UUID) -> Optional[User]:
         return await self.repository.get(user_id)
 
+    async def get_users_by_ids(self, user_ids: Sequence[UUID]) -> List[User]:
+        """The users that exist among user_ids, in the order requested and without duplicates"""
+        found = await self.repository.get_many(user_ids)
+        return [found[user_id] for user_id in dict.fromkeys(user_ids) if user_id in found]
+
     async def get_user_by_email(self, email: str) -> Optional[User]:
         return await self.repository.get_by_email(email)
 
-    async def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        return await self.repository.get_all(skip, limit)
+    async def get_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Sequence[Row]:
+        """Rows of UserResponse's columns, ready for FastJSONResponse without ORM or Pydantic overhead"""
+        after = decode_cursor(cursor, UUID)[0] if cursor else None
+        return await self.read_repository.get_all_rows(RESPONSE_COLUMNS, skip, limit, after=after)
+
+    def next_cursor(self, users: Sequence[Row], limit: int) -> Optional[str]:
+        """Cursor for the page following users, keyed on id"""
+        return next_cursor(users, limit, key=lambda user: (user.id,))
+
+    async def get_user_stats(self, user_id: Optional[UUID] = None) -> List[dict]:
+        """Task statistics of every user with tasks, in id order, or of user_id alone (zeros if they have none).
+        Computed by one aggregate query and cached for STATS_CACHE_TTL_SECONDS."""
+        key = f"user_stats:{user_id or 'all'}"
+        cached = await self.stats_cache.get(key)
+        if cached is not None:
+            return cached["users"]
+
+        summaries = await self.task_repository.get_user_task_summaries(user_id)
+        if user_id is not None and not summaries:
+            summaries = {user_id: empty_user_task_summary()}
+        users = [{"user_id": summary_user_id, **summary} for summary_user_id, summary in summaries.items()]
+        await self.stats_cache.set(key, {"users": users})
+        return users
 
     async def create_user(self, user_create: UserCreate) -> User:
         user_data = user_create.model_dump()
         return await self.repository.create(user_data)
 
     async def update_user(self, user_id: UUID, user_update: UserUpdate) -> Optional[User]:
-        user = await self.repository.get(user_id)
-        if not user:
-            return None
         update_data = user_update.model_dump(exclude_unset=True)
-        return await self.repository.update(user, update_data)
+        return await self.repository.update(user_id, update_data)
 
     async def delete_user(self, user_id: UUID) -> bool:
         return await self.repository.delete(user_id)
@@ -8,7 +8,8 @@ from httpx import AsyncClient
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from eventual_backend.core.database import Base, get_db
+from eventual_backend.core.cache import get_cache, get_stats_cache
+from eventual_backend.core.database import Base, get_db, get_db_read
 from eventual_backend.main import app
 
 # Test database - PostgreSQL
@@ -55,21 +56,30 @@ async def clean_database():
     # Clean before test
     async with TestingSessionLocal() as session:
         await session.execute(text("DELETE FROM tasks"))
+        await session.execute(text("DELETE FROM tasks_archive"))
         await session.execute(text("DELETE FROM users"))
+        await session.execute(text("DELETE FROM jobs"))
+        await session.execute(text("DELETE FROM task_events"))
         await session.commit()
+    await get_cache().clear()
+    await get_stats_cache().clear()
 
     yield
 
     # Clean after test
     async with TestingSessionLocal() as session:
         await session.execute(text("DELETE FROM tasks"))
+        await session.execute(text("DELETE FROM tasks_archive"))
         await session.execute(text("DELETE FROM users"))
+        await session.execute(text("DELETE FROM jobs"))
+        await session.execute(text("DELETE FROM task_events"))
         await session.commit()
 
 
 @pytest_asyncio.fixture
 async def client():
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_read] = override_get_db
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
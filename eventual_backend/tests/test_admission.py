@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from eventual_backend.core.admission import AdmissionControl, AdmissionMiddleware, TokenBuckets
+from eventual_backend.core.metrics import ADMISSION_REQUESTS
+
+
+def _app(control: AdmissionControl, release: asyncio.Event) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, control=control)
+
+    @app.get("/work")
+    async def work():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+class TestAdmission:
+    @pytest.mark.asyncio
+    async def test_rate_limit_per_client(self):
+        """Test that a client over its burst gets a 429 with Retry-After while other clients are unaffected"""
+        release = asyncio.Event()
+        release.set()
+        control = AdmissionControl(None, buckets=TokenBuckets(rate=0.5, burst=2), client_header="X-Forwarded-For")
+        async with AsyncClient(app=_app(control, release), base_url="http://test") as client:
+            first = {"X-Forwarded-For": "10.0.0.1, 10.0.0.254"}
+            assert [(await client.get("/work", headers=first)).status_code for _ in range(2)] == [200, 200]
+            response = await client.get("/work", headers=first)
+            assert response.status_code == 429
+            assert response.headers["retry-after"] == "2"
+
+            assert (await client.get("/work", headers={"X-Forwarded-For": "10.0.0.2"})).status_code == 200
+            assert (await client.get("/health", headers=first)).status_code == 200
+        assert control.outcomes["rate_limited"] == 1
+        assert control.outcomes["served"] == 3
+
+    @pytest.mark.asyncio
+    async def test_cap_queue_and_shedding(self):
+        """Test that requests beyond the cap queue, are served in order as slots free up, and are shed with a
+        503 once the queue is full or they have waited too long"""
+        release = asyncio.Event()
+        control = AdmissionControl(2, queue_size=1, queue_timeout=5.0, retry_after=3)
+        shed_before = ADMISSION_REQUESTS.series.get(("queue_full",), 0)
+        async with AsyncClient(app=_app(control, release), base_url="http://test") as client:
+            requests = [asyncio.create_task(client.get("/work")) for _ in range(3)]
+            while control.stats["queued"] < 1:
+                await asyncio.sleep(0.01)
+            assert control.stats["in_flight"] == 2
+
+            response = await client.get("/work")
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "3"
+
+            release.set()
+            assert [(await request).status_code for request in requests] == [200, 200, 200]
+        assert control.stats == {"max_in_flight": 2, "in_flight": 0, "queued": 0, "rate_limited_clients": 0}
+        assert ADMISSION_REQUESTS.series[("queue_full",)] == shed_before + 1
+
+        release.clear()
+        control = AdmissionControl(1, queue_size=1, queue_timeout=0.05)
+        async with AsyncClient(app=_app(control, release), base_url="http://test") as client:
+            running = asyncio.create_task(client.get("/work"))
+            while control.stats["in_flight"] < 1:
+                await asyncio.sleep(0.01)
+            assert (await client.get("/work")).status_code == 503
+            assert control.outcomes["queue_timeout"] == 1
+            release.set()
+            assert (await running).status_code == 200
+        assert control.stats["in_flight"] == 0
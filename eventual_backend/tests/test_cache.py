@@ -0,0 +1,106 @@
+import asyncio
+import uuid
+
+import pytest
+
+from eventual_backend.core.cache import CacheBackend, LRUCache, NullCache, RedisCache
+from eventual_backend.repositories.user_repository import UserRepository
+from eventual_backend.tests.conftest import TestingSessionLocal
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.asyncio.Redis"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value.encode()
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+
+class TestCache:
+    def test_backend_missing_a_hook_cannot_be_created(self):
+        """Test that a backend leaving out a storage hook fails when created rather than on its first miss"""
+
+        class NoDelete(CacheBackend):
+            async def clear(self):
+                pass
+
+            async def _get(self, key):
+                return None
+
+            async def _set(self, key, value):
+                pass
+
+        with pytest.raises(TypeError, match="_delete"):
+            NoDelete()
+
+    @pytest.mark.asyncio
+    async def test_lru_cache_evicts_least_recently_used(self):
+        """Test that the LRU backend stays bounded and keeps recently read entries"""
+        cache = LRUCache(max_entries=2, ttl=60)
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        assert await cache.get("a") == {"v": 1}
+        await cache.set("c", {"v": 3})
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == {"v": 1}
+        assert len(cache) == 2
+        assert cache.stats.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_cache_expires_entries(self):
+        """Test that entries older than the TTL are treated as misses"""
+        cache = LRUCache(max_entries=10, ttl=0)
+        await cache.set("a", {"v": 1})
+        assert await cache.get("a") is None
+        assert cache.stats.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_repository_reads_through_redis_cache(self, client):
+        """Test repository lookups served from a Redis-protocol backend, and invalidation on update"""
+        user_data = {"name": "Cached", "email": f"cached-{uuid.uuid4().hex[:8]}@example.com"}
+        response = await client.post("/api/users/", json=user_data)
+        user_id = uuid.UUID(response.json()["id"])
+        cache = RedisCache(FakeRedis(), ttl=60)
+
+        async with TestingSessionLocal() as session:
+            repository = UserRepository(session, cache=cache)
+            assert (await repository.get(user_id)).name == "Cached"
+            assert (cache.stats.hits, cache.stats.misses) == (0, 1)
+
+        async with TestingSessionLocal() as session:
+            repository = UserRepository(session, cache=cache)
+            user = await repository.get(user_id)
+            assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+            assert user.id == user_id and user.name == "Cached"
+
+            await repository.update(user_id, {"name": "Renamed"})
+            assert f"eventual:users:{user_id}" not in cache.client.store
+            assert (await repository.get(user_id)).name == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_dataloader_coalesces_concurrent_gets(self, client):
+        """Test that concurrent repository gets on one session are served by a single IN query"""
+        user_ids = []
+        for name in ("One", "Two", "Three"):
+            user_data = {"name": name, "email": f"loader-{uuid.uuid4().hex[:8]}@example.com"}
+            user_ids.append(uuid.UUID((await client.post("/api/users/", json=user_data)).json()["id"]))
+
+        async with TestingSessionLocal() as session:
+            repository = UserRepository(session, cache=NullCache())
+            users = await asyncio.gather(*(repository.get(user_id) for user_id in [*user_ids, uuid.uuid4()]))
+            assert [user.name if user else None for user in users] == ["One", "Two", "Three", None]
+            assert repository.loader.batches == 1
+            # Shared by every repository on the session, and batches are not memoized
+            assert UserRepository(session, cache=NullCache()).loader is repository.loader
+            assert (await repository.get(user_ids[0])).name == "One"
+            assert repository.loader.batches == 2
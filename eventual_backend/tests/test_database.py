@@ -0,0 +1,108 @@
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from eventual_backend.core.database import Base, InstrumentedQueuePool, ReplicaRouter, get_db_read, pool_status
+from eventual_backend.main import app
+from eventual_backend.models.task import Task, TaskStatus
+from eventual_backend.models.user import User
+from eventual_backend.tests.conftest import TEST_DATABASE_URL, TestingSessionLocal
+
+# A second database standing in for a replica; routing tests are skipped without it
+TEST_REPLICA_DATABASE_URL = os.getenv("TEST_REPLICA_DATABASE_URL")
+UNREACHABLE_DATABASE_URL = "postgresql+asyncpg://postgres@127.0.0.1:1/unreachable"
+
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_pool_records_checkouts_and_timeouts(self):
+        """Test that the instrumented pool counts checkouts and reports an exhausted pool as a timeout"""
+        engine = create_async_engine(
+            TEST_DATABASE_URL, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+        )
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                status = pool_status(engine.pool)
+                assert status["checked_out"] == 1
+                assert status["idle"] == 0
+
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+
+            status = pool_status(engine.pool)
+            assert status["checked_out"] == 0
+            assert status["idle"] == 1
+            assert status["checkouts"] == 1
+            assert status["timeouts"] == 1
+            assert status["wait_ms_max"] >= status["wait_ms_p50"] > 0
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_pool_health_endpoint(self, client):
+        """Test the pool telemetry endpoint"""
+        response = await client.get("/health/pool")
+        assert response.status_code == 200
+        data = response.json()
+        for key in ("size", "checked_out", "idle", "overflow", "timeouts", "wait_ms_p95"):
+            assert key in data
+
+
+class TestReplicaRouting:
+    @pytest.mark.asyncio
+    async def test_round_robin_skips_unhealthy_replicas(self):
+        """Test that reads rotate over healthy replicas and fall back to the primary when none are left"""
+        router = ReplicaRouter([TEST_DATABASE_URL, UNREACHABLE_DATABASE_URL, TEST_DATABASE_URL], TestingSessionLocal)
+        try:
+            await router.check()
+            assert router.healthy == [True, False, True]
+            picks = [router.session_factory() for _ in range(4)]
+            assert picks == [router.sessionmakers[0], router.sessionmakers[2]] * 2
+
+            router.healthy = [False, False, False]
+            assert router.session_factory() is TestingSessionLocal
+            assert [replica["healthy"] for replica in router.status()] == [False, False, False]
+        finally:
+            await router.dispose()
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not TEST_REPLICA_DATABASE_URL, reason="TEST_REPLICA_DATABASE_URL not set")
+    async def test_reads_use_replica_and_lookups_use_primary(self, client):
+        """Test that list endpoints read from the replica session while lookups by id stay on the primary"""
+        replica = create_async_engine(TEST_REPLICA_DATABASE_URL)
+        ReplicaSession = async_sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_db_read():
+            async with ReplicaSession() as session:
+                yield session
+
+        async with replica.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            # The row exists only on the "replica"
+            async with ReplicaSession() as session:
+                user = User(id=uuid.uuid4(), name="Replica User", email="replica@example.com", phone_number="+1")
+                session.add(user)
+                await session.flush()
+                task = Task(
+                    title="Replica Task", status=TaskStatus.PENDING, due_date=datetime(2030, 1, 1), user_id=user.id
+                )
+                session.add(task)
+                await session.commit()
+
+            app.dependency_overrides[get_db_read] = override_get_db_read
+            listed = (await client.get("/api/tasks/")).json()
+            assert [item["id"] for item in listed] == [str(task.id)]
+            assert (await client.get("/api/tasks/summary/")).json()["pending"] == 1
+            assert (await client.get(f"/api/tasks/{task.id}")).status_code == 404
+        finally:
+            async with replica.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+            await replica.dispose()
@@ -0,0 +1,89 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from eventual_backend.core.compression import choose_encoding
+from eventual_backend.core.serialization import prefers_msgpack
+
+msgpack = pytest.importorskip("msgpack")
+
+
+async def _create_tasks(client, count: int) -> str:
+    user_data = {"name": "Encoding User", "email": f"encoding-{uuid.uuid4().hex[:8]}@example.com"}
+    user_id = (await client.post("/api/users/", json=user_data)).json()["id"]
+    tasks = [{"title": f"Task {i}", "due_date": "2030-01-01T00:00:00", "user_id": user_id} for i in range(count)]
+    response = await client.post("/api/tasks/bulk", json={"tasks": tasks})
+    assert response.status_code == 200
+    return user_id
+
+
+class TestEncoding:
+    def test_negotiation(self):
+        """Test Accept and Accept-Encoding q-value handling"""
+        assert prefers_msgpack("application/msgpack")
+        assert prefers_msgpack("application/msgpack, application/json;q=0.9")
+        assert not prefers_msgpack("application/json, application/msgpack;q=0.5")
+        assert not prefers_msgpack("*/*")
+        assert not prefers_msgpack(None)
+
+        assert choose_encoding("gzip") == "gzip"
+        assert choose_encoding("gzip;q=0.5, identity") == "gzip"
+        assert choose_encoding("gzip;q=0") is None
+        assert choose_encoding("identity") is None
+
+    @pytest.mark.asyncio
+    async def test_list_tasks_msgpack(self, client):
+        """Test that list endpoints return MessagePack when asked for it, and JSON otherwise"""
+        user_id = await _create_tasks(client, 3)
+
+        response = await client.get("/api/tasks/", headers={"Accept": "application/msgpack"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+        assert "Accept" in response.headers["vary"]
+        tasks = msgpack.unpackb(response.content, timestamp=3)
+        assert len(tasks) == 3
+        assert uuid.UUID(bytes=tasks[0]["user_id"]) == uuid.UUID(user_id)
+        assert tasks[0]["due_date"] == datetime.fromisoformat("2030-01-01T00:00:00+00:00")
+
+        json_response = await client.get("/api/tasks/")
+        assert json_response.headers["content-type"] == "application/json"
+        assert json_response.json()[0]["title"] == tasks[0]["title"]
+
+        users = await client.get("/api/users/", headers={"Accept": "application/msgpack"})
+        assert msgpack.unpackb(users.content)[0]["name"] == "Encoding User"
+
+    @pytest.mark.asyncio
+    async def test_compression_threshold(self, client):
+        """Test that responses are compressed from the size threshold on, and small ones are left alone"""
+        await _create_tasks(client, 50)
+
+        small = await client.get("/api/tasks/?limit=1", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+
+        response = await client.get("/api/tasks/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()) == 50
+
+        identity = await client.get("/api/tasks/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        assert identity.json() == response.json()
+
+    @pytest.mark.asyncio
+    async def test_export_msgpack_zstd(self, client):
+        """Test a streamed MessagePack export compressed with zstd"""
+        zstandard = pytest.importorskip("zstandard")
+        await _create_tasks(client, 20)
+
+        response = await client.get(
+            "/api/tasks/export", headers={"Accept": "application/msgpack", "Accept-Encoding": "zstd"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+        assert response.headers["content-encoding"] == "zstd"
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(response.content)
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(body)
+        assert sorted(row["title"] for row in unpacker) == sorted(f"Task {i}" for i in range(20))
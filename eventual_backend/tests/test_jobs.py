@@ -0,0 +1,178 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from eventual_backend.models.job import Job, JobStatus
+from eventual_backend.repositories.job_repository import JobRepository
+from eventual_backend.services.job_service import JobService
+from eventual_backend.tests.conftest import TestingSessionLocal
+from eventual_backend.workers.runner import JobRunner
+
+
+def make_runner(handlers: dict, **options) -> JobRunner:
+    options = {"concurrency": 2, "poll_interval": 0.05, "retry_base": 0.01, "retry_max": 0.01, **options}
+    return JobRunner(TestingSessionLocal, handlers=handlers, **options)
+
+
+async def enqueue(kind: str, payload: dict | None = None, **options) -> Job:
+    async with TestingSessionLocal() as session:
+        return await JobService(session).enqueue(kind, payload, **options)
+
+
+async def stored_jobs() -> list[Job]:
+    async with TestingSessionLocal() as session:
+        return (await session.execute(select(Job))).scalars().all()
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+class TestJobs:
+    @pytest.mark.asyncio
+    async def test_jobs_run_and_are_deleted(self):
+        """Test that enqueued jobs reach their handler with their payload and are removed once done"""
+        seen = []
+
+        async def record(session, payload):
+            seen.append(payload["n"])
+
+        runner = make_runner({"record": record})
+        runner.start()
+        try:
+            for n in range(5):
+                await enqueue("record", {"n": n})
+            await wait_for(lambda: runner.stats["succeeded"] == 5)
+        finally:
+            await runner.stop()
+        assert sorted(seen) == [0, 1, 2, 3, 4]
+        assert await stored_jobs() == []
+
+    @pytest.mark.asyncio
+    async def test_worker_survives_failure_to_record_outcome(self):
+        """Test that a worker whose outcome write fails logs it and goes on to run the next job"""
+        seen = []
+
+        async def record(session, payload):
+            seen.append(payload["n"])
+
+        runner = make_runner({"record": record}, concurrency=1)
+        finish = runner._finish
+        failures = []
+
+        async def flaky_finish(job, outcome, error=None):
+            if not failures:
+                failures.append(job.id)
+                raise ConnectionError("database went away")
+            await finish(job, outcome, error)
+
+        runner._finish = flaky_finish
+        runner.start()
+        try:
+            await enqueue("record", {"n": 0})
+            await wait_for(lambda: failures)
+            await enqueue("record", {"n": 1})
+            await wait_for(lambda: runner.stats["succeeded"] == 1)
+            assert not runner._workers[0].done()
+        finally:
+            await runner.stop()
+        assert seen == [0, 1]
+        # The first job is left RUNNING for its lease to reclaim
+        assert [(job.id, job.status) for job in await stored_jobs()] == [(failures[0], JobStatus.RUNNING)]
+
+    @pytest.mark.asyncio
+    async def test_failing_jobs_retry_then_fail(self):
+        """Test retries with backoff until success, and FAILED with the last error after max_attempts"""
+        calls = {"flaky": 0, "broken": 0}
+
+        async def flaky(session, payload):
+            calls["flaky"] += 1
+            if calls["flaky"] < 3:
+                raise ConnectionError("try again")
+
+        async def broken(session, payload):
+            calls["broken"] += 1
+            raise ValueError("bad payload")
+
+        runner = make_runner({"flaky": flaky, "broken": broken})
+        runner.start()
+        try:
+            await enqueue("flaky")
+            await enqueue("broken", max_attempts=2)
+            await enqueue("unknown", max_attempts=1)
+            await wait_for(lambda: runner.stats["succeeded"] == 1 and runner.stats["failed"] == 2)
+        finally:
+            await runner.stop()
+
+        assert calls == {"flaky": 3, "broken": 2}
+        assert runner.stats["retried"] == 3
+        failed = {job.kind: job for job in await stored_jobs()}
+        assert set(failed) == {"broken", "unknown"}
+        assert failed["broken"].status == JobStatus.FAILED
+        assert failed["broken"].attempts == 2
+        assert failed["broken"].last_error == "ValueError: bad payload"
+        assert "No handler" in failed["unknown"].last_error
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_then_releases(self):
+        """Test that stop() lets short jobs finish and puts back jobs still running at the drain timeout"""
+        started = asyncio.Event()
+        finished = []
+
+        async def short(session, payload):
+            started.set()
+            await asyncio.sleep(0.1)
+            finished.append("short")
+
+        async def endless(session, payload):
+            started.set()
+            await asyncio.sleep(60)
+
+        runner = make_runner({"short": short}, concurrency=1)
+        runner.start()
+        await enqueue("short")
+        await asyncio.wait_for(started.wait(), 5)
+        await runner.stop()
+        assert finished == ["short"]
+        assert await stored_jobs() == []
+
+        started.clear()
+        runner = make_runner({"endless": endless}, concurrency=1, drain_timeout=0.1)
+        runner.start()
+        job = await enqueue("endless")
+        await asyncio.wait_for(started.wait(), 5)
+        await runner.stop()
+        assert runner.stats["released"] == 1
+        [released] = await stored_jobs()
+        assert (released.id, released.status, released.attempts) == (job.id, JobStatus.QUEUED, 0)
+
+    @pytest.mark.asyncio
+    async def test_claims_skip_locked_and_expired_leases(self):
+        """Test that concurrent claims take distinct jobs, delayed jobs wait, and an expired lease is reclaimed"""
+        for _ in range(3):
+            await enqueue("noop")
+        await enqueue("later", delay=timedelta(hours=1))
+
+        sessions = [TestingSessionLocal() for _ in range(4)]
+        claimed = await asyncio.gather(*(JobRepository(session).claim(timedelta(minutes=5)) for session in sessions))
+        for session in sessions:
+            await session.close()
+        assert sorted(job.kind for job in claimed if job) == ["noop", "noop", "noop"]
+        assert len({job.id for job in claimed if job}) == 3
+
+        # A worker that died mid-job: once its lease runs out the job is claimed again, and the first worker's
+        # late completion no longer matches it
+        first = next(job for job in claimed if job)
+        async with TestingSessionLocal() as session:
+            await session.execute(update(Job).where(Job.id == first.id).values(run_at=Job.created_at))
+            await session.commit()
+            repository = JobRepository(session)
+            reclaimed = await repository.claim(timedelta(minutes=5))
+            assert (reclaimed.id, reclaimed.attempts) == (first.id, 2)
+            assert not await repository.complete(first.id, first.attempts)
+            assert await repository.complete(reclaimed.id, reclaimed.attempts)
@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from eventual_backend.core.metrics import QUERY_DURATION, REQUEST_DURATION, REQUEST_QUERIES
+from eventual_backend.tests.conftest import TestingSessionLocal
+
+
+def _count(histogram, *labels) -> int:
+    series = histogram.series.get(labels)
+    return sum(series[0]) if series else 0
+
+
+class TestMetrics:
+    @pytest.mark.asyncio
+    async def test_requests_recorded_by_route_template(self, client):
+        """Test that requests are labelled with the route template, not the raw path"""
+        before = _count(REQUEST_DURATION, "GET", "/api/tasks/{task_id}", "404")
+        for _ in range(3):
+            await client.get(f"/api/tasks/{uuid.uuid4()}")
+        await client.get("/no/such/path")
+
+        assert _count(REQUEST_DURATION, "GET", "/api/tasks/{task_id}", "404") == before + 3
+        assert _count(REQUEST_DURATION, "GET", "unmatched", "404") >= 1
+
+    @pytest.mark.asyncio
+    async def test_queries_attributed_to_request(self, client):
+        """Test that SQL statements executed while serving a request are counted against its route"""
+        series_before = REQUEST_QUERIES.series.get(("/api/users/",))
+        queries_before = series_before[1] if series_before else 0
+
+        user_data = {"name": "Metrics User", "email": f"metrics-{uuid.uuid4().hex[:8]}@example.com"}
+        response = await client.post("/api/users/", json=user_data)
+        assert response.status_code == 201
+
+        assert REQUEST_QUERIES.series[("/api/users/",)][1] > queries_before
+
+    @pytest.mark.asyncio
+    async def test_failing_statements_leave_no_timing_state(self):
+        """Test that a statement that raises leaves nothing behind on the pooled connection and does not skew
+        the timing of the next one"""
+        async with TestingSessionLocal() as session:
+            # The pooled connection's info dict, which outlives the checkout
+            info = (await session.connection()).info
+            with pytest.raises(DBAPIError):
+                await session.execute(text("SELECT 1 / 0"))
+            await session.rollback()
+            before = _count(QUERY_DURATION, "SELECT")
+            await session.execute(text("SELECT pg_sleep(0.02)"))
+            assert _count(QUERY_DURATION, "SELECT") == before + 1
+            assert not info.get("query_start")
+            total = QUERY_DURATION.series[("SELECT",)][1]
+            await session.execute(text("SELECT 1"))
+            assert QUERY_DURATION.series[("SELECT",)][1] - total < 0.02
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint_prometheus_format(self, client):
+        """Test the Prometheus text exposition"""
+        await client.get("/health")
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/health",status="200",le="+Inf"}' in body
+        assert "db_query_duration_seconds_count" in body
+        assert "db_pool_checked_out" in body
+        assert "entity_cache_hits" in body
+        assert "admission_in_flight" in body
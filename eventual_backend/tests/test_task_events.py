@@ -0,0 +1,116 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from eventual_backend.core.pagination import NEXT_CURSOR_HEADER
+from eventual_backend.services.task_event_service import TaskEventService
+from eventual_backend.services.task_service import TaskService
+from eventual_backend.tests.conftest import TestingSessionLocal
+
+
+async def replay(fix: bool = False):
+    async with TestingSessionLocal() as session:
+        return await TaskEventService(session).replay_tasks(fix=fix, batch_size=2)
+
+
+class TestTaskEvents:
+    @pytest_asyncio.fixture
+    async def create_test_user(self, client):
+        user_data = {"name": "Event User", "email": f"eventuser-{uuid.uuid4().hex[:8]}@example.com"}
+        response = await client.post("/api/users/", json=user_data)
+        return response.json()["id"]
+
+    @pytest.mark.asyncio
+    async def test_task_history(self, client, create_test_user):
+        """Test that every change is logged with the task's state, and the history outlives the task"""
+        task_data = {"title": "Logged", "due_date": "2024-12-01T00:00:00", "user_id": create_test_user}
+        task_id = (await client.post("/api/tasks/", json=task_data)).json()["id"]
+        await client.put(f"/api/tasks/{task_id}", json={"status": "in_progress"})
+        await client.put(f"/api/tasks/{task_id}", json={"title": "Renamed", "status": "done"})
+        await client.delete(f"/api/tasks/{task_id}")
+
+        response = await client.get(f"/api/tasks/{task_id}/events", params={"limit": 3})
+        assert response.status_code == 200
+        events = response.json()
+        response = await client.get(
+            f"/api/tasks/{task_id}/events", params={"limit": 3, "cursor": response.headers[NEXT_CURSOR_HEADER]}
+        )
+        assert NEXT_CURSOR_HEADER not in response.headers
+        events += response.json()
+
+        assert [event["type"] for event in events] == ["created", "updated", "updated", "deleted"]
+        assert [(event["task"]["title"], event["task"]["status"]) for event in events] == [
+            ("Logged", "pending"),
+            ("Logged", "in_progress"),
+            ("Renamed", "done"),
+            ("Renamed", "done"),
+        ]
+        assert all(event["task_id"] == task_id for event in events)
+        assert events == sorted(events, key=lambda event: event["id"])
+
+        assert (await client.get(f"/api/tasks/{uuid.uuid4()}/events")).status_code == 404
+        response = await client.get(f"/api/tasks/{task_id}/events", params={"cursor": "bogus"})
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_bulk_writes_and_archival_are_logged(self, client, create_test_user):
+        """Test that a bulk create logs one event per task and archival is logged as such"""
+        tasks = [
+            {"title": f"Bulk {n}", "status": "done", "due_date": "2024-12-01T00:00:00", "user_id": create_test_user}
+            for n in range(3)
+        ]
+        response = await client.post("/api/tasks/bulk", json={"tasks": tasks})
+        task_ids = [result["task"]["id"] for result in response.json()["results"]]
+        async with TestingSessionLocal() as session:
+            assert await TaskService(session).archive_done_tasks(timedelta(0)) == 3
+
+        for task_id in task_ids:
+            events = (await client.get(f"/api/tasks/{task_id}/events")).json()
+            assert [event["type"] for event in events] == ["created", "archived"]
+        assert (await replay()).consistent
+
+    @pytest.mark.asyncio
+    async def test_replay_finds_and_repairs_drift(self, client, create_test_user):
+        """Test that replaying the log detects writes made behind its back and rewrites tasks and counters"""
+        task_ids = []
+        for title in ("Kept", "Edited", "Deleted"):
+            task_data = {"title": title, "due_date": "2024-12-01T00:00:00", "user_id": create_test_user}
+            task_ids.append((await client.post("/api/tasks/", json=task_data)).json()["id"])
+        kept, edited, deleted = task_ids
+        await client.put(f"/api/tasks/{kept}", json={"status": "done"})
+        report = await replay()
+        assert report.consistent
+        assert (report.events, report.tasks) == (4, 3)
+
+        # Writes with the triggers off: neither logged nor counted
+        async with TestingSessionLocal() as session:
+            await session.execute(text("ALTER TABLE tasks DISABLE TRIGGER USER"))
+            await session.execute(text("UPDATE tasks SET title = 'Tampered' WHERE id = :id"), {"id": edited})
+            await session.execute(text("DELETE FROM tasks WHERE id = :id"), {"id": deleted})
+            await session.execute(
+                text(
+                    "INSERT INTO tasks (id, title, status, due_date, user_id) "
+                    "VALUES (:id, 'Unlogged', 'PENDING', now(), :user_id)"
+                ),
+                {"id": uuid.uuid4(), "user_id": create_test_user},
+            )
+            await session.execute(text("ALTER TABLE tasks ENABLE TRIGGER USER"))
+            await session.commit()
+
+        report = await replay()
+        assert not report.consistent
+        assert [str(task_id) for task_id in report.drifted] == [edited]
+        assert [str(task_id) for task_id in report.missing] == [deleted]
+        assert len(report.unlogged) == 1
+        # The counters missed the delete and the insert; the log still has Deleted and counts Unlogged
+        assert report.status_drift == {"pending": (2, 3)}
+
+        await replay(fix=True)
+        assert (await replay()).consistent
+        assert (await client.get(f"/api/tasks/{edited}")).json()["title"] == "Edited"
+        assert (await client.get(f"/api/tasks/{deleted}")).json()["title"] == "Deleted"
+        response = await client.get("/api/tasks/summary/")
+        assert response.json() == {"pending": 3, "in_progress": 0, "done": 1}
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from eventual_backend.core.broadcast import SSE_HEARTBEAT
+from eventual_backend.main import app
+from eventual_backend.models.task import TaskStatus
+from eventual_backend.schemas.task_schema import TaskStatusEnum
+from eventual_backend.services.task_feed import RESYNC_MESSAGE, TaskChange, TaskFeed, get_task_feed, listen_dsn
+from eventual_backend.tests.conftest import TEST_DATABASE_URL, TestingSessionLocal
+
+
+async def create_user(client) -> str:
+    user_data = {"name": "Stream User", "email": f"streamuser-{uuid.uuid4().hex[:8]}@example.com"}
+    response = await client.post("/api/users/", json=user_data)
+    return response.json()["id"]
+
+
+def make_feed(**options) -> TaskFeed:
+    return TaskFeed(listen_dsn(TEST_DATABASE_URL), TestingSessionLocal, **{"flush_interval": 0.01, **options})
+
+
+def parse(message: bytes) -> tuple[str, dict]:
+    fields = dict(line.split(": ", 1) for line in message.decode().strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+async def received(subscription, count: int, timeout: float = 5.0) -> list[tuple[str, dict]]:
+    return [parse(await asyncio.wait_for(subscription.queue.get(), timeout)) for _ in range(count)]
+
+
+def task_payload(user_id: str, title: str = "Streamed task") -> dict:
+    return {"title": title, "due_date": (datetime.now() + timedelta(days=1)).isoformat(), "user_id": user_id}
+
+
+class TestTaskStream:
+    @pytest.mark.asyncio
+    async def test_changes_reach_matching_subscribers(self, client):
+        """Test that creates, updates and deletes are delivered to the subscribers whose filters they match"""
+        alice = await create_user(client)
+        bob = await create_user(client)
+        feed = make_feed()
+        try:
+            everything = await feed.subscribe()
+            alices = await feed.subscribe(alice)
+            bobs = await feed.subscribe(bob)
+            done = await feed.subscribe(status=TaskStatusEnum.DONE)
+
+            # One write at a time: changes flushed together are sent with the task as it is by then
+            task = (await client.post("/api/tasks/", json=task_payload(alice))).json()
+            events = await received(everything, 1)
+            await client.put(f"/api/tasks/{task['id']}", json={"status": "done"})
+            events += await received(everything, 1)
+            await client.delete(f"/api/tasks/{task['id']}")
+            events += await received(everything, 1)
+            assert [op for op, _ in events] == ["insert", "update", "delete"]
+            (_, inserted), (_, updated), (_, deleted) = events
+            assert inserted["task"]["title"] == "Streamed task"
+            assert inserted["user_id"] == alice
+            assert (updated["old_status"], updated["status"], updated["task"]["status"]) == ("pending", "done", "done")
+            assert (deleted["id"], deleted["task"]) == (task["id"], None)
+
+            assert await received(alices, 3) == events
+            assert [op for op, _ in await received(done, 2)] == ["update", "delete"]
+            assert done.queue.empty() and bobs.queue.empty()
+        finally:
+            await feed.stop()
+
+    @pytest.mark.asyncio
+    async def test_fan_out_to_thousands_of_subscribers(self, client):
+        """Test that one bulk write reaches 5000 in-process subscribers, each change rendered once"""
+        user_id = await create_user(client)
+        feed = make_feed()
+        try:
+            subscriptions = [await feed.subscribe(user_id if n % 2 else None) for n in range(5000)]
+            started = time.perf_counter()
+            tasks = [task_payload(user_id, f"Task {n}") for n in range(20)]
+            response = await client.post("/api/tasks/bulk", json={"tasks": tasks})
+            assert response.status_code == 200
+
+            while feed.broadcaster.stats["delivered"] < 20 * 5000:
+                assert time.perf_counter() - started < 10, "timed out"
+                await asyncio.sleep(0.001)
+            elapsed = time.perf_counter() - started
+            assert feed.stats == {"notifications": 1, "changes": 20, "connects": 1}
+            assert all(subscription.queue.qsize() == 20 for subscription in subscriptions)
+            assert parse(subscriptions[0].queue.get_nowait())[1]["task"]["title"] == "Task 0"
+            # Request to 100,000 queued messages: about 0.1s on one core, with a wide margin for slow CI machines
+            assert elapsed < 5
+        finally:
+            await feed.stop()
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_cut_off_with_resync(self):
+        """Test that a subscriber falling behind is dropped with a resync instead of blocking the publisher"""
+        feed = make_feed(queue_size=3)
+        slow = feed.broadcaster.subscribe()
+        fast = feed.broadcaster.subscribe()
+        change = TaskChange("update", "id", "user", TaskStatus.DONE, TaskStatus.PENDING)
+        for _ in range(5):
+            feed.publish(change, None)
+            fast.queue.get_nowait()
+
+        assert feed.broadcaster.stats["dropped"] == 1
+        assert len(feed.broadcaster) == 1
+        stream = slow.sse_stream(heartbeat=60, retry_ms=1000)
+        assert [message async for message in stream] == [b"retry: 1000\n\n", RESYNC_MESSAGE]
+
+        stream = fast.sse_stream(heartbeat=0.01, retry_ms=1000)
+        assert [await anext(stream), await anext(stream)] == [b"retry: 1000\n\n", SSE_HEARTBEAT]
+        await stream.aclose()
+        assert len(feed.broadcaster) == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_endpoint(self, client):
+        """Test the SSE response: uncompressed, events as they are committed, ended by a resync"""
+        user_id = await create_user(client)
+        feed = make_feed()
+        app.dependency_overrides[get_task_feed] = lambda: feed
+
+        async def write_then_close():
+            while not len(feed.broadcaster):
+                await asyncio.sleep(0.01)
+            async with TestingSessionLocal() as session:
+                await session.execute(
+                    text(
+                        "INSERT INTO tasks (id, title, status, due_date, user_id) "
+                        "VALUES (gen_random_uuid(), 'Raw insert', 'PENDING', now(), :user_id)"
+                    ),
+                    {"user_id": uuid.UUID(user_id)},
+                )
+                await session.commit()
+            while not feed.broadcaster.stats["delivered"]:
+                await asyncio.sleep(0.01)
+            await feed.stop()
+
+        writer = asyncio.create_task(write_then_close())
+        try:
+            response = await client.get(
+                "/api/tasks/stream", params={"user_id": user_id}, headers={"Accept-Encoding": "gzip"}
+            )
+            await writer
+        finally:
+            await feed.stop()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "content-encoding" not in response.headers
+        retry, insert, resync = response.content.split(b"\n\n")[:3]
+        assert retry.startswith(b"retry: ")
+        op, data = parse(insert)
+        assert (op, data["task"]["title"]) == ("insert", "Raw insert")
+        assert parse(resync) == ("resync", {})
@@ -1,9 +1,17 @@
+import asyncio
+import csv
+import io
+import json
 import uuid
 from datetime import datetime, timedelta
 
 import pytest
 import pytest_asyncio
 
+from eventual_backend.core.cache import get_cache
+from eventual_backend.core.metrics import REQUEST_QUERIES
+from eventual_backend.schemas.task_schema import TaskCreate
+
 
 class TestTasks:
     @pytest_asyncio.fixture
@@ -34,6 +42,30 @@ class TestTasks:
         assert data["user_id"] == user_id
         assert "id" in data
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("idempotency_key", [None, "unknown-user-key"])
+    async def test_create_task_user_not_found(self, client, idempotency_key):
+        """Test that the user_id foreign key turns a task for a missing user into a 404"""
+        task_data = {
+            "title": "Orphan",
+            "due_date": "2024-12-31T23:59:59",
+            "user_id": str(uuid.uuid4()),
+            "idempotency_key": idempotency_key,
+        }
+        response = await client.post("/api/tasks/", json=task_data)
+        assert response.status_code == 404
+        assert response.json()["detail"] == "User not found"
+
+    @pytest.mark.asyncio
+    async def test_create_task_single_statement(self, client, create_test_user):
+        """Test that creating a task is one INSERT, with no user lookup or refresh"""
+        before = REQUEST_QUERIES.series.get(("/api/tasks/",), [None, 0])[1]
+        task_data = {"title": "One Trip", "due_date": "2024-12-31T23:59:59", "user_id": create_test_user}
+        response = await client.post("/api/tasks/", json=task_data)
+        assert response.status_code == 201
+        assert response.json()["created_at"] is not None
+        assert REQUEST_QUERIES.series[("/api/tasks/",)][1] == before + 1
+
     @pytest.mark.asyncio
     async def test_create_task_idempotency(self, client, create_test_user):
         """Test task creation idempotency"""
@@ -56,6 +88,370 @@ class TestTasks:
         assert response2.status_code == 201
         assert response2.json()["id"] == task_id  # Should return same task
 
+    @pytest.mark.asyncio
+    async def test_create_task_idempotency_concurrent(self, client, create_test_user):
+        """Test that a storm of concurrent retries with one idempotency key creates exactly one task"""
+        user_id = create_test_user
+        task_data = {
+            "title": "Retried Task",
+            "status": "pending",
+            "due_date": (datetime.now() + timedelta(days=7)).isoformat(),
+            "user_id": user_id,
+            "idempotency_key": f"storm-{uuid.uuid4().hex}",
+        }
+
+        # Open a full pool of connections first so the retries genuinely overlap instead of queueing on connect
+        await asyncio.gather(*(client.get(f"/api/users/{user_id}") for _ in range(15)))
+        responses = await asyncio.gather(*(client.post("/api/tasks/", json=task_data) for _ in range(200)))
+        assert {response.status_code for response in responses} == {201}
+        assert len({response.json()["id"] for response in responses}) == 1
+
+        response = await client.get(f"/api/tasks/user/{user_id}")
+        assert len(response.json()) == 1
+
+    @pytest.mark.asyncio
+    async def test_create_task_idempotency_key_freed(self, client, create_test_user, monkeypatch):
+        """Test that a task deleted between the key conflict and its lookup is created again, and that a key
+        that never settles is answered with a 409"""
+        from eventual_backend.repositories.task_repository import TaskRepository
+
+        task_data = {"title": "Short-lived", "due_date": "2030-01-01T00:00:00", "user_id": create_test_user}
+        task_data["idempotency_key"] = f"freed-{uuid.uuid4().hex}"
+        first_id = (await client.post("/api/tasks/", json=task_data)).json()["id"]
+
+        lookup = TaskRepository.get_by_idempotency_key
+
+        async def delete_then_lookup(self, key):
+            monkeypatch.setattr(TaskRepository, "get_by_idempotency_key", lookup)
+            await client.delete(f"/api/tasks/{first_id}")
+            return await lookup(self, key)
+
+        monkeypatch.setattr(TaskRepository, "get_by_idempotency_key", delete_then_lookup)
+        response = await client.post("/api/tasks/", json={**task_data, "title": "Recreated"})
+        assert response.status_code == 201
+        assert response.json()["id"] != first_id
+        assert response.json()["title"] == "Recreated"
+
+        async def always_gone(self, key):
+            return None
+
+        monkeypatch.setattr(TaskRepository, "get_by_idempotency_key", always_gone)
+        assert (await client.post("/api/tasks/", json=task_data)).status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_get_task_cached(self, client, create_test_user):
+        """Test that repeated task reads are served from the cache and updates invalidate it"""
+        task_data = {"title": "Cached Task", "due_date": "2024-12-31T23:59:59", "user_id": create_test_user}
+        task_id = (await client.post("/api/tasks/", json=task_data)).json()["id"]
+
+        before = (await client.get("/health/cache")).json()
+        first = await client.get(f"/api/tasks/{task_id}")
+        second = await client.get(f"/api/tasks/{task_id}")
+        after = (await client.get("/health/cache")).json()
+        assert first.json() == second.json()
+        assert after["hits"] == before["hits"] + 1
+
+        await client.put(f"/api/tasks/{task_id}", json={"title": "Renamed Task"})
+        response = await client.get(f"/api/tasks/{task_id}")
+        assert response.json()["title"] == "Renamed Task"
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_batch(self, client, create_test_user):
+        """Test fetching several tasks by id with a single query, in request order, skipping unknown ids"""
+        task_ids = []
+        for title in ("First", "Second", "Third"):
+            task_data = {"title": title, "due_date": "2024-12-31T23:59:59", "user_id": create_test_user}
+            task_ids.append((await client.post("/api/tasks/", json=task_data)).json()["id"])
+
+        series = REQUEST_QUERIES.series.get(("/api/tasks/batch",))
+        before = series[1] if series else 0
+        ids = [task_ids[2], str(uuid.uuid4()), task_ids[0], task_ids[2]]
+        response = await client.get("/api/tasks/batch", params={"ids": ids})
+        assert response.status_code == 200
+        assert [task["title"] for task in response.json()] == ["Third", "First"]
+        assert REQUEST_QUERIES.series[("/api/tasks/batch",)][1] == before + 1
+
+        # Found tasks are served from the entity cache the second time
+        response = await client.get("/api/tasks/batch", params={"ids": [task_ids[0], task_ids[2]]})
+        assert [task["title"] for task in response.json()] == ["First", "Third"]
+        assert REQUEST_QUERIES.series[("/api/tasks/batch",)][1] == before + 1
+
+        response = await client.get("/api/tasks/batch", params={"ids": [str(uuid.uuid4()) for _ in range(101)]})
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_task_single_statement(self, client, create_test_user):
+        """Test that update and delete are one SQL statement each and still 404 on unknown ids"""
+        task_data = {"title": "Write Once", "due_date": "2024-12-31T23:59:59", "user_id": create_test_user}
+        created = (await client.post("/api/tasks/", json=task_data)).json()
+        task_id = created["id"]
+
+        def statements() -> float:
+            return REQUEST_QUERIES.series[("/api/tasks/{task_id}",)][1]
+
+        response = await client.put(f"/api/tasks/{task_id}", json={"status": "done"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "done"
+        assert response.json()["title"] == "Write Once"
+        assert response.json()["updated_at"] >= created["updated_at"]
+        before = statements()
+        await client.put(f"/api/tasks/{task_id}", json={"title": "Write Twice"})
+        assert statements() == before + 1
+
+        before = statements()
+        assert (await client.delete(f"/api/tasks/{task_id}")).status_code == 204
+        assert statements() == before + 1
+        assert (await client.delete(f"/api/tasks/{task_id}")).status_code == 404
+        assert (await client.put(f"/api/tasks/{task_id}", json={"title": "Gone"})).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_get_task_conditional(self, client, create_test_user):
+        """Test that GET by id answers a matching If-None-Match with 304 until the task changes"""
+        task_data = {"title": "Polled", "due_date": "2024-12-31T23:59:59", "user_id": create_test_user}
+        task_id = (await client.post("/api/tasks/", json=task_data)).json()["id"]
+
+        response = await client.get(f"/api/tasks/{task_id}")
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+
+        response = await client.get(f"/api/tasks/{task_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        await client.put(f"/api/tasks/{task_id}", json={"status": "done"})
+        response = await client.get(f"/api/tasks/{task_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    @pytest.mark.asyncio
+    async def test_list_tasks_conditional(self, client, create_test_user):
+        """Test list ETags: 304 from one narrow query while unchanged, 200 once a row is added, updated or removed"""
+        task_ids = []
+        for i in range(3):
+            task_data = {"title": f"Listed {i}", "due_date": f"2024-12-0{i + 1}T00:00:00", "user_id": create_test_user}
+            task_ids.append((await client.post("/api/tasks/", json=task_data)).json()["id"])
+
+        response = await client.get("/api/tasks/", params={"limit": 2})
+        etag = response.headers["etag"]
+        cursor = response.headers["x-next-cursor"]
+
+        before = REQUEST_QUERIES.series[("/api/tasks/",)][1]
+        response = await client.get("/api/tasks/", params={"limit": 2}, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["x-next-cursor"] == cursor
+        assert REQUEST_QUERIES.series[("/api/tasks/",)][1] == before + 1
+
+        await client.put(f"/api/tasks/{task_ids[0]}", json={"title": "Edited"})
+        response = await client.get("/api/tasks/", params={"limit": 2}, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+
+        # Deleting a row on the page pulls the next one in: same count, different membership
+        await client.delete(f"/api/tasks/{task_ids[1]}")
+        response = await client.get("/api/tasks/", params={"limit": 2}, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert [task["id"] for task in response.json()] == [task_ids[0], task_ids[2]]
+
+        etag = (await client.get(f"/api/tasks/user/{create_test_user}")).headers["etag"]
+        response = await client.get(f"/api/tasks/user/{create_test_user}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_list_tasks_due_date_filters(self, client, create_test_user):
+        """Test due date ranges, overdue and created_since on the list and export endpoints"""
+        now = datetime.utcnow()
+        tasks = {
+            "late": (now - timedelta(days=2), "pending"),
+            "late but done": (now - timedelta(days=1), "done"),
+            "due soon": (now + timedelta(hours=12), "in_progress"),
+            "later": (now + timedelta(days=30), "pending"),
+        }
+        for title, (due_date, task_status) in tasks.items():
+            task_data = {"title": title, "due_date": due_date.isoformat(), "status": task_status}
+            await client.post("/api/tasks/", json={**task_data, "user_id": create_test_user})
+
+        async def titles(**params) -> list:
+            response = await client.get("/api/tasks/", params=params)
+            assert response.status_code == 200
+            return [task["title"] for task in response.json()]
+
+        assert await titles(overdue="true") == ["late"]
+        assert await titles(due_after=now.isoformat(), due_before=(now + timedelta(days=1)).isoformat()) == ["due soon"]
+        assert await titles(due_before=now.isoformat(), order_by="due_date_desc") == ["late but done", "late"]
+        # Timezone-aware bounds are compared in UTC
+        assert await titles(due_after=(now + timedelta(days=1)).isoformat() + "+00:00") == ["later"]
+        assert await titles(due_after=(now + timedelta(days=1, hours=2)).isoformat() + "+02:00") == ["later"]
+        assert await titles(overdue="true", status="done") == []
+        assert len(await titles(created_since=(now - timedelta(minutes=5)).isoformat())) == 4
+        assert await titles(created_since=(now + timedelta(days=1)).isoformat()) == []
+
+        response = await client.get("/api/tasks/export", params={"overdue": "true"})
+        assert [json.loads(line)["title"] for line in response.text.splitlines()] == ["late"]
+
+    @pytest.mark.asyncio
+    async def test_created_since_under_non_utc_session_timezone(self, create_test_user):
+        """Test that created_since matches created_at, stored in session time, when the TimeZone is not UTC"""
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+        from eventual_backend.services.task_service import TaskService
+        from eventual_backend.tests.conftest import TEST_DATABASE_URL
+
+        engine = create_async_engine(
+            TEST_DATABASE_URL, connect_args={"server_settings": {"timezone": "America/New_York"}}
+        )
+        try:
+            async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+                service = TaskService(session)
+                now = datetime.utcnow()
+                await service.create_task(
+                    TaskCreate(title="New York", due_date=now + timedelta(days=1), user_id=create_test_user)
+                )
+                recent = await service.get_tasks(created_since=now - timedelta(minutes=5))
+                assert [task.title for task in recent] == ["New York"]
+                assert await service.get_tasks(created_since=now + timedelta(hours=1)) == []
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_due_dates_with_offsets_are_stored_in_utc(self, client, create_test_user):
+        """Test that a due date sent with a UTC offset is converted on write, so filters and overdue agree"""
+        task_data = {"title": "Offset", "due_date": "2030-01-01T10:00:00+05:00", "user_id": create_test_user}
+        task_id = (await client.post("/api/tasks/", json=task_data)).json()["id"]
+        assert (await client.get(f"/api/tasks/{task_id}")).json()["due_date"] == "2030-01-01T05:00:00"
+
+        response = await client.get("/api/tasks/", params={"due_before": "2030-01-01T08:00:00Z"})
+        assert [task["id"] for task in response.json()] == [task_id]
+        response = await client.get("/api/tasks/", params={"due_after": "2030-01-01T10:00:00+04:00"})
+        assert response.json() == []
+
+        # Due 30 minutes ago in UTC, though its local time is still ahead
+        due_date = (datetime.utcnow() - timedelta(minutes=30) + timedelta(hours=3)).isoformat() + "+03:00"
+        task_data = {"title": "Late in UTC+3", "due_date": due_date, "user_id": create_test_user}
+        await client.put(f"/api/tasks/{task_id}", json=task_data)
+        response = await client.get("/api/tasks/", params={"overdue": "true"})
+        assert [task["title"] for task in response.json()] == ["Late in UTC+3"]
+
+    @pytest.mark.asyncio
+    async def test_create_tasks_bulk(self, client, create_test_user):
+        """Test bulk creation with new, previously stored, in-batch duplicate and orphaned items"""
+        user_id = create_test_user
+        due_date = (datetime.now() + timedelta(days=7)).isoformat()
+        stored = await client.post(
+            "/api/tasks/",
+            json={"title": "Stored", "due_date": due_date, "user_id": user_id, "idempotency_key": "bulk-stored"},
+        )
+
+        payload = {
+            "tasks": [
+                {"title": "New 1", "due_date": due_date, "user_id": user_id, "idempotency_key": "bulk-new"},
+                {"title": "Stored again", "due_date": due_date, "user_id": user_id, "idempotency_key": "bulk-stored"},
+                {"title": "New 1 again", "due_date": due_date, "user_id": user_id, "idempotency_key": "bulk-new"},
+                {"title": "Orphan", "due_date": due_date, "user_id": str(uuid.uuid4())},
+                {"title": "New 2", "status": "done", "due_date": due_date, "user_id": user_id},
+            ]
+        }
+        response = await client.post("/api/tasks/bulk", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["created"], data["existing"], data["failed"]) == (2, 2, 1)
+
+        results = data["results"]
+        assert [result["status"] for result in results] == [
+            "created",
+            "existing",
+            "existing",
+            "user_not_found",
+            "created",
+        ]
+        assert results[1]["task"]["id"] == stored.json()["id"]
+        assert results[2]["task"]["id"] == results[0]["task"]["id"]
+        assert results[3]["task"] is None
+        assert results[4]["task"]["status"] == "done"
+
+        response = await client.get(f"/api/tasks/user/{user_id}")
+        assert len(response.json()) == 3
+
+    @pytest.mark.asyncio
+    async def test_create_tasks_bulk_copy(self, client, create_test_user, monkeypatch):
+        """Test that large batches loaded with COPY return the created tasks"""
+        from eventual_backend.core.config import settings
+
+        monkeypatch.setattr(settings, "TASK_BULK_COPY_THRESHOLD", 2)
+        user_id = create_test_user
+        payload = {
+            "tasks": [
+                {
+                    "title": f"Copied {i}",
+                    "due_date": "2024-12-31T23:59:59",
+                    "user_id": user_id,
+                    "idempotency_key": f"copy-{i}",
+                }
+                for i in range(3)
+            ]
+        }
+        response = await client.post("/api/tasks/bulk", json=payload)
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["task"]["title"] for result in results] == ["Copied 0", "Copied 1", "Copied 2"]
+        assert all(result["task"]["status"] == "pending" for result in results)
+
+    @pytest.mark.asyncio
+    async def test_create_tasks_bulk_races(self, client, create_test_user, monkeypatch):
+        """Test bulk creation when a user, or the task holding an idempotency key, is deleted mid-request"""
+        from eventual_backend.core.config import settings
+        from eventual_backend.services.task_service import TaskService
+        from eventual_backend.tests.conftest import TestingSessionLocal
+
+        due_date = "2024-12-31T23:59:59"
+        for threshold in (1000, 1):  # INSERT, then COPY
+            monkeypatch.setattr(settings, "TASK_BULK_COPY_THRESHOLD", threshold)
+            user_data = {"name": "Gone", "email": f"gone-{uuid.uuid4().hex[:8]}@example.com"}
+            gone = (await client.post("/api/users/", json=user_data)).json()["id"]
+            key = f"orphan-{threshold}"
+            tasks = [
+                TaskCreate(title="Kept", due_date=due_date, user_id=create_test_user),
+                TaskCreate(title="Orphan", due_date=due_date, user_id=gone, idempotency_key=key),
+                # Repeats the key of an item that is not created, so it is not either
+                TaskCreate(title="Orphan again", due_date=due_date, user_id=create_test_user, idempotency_key=key),
+            ]
+            async with TestingSessionLocal() as session:
+                service = TaskService(session)
+                # The user passes the existence check, then is deleted before the insert
+                check = service.user_repository.get_existing_ids
+
+                async def delete_after_check(user_ids, service=service, check=check, gone=gone):
+                    existing = await check(user_ids)
+                    await client.delete(f"/api/users/{gone}")
+                    service.user_repository.get_existing_ids = check
+                    return existing
+
+                service.user_repository.get_existing_ids = delete_after_check
+                response = await service.create_tasks_bulk(tasks)
+            assert [result.status for result in response.results] == ["created", "user_not_found", "user_not_found"]
+            assert (response.created, response.failed) == (1, 2)
+
+        # The task holding the key is deleted between the skipped insert and the lookup: the key is free again
+        async with TestingSessionLocal() as session:
+            service = TaskService(session)
+            create_many = service.repository.create_many
+
+            async def lose_first_insert(rows):
+                service.repository.create_many = create_many
+                return []
+
+            service.repository.create_many = lose_first_insert
+            task = TaskCreate(title="Retried", due_date=due_date, user_id=create_test_user, idempotency_key="freed")
+            response = await service.create_tasks_bulk([task])
+        assert [(result.status, result.task.title) for result in response.results] == [("created", "Retried")]
+        assert response.created == 1
+
+    @pytest.mark.asyncio
+    async def test_create_tasks_bulk_empty(self, client):
+        """Test that an empty batch is rejected"""
+        response = await client.post("/api/tasks/bulk", json={"tasks": []})
+        assert response.status_code == 422
+
     @pytest.mark.asyncio
     async def test_get_task_summary(self, client, create_test_user):
         """Test task summary endpoint"""
@@ -77,6 +473,81 @@ class TestTasks:
         assert "in_progress" in data
         assert "done" in data
 
+    @pytest.mark.asyncio
+    async def test_task_summary_counters(self, client, create_test_user):
+        """Test that the maintained counters follow creates, bulk creates, updates and deletes"""
+        user_id = create_test_user
+        due_date = (datetime.now() + timedelta(days=7)).isoformat()
+        first = await client.post("/api/tasks/", json={"title": "One", "due_date": due_date, "user_id": user_id})
+        second = await client.post("/api/tasks/", json={"title": "Two", "due_date": due_date, "user_id": user_id})
+        bulk_tasks = [
+            {"title": f"Bulk {status}", "status": status, "due_date": due_date, "user_id": user_id}
+            for status in ["pending", "done", "done"]
+        ]
+        await client.post("/api/tasks/bulk", json={"tasks": bulk_tasks})
+        await client.put(f"/api/tasks/{first.json()['id']}", json={"status": "in_progress"})
+        await client.delete(f"/api/tasks/{second.json()['id']}")
+
+        response = await client.get("/api/tasks/summary/")
+        assert response.json() == {"pending": 1, "in_progress": 1, "done": 2}
+
+    @pytest.mark.asyncio
+    async def test_reconcile_task_summary(self, client, create_test_user):
+        """Test that reconciliation reports and repairs counter drift"""
+        from sqlalchemy import text
+
+        from eventual_backend.services.task_service import TaskService
+        from eventual_backend.tests.conftest import TestingSessionLocal
+
+        due_date = (datetime.now() + timedelta(days=7)).isoformat()
+        await client.post("/api/tasks/", json={"title": "One", "due_date": due_date, "user_id": create_test_user})
+
+        async with TestingSessionLocal() as session:
+            assert await TaskService(session).reconcile_task_summary() == {}
+            await session.execute(text("UPDATE task_status_counts SET count = count + 5 WHERE status = 'PENDING'"))
+            await session.commit()
+
+            assert await TaskService(session).reconcile_task_summary() == {"pending": (6, 1)}
+            assert await TaskService(session).reconcile_task_summary(fix=True) == {"pending": (6, 1)}
+            assert await TaskService(session).reconcile_task_summary() == {}
+
+    @pytest.mark.asyncio
+    async def test_archive_done_tasks(self, client, create_test_user):
+        """Test that archival moves only old done tasks, in batches, that reads can include them, and that the
+        summary and per-user stats keep counting them"""
+        from eventual_backend.services.task_service import TaskService
+        from eventual_backend.tests.conftest import TestingSessionLocal
+
+        task_ids = {}
+        for title, task_status in [("Done A", "done"), ("Done B", "done"), ("Done C", "done"), ("Open", "pending")]:
+            task_data = {"title": title, "due_date": "2024-12-01T00:00:00", "user_id": create_test_user}
+            task_ids[title] = (await client.post("/api/tasks/", json={**task_data, "status": task_status})).json()["id"]
+        await client.get(f"/api/tasks/{task_ids['Done A']}")  # cached
+
+        async with TestingSessionLocal() as session:
+            assert await TaskService(session).archive_done_tasks() == 0  # not old enough
+            assert await TaskService(session).archive_done_tasks(timedelta(0), batch_size=2, max_batches=1) == 2
+            assert await TaskService(session).archive_done_tasks(timedelta(0), batch_size=2) == 1
+            assert await TaskService(session).reconcile_task_summary() == {}
+
+        response = await client.get("/api/tasks/")
+        assert [task["title"] for task in response.json()] == ["Open"]
+        response = await client.get("/api/tasks/", params={"include_archived": "true", "status": "done"})
+        assert sorted(task["title"] for task in response.json()) == ["Done A", "Done B", "Done C"]
+        response = await client.get("/api/tasks/export", params={"include_archived": "true"})
+        assert len(response.text.splitlines()) == 4
+
+        assert (await client.get(f"/api/tasks/{task_ids['Done A']}")).status_code == 404
+        response = await client.get(f"/api/tasks/{task_ids['Done A']}", params={"include_archived": "true"})
+        assert response.json()["title"] == "Done A"
+        assert (await client.put(f"/api/tasks/{task_ids['Done A']}", json={"title": "Edit"})).status_code == 404
+
+        response = await client.get("/api/tasks/summary/")
+        assert response.json() == {"pending": 1, "in_progress": 0, "done": 3}
+        # Per-user stats count archived tasks too, so they add up to the summary
+        stats = (await client.get(f"/api/users/{create_test_user}/stats")).json()
+        assert (stats["pending"], stats["in_progress"], stats["done"]) == (1, 0, 3)
+
     @pytest.mark.asyncio
     async def test_filter_tasks_by_status_pending(self, client, create_test_user):
         """Test filtering tasks by pending status"""
@@ -332,6 +803,124 @@ class TestTasks:
         page2_ids = {task["id"] for task in tasks_page2}
         assert page1_ids.isdisjoint(page2_ids)
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("order_by", ["due_date_asc", "due_date_desc"])
+    async def test_filter_tasks_cursor_pagination(self, client, create_test_user, order_by):
+        """Test walking every page with the keyset cursor, including tasks sharing a due date"""
+        user_id = create_test_user
+
+        created_ids = set()
+        for i in range(7):
+            task_data = {
+                "title": f"Task {i + 1}",
+                "status": "pending",
+                "due_date": f"2024-{6 + i // 2:02d}-15T12:00:00",
+                "user_id": user_id,
+            }
+            response = await client.post("/api/tasks/", json=task_data)
+            created_ids.add(response.json()["id"])
+
+        seen = []
+        params = {"user_id": user_id, "limit": 3, "order_by": order_by}
+        while True:
+            response = await client.get("/api/tasks/", params=params)
+            assert response.status_code == 200
+            seen.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+
+        assert {task["id"] for task in seen} == created_ids
+        assert len(seen) == len(created_ids)
+        due_dates = [task["due_date"] for task in seen]
+        assert due_dates == sorted(due_dates, reverse=order_by == "due_date_desc")
+
+    @pytest.mark.asyncio
+    async def test_export_tasks(self, client, create_test_user, monkeypatch):
+        """Test streaming the filtered task list as NDJSON and CSV across several cursor batches"""
+        from eventual_backend.core.config import settings
+
+        monkeypatch.setattr(settings, "TASK_EXPORT_BATCH_SIZE", 2)
+        user_id = create_test_user
+        tasks = [
+            {
+                "title": f"Export {i}",
+                "status": "done" if i == 4 else "pending",
+                "due_date": f"2024-0{i + 1}-01T00:00:00",
+                "user_id": user_id,
+            }
+            for i in range(5)
+        ]
+        await client.post("/api/tasks/bulk", json={"tasks": tasks})
+
+        response = await client.get("/api/tasks/export", params={"user_id": user_id, "status": "pending"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["title"] for line in lines] == ["Export 0", "Export 1", "Export 2", "Export 3"]
+        assert lines[0]["status"] == "pending" and lines[0]["user_id"] == user_id
+
+        params = {"user_id": user_id, "format": "csv", "order_by": "due_date_desc"}
+        response = await client.get("/api/tasks/export", params=params)
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["title"] for row in rows] == ["Export 4", "Export 3", "Export 2", "Export 1", "Export 0"]
+        assert rows[0]["due_date"] == "2024-05-01T00:00:00"
+
+    @pytest.mark.asyncio
+    async def test_search_tasks(self, client, create_test_user):
+        """Test search-as-you-type over titles: ranking, filters and keyset pagination"""
+        titles = [
+            ("Deploy to production", "pending"),
+            ("Deploy deploy deploy the staging deployment", "done"),
+            ("Write production runbook", "pending"),
+            ("Review pull requests", "pending"),
+        ]
+        for title, status in titles:
+            task_data = {"title": title, "status": status, "due_date": "2030-01-01T00:00:00"}
+            task_data["user_id"] = create_test_user
+            await client.post("/api/tasks/", json=task_data)
+
+        response = await client.get("/api/tasks/search", params={"q": "deplo"})
+        assert response.status_code == 200
+        results = response.json()
+        assert [task["title"] for task in results] == [titles[1][0], titles[0][0]]
+        assert results[0]["rank"] > results[1]["rank"]
+
+        response = await client.get("/api/tasks/search", params={"q": "PRODUCTION deplo!"})
+        assert [task["title"] for task in response.json()] == ["Deploy to production"]
+        response = await client.get("/api/tasks/search", params={"q": "deploy", "status": "done"})
+        assert [task["title"] for task in response.json()] == [titles[1][0]]
+        response = await client.get("/api/tasks/search", params={"q": "prod", "user_id": str(uuid.uuid4())})
+        assert response.json() == []
+
+        for order_by in ("rank", "due_date_desc"):
+            pages = []
+            params = {"q": "prod", "order_by": order_by, "limit": 1}
+            while True:
+                response = await client.get("/api/tasks/search", params=params)
+                pages.extend(task["title"] for task in response.json())
+                if "x-next-cursor" not in response.headers:
+                    break
+                params["cursor"] = response.headers["x-next-cursor"]
+            assert sorted(pages) == ["Deploy to production", "Write production runbook"]
+
+        assert (await client.get("/api/tasks/search", params={"q": "&|!"})).status_code == 422
+        assert (await client.get("/api/tasks/search", params={"q": "x", "cursor": "bad"})).status_code == 400
+
+        response = await client.get("/api/tasks/search", params={"q": "deplyo", "mode": "fuzzy"})
+        # Fuzzy search needs pg_trgm, which not every Postgres installation ships
+        assert response.status_code in (200, 501)
+        if response.status_code == 200:
+            assert titles[0][0] in [task["title"] for task in response.json()]
+
+    @pytest.mark.asyncio
+    async def test_filter_tasks_invalid_cursor(self, client):
+        """Test that a malformed cursor is rejected"""
+        response = await client.get("/api/tasks/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
     @pytest.mark.asyncio
     async def test_filter_tasks_combined_filters(self, client):
         """Test combining multiple filters"""
@@ -419,3 +1008,20 @@ class TestTasks:
         response = await client.get(f"/api/tasks/user/{user_id}")
         assert response.status_code == 200
         assert isinstance(response.json(), list)
+
+        response = await client.get(f"/api/tasks/user/{uuid.uuid4()}")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_get_user_tasks_skips_user_lookup(self, client, create_test_user):
+        """Test that a non-empty page of a user's tasks needs no separate user query"""
+        user_id = create_test_user
+        task_data = {"title": "Owned Task", "due_date": "2024-12-31T23:59:59", "user_id": user_id}
+        await client.post("/api/tasks/", json=task_data)
+        await get_cache().clear()
+
+        series = REQUEST_QUERIES.series.get(("/api/tasks/user/{user_id}",))
+        before = series[1] if series else 0
+        response = await client.get(f"/api/tasks/user/{user_id}")
+        assert [task["title"] for task in response.json()] == ["Owned Task"]
+        assert REQUEST_QUERIES.series[("/api/tasks/user/{user_id}",)][1] == before + 1
@@ -44,6 +44,65 @@ class TestUsers:
         response = await client.get(f"/api/users/{non_existent_id}")
         assert response.status_code == 404
 
+    @pytest.mark.asyncio
+    async def test_get_users_batch(self, client):
+        """Test fetching several users by id in request order, skipping unknown ids"""
+        user_ids = []
+        for name in ("Ada", "Grace"):
+            user_data = {"name": name, "email": f"batch-{uuid.uuid4().hex[:8]}@example.com"}
+            user_ids.append((await client.post("/api/users/", json=user_data)).json()["id"])
+
+        response = await client.get("/api/users/batch", params={"ids": [user_ids[1], str(uuid.uuid4()), user_ids[0]]})
+        assert response.status_code == 200
+        assert [user["name"] for user in response.json()] == ["Grace", "Ada"]
+
+        assert (await client.get("/api/users/batch")).status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_user_task_stats(self, client):
+        """Test per-user counts by status, overdue count and next due date, and that they are cached"""
+        user_ids = []
+        for name in ("Busy", "Idle"):
+            user_data = {"name": name, "email": f"stats-{uuid.uuid4().hex[:8]}@example.com"}
+            user_ids.append((await client.post("/api/users/", json=user_data)).json()["id"])
+        busy, idle = user_ids
+        for task_status, due_date in [
+            ("pending", "2000-01-01T00:00:00"),
+            ("pending", "2999-01-01T00:00:00"),
+            ("in_progress", "2998-01-01T00:00:00"),
+            ("done", "2000-01-01T00:00:00"),
+        ]:
+            task_data = {"title": "Stat", "status": task_status, "due_date": due_date, "user_id": busy}
+            assert (await client.post("/api/tasks/", json=task_data)).status_code == 201
+
+        expected = {
+            "user_id": busy,
+            "pending": 2,
+            "in_progress": 1,
+            "done": 1,
+            "overdue": 1,
+            "next_due_date": "2998-01-01T00:00:00",
+        }
+        response = await client.get("/api/users/stats")
+        assert response.status_code == 200
+        assert response.json() == [expected]
+        assert (await client.get(f"/api/users/{busy}/stats")).json() == expected
+        response = await client.get(f"/api/users/{idle}/stats")
+        assert response.json() == {
+            "user_id": idle,
+            "pending": 0,
+            "in_progress": 0,
+            "done": 0,
+            "overdue": 0,
+            "next_due_date": None,
+        }
+        assert (await client.get(f"/api/users/{uuid.uuid4()}/stats")).status_code == 404
+
+        # Served from the cache until it expires
+        task_data = {"title": "Stat", "due_date": "2000-01-01T00:00:00", "user_id": idle}
+        await client.post("/api/tasks/", json=task_data)
+        assert (await client.get("/api/users/stats")).json() == [expected]
+
     @pytest.mark.asyncio
     async def test_update_user_success(self, client):
         """Test successful user update"""
@@ -81,6 +140,14 @@ class TestUsers:
         get_response = await client.get(f"/api/users/{user_id}")
         assert get_response.status_code == 404
 
+    @pytest.mark.asyncio
+    async def test_update_and_delete_user_not_found(self, client):
+        """Test that writes to a non-existent user return 404"""
+        non_existent_id = uuid.uuid4()
+        update_data = {"name": "Nobody", "email": f"nobody-{uuid.uuid4().hex[:8]}@example.com"}
+        assert (await client.put(f"/api/users/{non_existent_id}", json=update_data)).status_code == 404
+        assert (await client.delete(f"/api/users/{non_existent_id}")).status_code == 404
+
     @pytest.mark.asyncio
     async def test_list_users_pagination(self, client):
         """Test user listing with pagination"""
@@ -113,6 +180,30 @@ class TestUsers:
         all_users = response.json()
         assert len(all_users) >= 5  # At least our created users
 
+    @pytest.mark.asyncio
+    async def test_list_users_cursor_pagination(self, client):
+        """Test walking every page of users with the keyset cursor"""
+        for i in range(5):
+            user_data = {
+                "name": f"User {i + 1}",
+                "email": f"cursor{i + 1}-{uuid.uuid4().hex[:8]}@example.com",
+            }
+            await client.post("/api/users/", json=user_data)
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            response = await client.get("/api/users/", params=params)
+            assert response.status_code == 200
+            seen.extend(user["id"] for user in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
     @pytest.mark.asyncio
     async def test_list_users_default_pagination(self, client):
         """Test user listing with default pagination values"""
@@ -0,0 +1,34 @@
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eventual_backend.services.task_service import TaskService
+
+JobHandler = Callable[[AsyncSession, dict], Awaitable[None]]
+
+# Job kind -> handler; JobService.enqueue(kind, payload) ends up calling HANDLERS[kind](session, payload)
+HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register the decorated coroutine as the handler for jobs of this kind.
+
+    Handlers get their own session and the job's JSON payload. A job can run more than once (retries, a worker
+    dying mid-job), so handlers must be safe to repeat.
+    """
+
+    def register(handler: JobHandler) -> JobHandler:
+        HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+@job_handler("archive_done_tasks")
+async def archive_done_tasks(session: AsyncSession, payload: dict) -> None:
+    older_than = payload.get("older_than_days")
+    await TaskService(session).archive_done_tasks(
+        older_than=timedelta(days=older_than) if older_than is not None else None,
+        batch_size=payload.get("batch_size"),
+    )
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import random
+from datetime import timedelta
+from typing import Mapping, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from eventual_backend.core.config import settings
+from eventual_backend.models.job import Job
+from eventual_backend.repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+# Runners started in this process, woken by notify() so a job enqueued here starts without waiting for a poll
+_running: set["JobRunner"] = set()
+
+
+def notify() -> None:
+    for runner in _running:
+        runner.wake()
+
+
+def retry_delay(attempts: int, base: float, maximum: float) -> timedelta:
+    """Exponential backoff from base seconds, capped at maximum, with jitter so failed jobs spread out"""
+    delay = min(base * 2 ** (attempts - 1), maximum)
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+class JobRunner:
+    """A pool of asyncio workers running jobs from the jobs table through the handlers registered by kind.
+
+    Each worker claims one job at a time, runs its handler in a fresh session and deletes the job on success.
+    A failing job is retried with backoff until max_attempts, then marked FAILED. stop() drains: workers stop
+    claiming, jobs in flight get drain_timeout seconds to finish, and any still running are cancelled and put
+    back in the queue for the next start.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        handlers: Optional[Mapping] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease: Optional[float] = None,
+        retry_base: Optional[float] = None,
+        retry_max: Optional[float] = None,
+        drain_timeout: Optional[float] = None,
+    ):
+        if handlers is None:
+            from eventual_backend.workers.handlers import HANDLERS as handlers
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.concurrency = concurrency if concurrency is not None else settings.JOB_WORKERS
+        self.poll_interval = poll_interval if poll_interval is not None else settings.JOB_POLL_INTERVAL_SECONDS
+        self.lease = timedelta(seconds=lease if lease is not None else settings.JOB_LEASE_SECONDS)
+        self.retry_base = retry_base if retry_base is not None else settings.JOB_RETRY_BASE_SECONDS
+        self.retry_max = retry_max if retry_max is not None else settings.JOB_RETRY_MAX_SECONDS
+        self.drain_timeout = drain_timeout if drain_timeout is not None else settings.JOB_DRAIN_TIMEOUT_SECONDS
+        self.stats = {"succeeded": 0, "retried": 0, "failed": 0, "released": 0}
+        self._workers: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        _running.add(self)
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        _running.discard(self)
+        self._stopping.set()
+        self._wakeup.set()
+        if not self._workers:
+            return
+        _, pending = await asyncio.wait(self._workers, timeout=self.drain_timeout)
+        for worker in pending:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            try:
+                await self._run(job)
+            except Exception:
+                # Recording the outcome failed (database unreachable, pool timeout): the job stays RUNNING until
+                # its lease expires and is then claimed again, and this worker moves on
+                logger.exception("Recording the outcome of job %s (%s) failed", job.id, job.kind)
+
+    async def _claim(self) -> Optional[Job]:
+        async with self.session_factory() as session:
+            return await JobRepository(session).claim(self.lease)
+
+    async def _run(self, job: Job) -> None:
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            async with self.session_factory() as session:
+                await handler(session, job.payload)
+        except asyncio.CancelledError:
+            # Drain timed out: hand the job back rather than leaving it to its lease
+            await asyncio.shield(self._finish(job, "released"))
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            outcome = "failed" if job.attempts >= job.max_attempts else "retried"
+            logger.warning("Job %s (%s) attempt %d %s: %s", job.id, job.kind, job.attempts, outcome, error)
+            await self._finish(job, outcome, error)
+        else:
+            await self._finish(job, "succeeded")
+
+    async def _finish(self, job: Job, outcome: str, error: Optional[str] = None) -> None:
+        async with self.session_factory() as session:
+            repository = JobRepository(session)
+            if outcome == "succeeded":
+                await repository.complete(job.id, job.attempts)
+            elif outcome == "retried":
+                delay = retry_delay(job.attempts, self.retry_base, self.retry_max)
+                await repository.retry(job.id, job.attempts, error, delay)
+            elif outcome == "failed":
+                await repository.fail(job.id, job.attempts, error)
+            else:
+                await repository.release(job.id, job.attempts)
+        self.stats[outcome] += 1
@@ -5,10 +5,27 @@ API utility functions for CRUD demo scripts
 
 import json
 import sys
+import uuid
+from datetime import timezone
 from typing import Any
 
 import httpx
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 API_BASE = "http://localhost:8000/api"
 
 
@@ -66,6 +83,56 @@ def make_request(method: str, endpoint: str, data: dict[Any, Any] | None = None)
         return None
 
 
+def compact_headers() -> dict[str, str]:
+    """Accept/Accept-Encoding headers asking for the most compact response this client can decode"""
+    encodings = [name for name, available in (("zstd", zstandard), ("br", brotli), ("gzip", True)) if available]
+    accept = "application/msgpack, application/json;q=0.9" if msgpack else "application/json"
+    return {"accept": accept, "accept-encoding": ", ".join(encodings)}
+
+
+def _convert_msgpack(item: Any) -> Any:
+    # Inverse of the server's encoding: 16-byte bin values are UUIDs, timestamps are naive UTC datetimes
+    if isinstance(item, list):
+        return [_convert_msgpack(value) for value in item]
+    if isinstance(item, dict):
+        return {key: _convert_msgpack(value) for key, value in item.items()}
+    if isinstance(item, bytes) and len(item) == 16:
+        return uuid.UUID(bytes=item)
+    if isinstance(item, msgpack.Timestamp):
+        return item.to_datetime().astimezone(timezone.utc).replace(tzinfo=None)
+    return item
+
+
+def decode_compact(response: httpx.Response) -> Any:
+    """Decode a JSON or MessagePack response body, including zstd, which httpx leaves encoded.
+
+    A MessagePack export is a stream of maps and decodes to a list.
+    """
+    body = response.content
+    if response.headers.get("content-encoding") == "zstd":
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    if not response.headers.get("content-type", "").startswith("application/msgpack"):
+        return json.loads(body) if body else None
+    unpacker = msgpack.Unpacker(raw=False)
+    unpacker.feed(body)
+    items = [_convert_msgpack(item) for item in unpacker]
+    return items[0] if len(items) == 1 and isinstance(items[0], list) else items
+
+
+def get_compact(endpoint: str) -> tuple[Any, int] | None:
+    """GET an endpoint negotiating MessagePack and compression; returns the decoded data and the bytes on the wire"""
+    try:
+        with httpx.stream("GET", f"{API_BASE}{endpoint}", headers=compact_headers()) as response:
+            response.read()
+    except httpx.RequestError as e:
+        print_colored(f"Request failed: {e}", Colors.RED)
+        return None
+    if response.status_code != 200:
+        print_colored(f"API Error {response.status_code}: {response.text}", Colors.RED)
+        return None
+    return decode_compact(response), response.num_bytes_downloaded
+
+
 def get_first_user_id() -> str | None:
     """Get the ID of the first user"""
     users = make_request("GET", "/users/?limit=1")
@@ -106,6 +173,7 @@ def main():
         print("  get-first-user-id")
         print("  get-first-task-id")
         print("  get-user-by-email <email>")
+        print("  get-compact <endpoint>")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -146,6 +214,17 @@ def main():
             print_colored(f"User with email {email} not found", Colors.RED)
             sys.exit(1)
 
+    elif command == "get-compact":
+        if len(sys.argv) < 3:
+            print_colored("Endpoint required, e.g. /tasks/?limit=1000", Colors.RED)
+            sys.exit(1)
+        result = get_compact(sys.argv[2])
+        if result is None:
+            sys.exit(1)
+        data, wire_bytes = result
+        pretty_print_json(data)
+        print_colored(f"{wire_bytes} bytes on the wire", Colors.BLUE)
+
     else:
         print_colored(f"Unknown command: {command}", Colors.RED)
         sys.exit(1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare the list endpoints' serialization paths for 100- and 1000-item pages.
+
+  orm  - ORM Task instances validated through List[TaskResponse] and rendered by JSONResponse
+         (what FastAPI does for a response_model route)
+  rows - plain column rows rendered by FastJSONResponse (orjson when installed)
+
+Without --database-url only serialization is measured, on in-memory objects. With it, each iteration also
+runs the real query (TaskRepository.get_with_filters vs get_rows_with_filters) against a seeded database:
+
+    python scripts/benchmarks/list_serialization.py
+    python scripts/benchmarks/list_serialization.py --database-url postgresql+asyncpg://postgres@localhost/bench_taskdb
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from eventual_backend.core import serialization
+from eventual_backend.core.serialization import FastJSONResponse
+from eventual_backend.models.task import Task, TaskStatus
+from eventual_backend.repositories.task_repository import RESPONSE_COLUMNS, TaskRepository
+from eventual_backend.schemas.task_schema import TaskResponse
+
+RESPONSE_FIELD = create_response_field(name="Response_list_tasks", type_=List[TaskResponse])
+FIELDS = [column.key for column in RESPONSE_COLUMNS]
+
+
+async def render_orm(tasks) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=tasks)
+    return JSONResponse(content).body
+
+
+async def render_rows(rows) -> bytes:
+    return FastJSONResponse([row._asdict() if hasattr(row, "_asdict") else row for row in rows]).body
+
+
+def make_tasks(n: int):
+    now = datetime(2024, 1, 1)
+    user_id = uuid.uuid4()
+    tasks = [
+        Task(
+            id=uuid.uuid4(),
+            title=f"Task {i}",
+            status=TaskStatus.PENDING,
+            due_date=now + timedelta(hours=i),
+            idempotency_key=None,
+            user_id=user_id,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+    rows = [{field: getattr(task, field) for field in FIELDS} for task in tasks]
+    return tasks, rows
+
+
+async def measure(fn, iterations: int) -> dict:
+    await fn()  # warm up
+    tracemalloc.start()
+    await fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        body = await fn()
+    elapsed = time.perf_counter() - start
+    return {
+        "req_per_s": iterations / elapsed,
+        "ms": elapsed / iterations * 1000,
+        "peak_kib": peak / 1024,
+        "bytes": len(body),
+    }
+
+
+async def run(args):
+    session = None
+    if args.database_url:
+        engine = create_async_engine(args.database_url)
+        session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)()
+        repository = TaskRepository(session)
+
+    print(f"JSON encoder: {'orjson' if serialization.orjson else 'stdlib json'}")
+    print(f"{'page':>5} {'path':<5} {'req/s':>10} {'ms/req':>9} {'peak KiB':>10} {'bytes':>9}")
+    for size in args.sizes:
+        if session is None:
+            tasks, rows = make_tasks(size)
+            paths = {"orm": lambda tasks=tasks: render_orm(tasks), "rows": lambda rows=rows: render_rows(rows)}
+        else:
+
+            async def orm_path(size=size):
+                return await render_orm(await repository.get_with_filters(limit=size))
+
+            async def rows_path(size=size):
+                return await render_rows(await repository.get_rows_with_filters(limit=size))
+
+            paths = {"orm": orm_path, "rows": rows_path}
+
+        for name, fn in paths.items():
+            result = await measure(fn, max(1, args.iterations * 100 // size))
+            print(
+                f"{size:>5} {name:<5} {result['req_per_s']:>10.1f} {result['ms']:>9.3f} "
+                f"{result['peak_kib']:>10.1f} {result['bytes']:>9}"
+            )
+
+    if session is not None:
+        await session.close()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="also run the queries against this (seeded) database")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--iterations", type=int, default=200, help="iterations for a 100-item page (scaled by size)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Measure what the metrics instrumentation adds to each request and each SQL statement.
+
+  request - a trivial FastAPI route called directly over ASGI, with and without MetricsMiddleware
+  query   - the before/after_cursor_execute hooks on a stub connection; with --database-url, also "SELECT 1"
+            round trips with the hooks attached vs removed (for context: network jitter dwarfs the difference)
+
+Exits non-zero when either overhead exceeds its budget:
+
+    python scripts/benchmarks/metrics_overhead.py
+    python scripts/benchmarks/metrics_overhead.py --database-url postgresql+asyncpg://postgres@localhost/bench_taskdb
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from eventual_backend.core import metrics
+from eventual_backend.core.metrics import MetricsMiddleware
+
+# Per-request and per-statement budgets, in microseconds
+REQUEST_BUDGET_US = 25.0
+QUERY_BUDGET_US = 5.0
+
+
+def make_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def time_requests(app: FastAPI, iterations: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items/1",
+        "raw_path": b"/items/1",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(100):  # warm up
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def time_hooks(iterations: int) -> float:
+    conn = SimpleNamespace(info={})
+    statement = "SELECT tasks.id FROM tasks WHERE tasks.id = $1::UUID"
+    start = time.perf_counter()
+    for _ in range(iterations):
+        metrics._before_cursor_execute(conn, None, statement, (), None, False)
+        metrics._after_cursor_execute(conn, None, statement, (), None, False)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def time_queries(database_url: str, iterations: int, hooks: bool) -> float:
+    if not hooks:
+        event.remove(Engine, "before_cursor_execute", metrics._before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", metrics._after_cursor_execute)
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.connect() as conn:
+            for _ in range(100):  # warm up
+                await conn.execute(text("SELECT 1"))
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await conn.execute(text("SELECT 1"))
+            return (time.perf_counter() - start) / iterations * 1e6
+    finally:
+        await engine.dispose()
+        if not hooks:
+            event.listen(Engine, "before_cursor_execute", metrics._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", metrics._after_cursor_execute)
+
+
+async def run(args) -> bool:
+    # Alternate the two apps over several rounds and keep the best of each to filter out scheduler noise
+    bare_app, instrumented_app = make_app(instrumented=False), make_app(instrumented=True)
+    bare = instrumented = float("inf")
+    for _ in range(args.rounds):
+        bare = min(bare, await time_requests(bare_app, args.iterations // args.rounds))
+        instrumented = min(instrumented, await time_requests(instrumented_app, args.iterations // args.rounds))
+    request_overhead = instrumented - bare
+    print(f"request: {bare:.1f} us bare, {instrumented:.1f} us instrumented, overhead {request_overhead:.1f} us")
+
+    query_overhead = time_hooks(args.iterations)
+    print(f"query:   hooks {query_overhead:.2f} us")
+    if args.database_url:
+        without = await time_queries(args.database_url, args.iterations // 4, hooks=False)
+        with_hooks = await time_queries(args.database_url, args.iterations // 4, hooks=True)
+        print(f"         SELECT 1: {without:.1f} us without hooks, {with_hooks:.1f} us with hooks")
+
+    within_budget = request_overhead <= REQUEST_BUDGET_US and query_overhead <= QUERY_BUDGET_US
+    print(
+        f"budget:  {REQUEST_BUDGET_US:.0f} us/request, {QUERY_BUDGET_US:.0f} us/query -> "
+        f"{'OK' if within_budget else 'EXCEEDED'}"
+    )
+    return within_budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="also time SELECT 1 round trips against this database")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=10)
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compare bytes on the wire and CPU time of the negotiated list/export encodings for 1k and 10k-task responses.
+
+Each body is serialized as JSON (core.serialization.dumps) or MessagePack (packb), then compressed with every
+content-coding CompressionMiddleware can pick (identity, gzip, br, zstd) at the middleware's levels. The rows
+mirror the list endpoint's response columns, so no database is needed:
+
+    python scripts/benchmarks/response_encoding.py
+    python scripts/benchmarks/response_encoding.py --rows 1000 10000 100000
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from eventual_backend.core.compression import ENCODERS
+from eventual_backend.core.serialization import MSGPACK_AVAILABLE, dumps, packb
+from eventual_backend.models.task import TaskStatus
+
+
+def make_rows(count: int, users: int = 50) -> list[dict]:
+    rng = random.Random(count)
+    user_ids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(users)]
+    now = datetime(2025, 1, 1)
+    rows = []
+    for i in range(count):
+        created = now - timedelta(minutes=rng.randrange(500_000))
+        verb = rng.choice(["Review", "Write", "Deploy", "Fix", "Plan"])
+        rows.append(
+            {
+                "title": f"Task {i}: {verb} item {rng.randrange(10**6)}",
+                "status": rng.choice(list(TaskStatus)),
+                "due_date": now + timedelta(minutes=rng.randrange(500_000)),
+                "idempotency_key": None,
+                "user_id": rng.choice(user_ids),
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "created_at": created,
+                "updated_at": None,
+            }
+        )
+    return rows
+
+
+def cpu_ms(fn, arg, repeat: int):
+    """Best-of-repeat process CPU time of fn(arg), in milliseconds, and its result"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        result = fn(arg)
+        best = min(best, time.process_time() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+
+    serializers = {"json": dumps}
+    if MSGPACK_AVAILABLE:
+        serializers["msgpack"] = packb
+    else:
+        print("msgpack is not installed; skipping MessagePack")
+
+    print(
+        f"{'rows':>6} {'format':<8} {'encoding':<9} {'bytes':>10} {'ratio':>6} {'serialize ms':>13} "
+        f"{'compress ms':>12}"
+    )
+    for count in args.rows:
+        rows = make_rows(count)
+        baseline = None
+        for format, serialize in serializers.items():
+            serialize_ms, body = cpu_ms(serialize, rows, args.repeat)
+            baseline = baseline or len(body)
+            for encoding, encoder in {"identity": None, **ENCODERS}.items():
+                if encoder is None:
+                    compress_ms, wire = 0.0, body
+                else:
+                    compress_ms, wire = cpu_ms(lambda data, encoder=encoder: encoder().finish(data), body, args.repeat)
+                print(
+                    f"{count:>6} {format:<8} {encoding:<9} {len(wire):>10} {len(wire) / baseline:>6.2f} "
+                    f"{serialize_ms:>13.2f} {compress_ms:>12.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Compare update/delete latency of the previous load-mutate-commit-refresh repository methods with the current
+single-statement UPDATE ... RETURNING / DELETE ... RETURNING.
+
+Creates --tasks scratch tasks, updates each of them with both variants, then deletes half with each, and
+prints median/p95 latency and statements per operation. The entity cache is disabled so every variant pays its
+full round trips:
+
+    python scripts/benchmarks/single_statement_writes.py --database-url postgresql+asyncpg://postgres@localhost/bench_taskdb
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from eventual_backend.core.cache import NullCache
+from eventual_backend.core.database import Base
+from eventual_backend.models.task import Task, TaskStatus
+from eventual_backend.models.user import User
+from eventual_backend.repositories.task_repository import TaskRepository
+
+
+async def legacy_update(session: AsyncSession, task_id: uuid.UUID, values: dict) -> Task | None:
+    """BaseRepository.update as it was: SELECT, mutate, COMMIT, then a refreshing SELECT"""
+    task = (await session.execute(select(Task).where(Task.id == task_id))).scalar_one_or_none()
+    if task is None:
+        return None
+    for field, value in values.items():
+        setattr(task, field, value)
+    await session.commit()
+    await session.refresh(task)
+    return task
+
+
+async def legacy_delete(session: AsyncSession, task_id: uuid.UUID) -> bool:
+    """BaseRepository.delete as it was: SELECT, then DELETE and COMMIT"""
+    task = (await session.execute(select(Task).where(Task.id == task_id))).scalar_one_or_none()
+    if task is None:
+        return False
+    await session.delete(task)
+    await session.commit()
+    return True
+
+
+def summarize(name: str, latencies: list[float], statements: int) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{name:<16} {statistics.median(latencies) * 1000:>9.3f} {p95 * 1000:>9.3f} "
+        f"{statements / len(latencies):>11.1f}"
+    )
+
+
+async def run(args):
+    engine = create_async_engine(args.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    async with session_factory() as session:
+        user = User(name="Write Bench", email=f"write-bench-{uuid.uuid4().hex[:8]}@example.com")
+        session.add(user)
+        await session.commit()
+        repository = TaskRepository(session, cache=NullCache())
+        rows = [
+            {"id": uuid.uuid4(), "title": f"Write {i}", "due_date": datetime(2030, 1, 1), "user_id": user.id}
+            for i in range(args.tasks)
+        ]
+        task_ids = [task.id for task in await repository.create_many(rows)]
+        half = len(task_ids) // 2
+
+        async def measure(fn, ids) -> tuple[list[float], int]:
+            nonlocal statements
+            latencies = []
+            statements = 0
+            for task_id in ids:
+                start = time.perf_counter()
+                await fn(task_id)
+                latencies.append(time.perf_counter() - start)
+                session.expunge_all()
+            return latencies, statements
+
+        print(f"{'operation':<16} {'p50 ms':>9} {'p95 ms':>9} {'statements':>11}")
+        values = {"status": TaskStatus.IN_PROGRESS, "title": "Updated"}
+        for name, fn in (
+            ("update (before)", lambda task_id: legacy_update(session, task_id, values)),
+            ("update (after)", lambda task_id: repository.update(task_id, values)),
+        ):
+            summarize(name, *await measure(fn, task_ids))
+        for name, fn, ids in (
+            ("delete (before)", lambda task_id: legacy_delete(session, task_id), task_ids[:half]),
+            ("delete (after)", repository.delete, task_ids[half:]),
+        ):
+            summarize(name, *await measure(fn, ids))
+
+        await session.execute(delete(Task).where(Task.user_id == user.id))
+        await session.execute(delete(User).where(User.id == user.id))
+        await session.commit()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--tasks", type=int, default=2000, help="scratch tasks to update and delete")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the reminder queries of GET /api/tasks/ (overdue=true, due-soon ranges) with and without the
+ix_tasks_open_due_date_id partial index.
+
+Seeds the target database up to --tasks rows (reusing task_list_indexes.py's seeding), then marks --done-share
+of the tasks due more than a week ago as DONE, the shape of a table whose history is mostly finished work.
+Each query's plan shape, buffers touched and median latency are printed with the partial index dropped
+("before") and created ("after"). Statuses are rewritten, so point this at a dedicated benchmark database:
+
+    python scripts/benchmarks/task_due_filters.py --database-url postgresql+asyncpg://postgres@localhost/bench_taskdb
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from task_list_indexes import measure, seed
+
+from eventual_backend.core.database import Base
+from eventual_backend.models.task import Task, TaskStatus
+from eventual_backend.repositories.task_repository import TaskRepository
+
+PARTIAL_INDEX = next(index for index in Task.__table__.indexes if index.name == "ix_tasks_open_due_date_id")
+
+FINISH_HISTORY = """
+UPDATE tasks SET status = 'DONE'
+WHERE status <> 'DONE' AND due_date < timezone('UTC', now()) - interval '7 days' AND random() < :share
+"""
+
+
+def queries(user_id) -> dict:
+    now = datetime.utcnow()
+    return {
+        "overdue": {"overdue": True},
+        "overdue, newest first": {"overdue": True, "order_by": "due_date_desc"},
+        "overdue, one user": {"overdue": True, "user_id": user_id},
+        "overdue, pending": {"overdue": True, "status": TaskStatus.PENDING},
+        "due in the next day": {"due_after": now, "due_before": now + timedelta(days=1)},
+        "due in the next week, pending": {
+            "due_after": now,
+            "due_before": now + timedelta(days=7),
+            "status": TaskStatus.PENDING,
+        },
+    }
+
+
+async def run(args):
+    engine = create_async_engine(args.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        await seed(session, args.tasks, args.users)
+        finished = await session.execute(text(FINISH_HISTORY), {"share": args.done_share})
+        await session.commit()
+        print(f"Marked {finished.rowcount:,} past tasks as done")
+        user_id = await session.scalar(text("SELECT user_id FROM tasks LIMIT 1"))
+
+    results = {}
+    for phase in ("before", "after"):
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            if phase == "before":
+                await conn.execute(text(f"DROP INDEX IF EXISTS {PARTIAL_INDEX.name}"))
+            else:
+                await conn.run_sync(lambda sync_conn: PARTIAL_INDEX.create(sync_conn, checkfirst=True))
+            await conn.execute(text("VACUUM ANALYZE tasks"))
+
+        async with session_factory() as session:
+            repository = TaskRepository(session)
+            for name, filters in queries(user_id).items():
+                statement = repository.build_filter_query(limit=args.limit, **filters)
+                results.setdefault(name, {})[phase] = await measure(session, statement, args.runs)
+    await engine.dispose()
+
+    print(f"{'query':<30} {'phase':<7} {'buffers':>8} {'median ms':>10}  plan")
+    for name, phases in results.items():
+        for phase, result in phases.items():
+            print(
+                f"{name:<30} {phase:<7} {result['shared_buffers_read']:>8} {result['median_ms']:>10.2f}  "
+                f"{result['plan']}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--done-share", type=float, default=0.98, help="share of old tasks to mark done")
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--runs", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark TaskRepository.get_with_filters with and without the composite task indexes.
+
+Seeds the target database up to --tasks rows, then for every status/user_id/order_by combination
+prints the EXPLAIN plan shape and median latency with the indexes dropped ("before") and recreated
+("after"). The indexes are dropped and rebuilt, so point this at a dedicated benchmark database:
+
+    python scripts/benchmarks/task_list_indexes.py --database-url postgresql+asyncpg://postgres@localhost/bench_taskdb
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from itertools import product
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from eventual_backend.core.config import settings
+from eventual_backend.core.database import Base
+from eventual_backend.models.task import Task, TaskStatus
+from eventual_backend.models.user import User
+from eventual_backend.repositories.task_repository import TaskRepository
+
+INDEXES = [index for index in Task.__table__.indexes if index.name.startswith("ix_tasks_")]
+
+
+async def seed(session: AsyncSession, n_tasks: int, n_users: int) -> None:
+    existing = await session.scalar(select(func.count()).select_from(Task))
+    if existing >= n_tasks:
+        print(f"Using existing {existing:,} tasks")
+        return
+
+    print(f"Seeding {n_tasks - existing:,} tasks across {n_users:,} users...")
+    users = await session.scalar(select(func.count()).select_from(User))
+    if users < n_users:
+        await session.execute(
+            text(
+                "INSERT INTO users (id, name, email) "
+                "SELECT gen_random_uuid(), 'Bench User ' || i, 'bench-' || gen_random_uuid() || '@example.com' "
+                "FROM generate_series(1, :n) AS i"
+            ),
+            {"n": n_users - users},
+        )
+    await session.execute(
+        text(
+            "WITH u AS (SELECT array_agg(id) AS ids FROM users) "
+            "INSERT INTO tasks (id, title, status, due_date, user_id) "
+            "SELECT gen_random_uuid(), 'Bench task ' || i, "
+            "(ARRAY['PENDING', 'IN_PROGRESS', 'DONE']::taskstatus[])[1 + (i % 3)], "
+            "now() - interval '365 days' + (random() * interval '730 days'), "
+            "u.ids[1 + (i % array_length(u.ids, 1))] "
+            "FROM generate_series(1, :n) AS i, u"
+        ),
+        {"n": n_tasks - existing},
+    )
+    await session.commit()
+
+
+def plan_shape(node: dict) -> str:
+    """Condense an EXPLAIN JSON plan into e.g. 'Limit > Index Scan(ix_tasks_status_due_date_id)'"""
+    label = node["Node Type"]
+    if "Index Name" in node:
+        label += f"({node['Index Name']})"
+    children = node.get("Plans", [])
+    return label if not children else f"{label} > {plan_shape(children[0])}"
+
+
+async def measure(session: AsyncSession, statement, runs: int) -> dict:
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    explain = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"))
+    plan = explain.scalar()[0]
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await session.execute(statement)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "plan": plan_shape(plan["Plan"]),
+        "shared_buffers_read": plan["Plan"].get("Shared Read Blocks", 0) + plan["Plan"].get("Shared Hit Blocks", 0),
+        "median_ms": round(statistics.median(timings), 3),
+    }
+
+
+async def run(args) -> dict:
+    engine = create_async_engine(args.database_url, echo=False)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with Session() as session:
+        await seed(session, args.tasks, args.users)
+        user_id = await session.scalar(select(Task.user_id).limit(1))
+
+    combos = list(product([None, TaskStatus.PENDING], [None, user_id], ["due_date_asc", "due_date_desc"]))
+    results = {}
+    for phase in ("before", "after"):
+        async with engine.begin() as conn:
+            for index in INDEXES:
+                if phase == "before":
+                    await conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+                else:
+                    await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
+            await conn.execute(text("ANALYZE tasks"))
+
+        async with Session() as session:
+            repository = TaskRepository(session)
+            for status, uid, order_by in combos:
+                key = f"status={status.value if status else '-'} user_id={'set' if uid else '-'} {order_by}"
+                statement = repository.build_filter_query(status=status, user_id=uid, order_by=order_by, limit=100)
+                results.setdefault(key, {})[phase] = await measure(session, statement, args.runs)
+
+    await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--runs", type=int, default=5, help="timed executions per query")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    for key, phases in results.items():
+        print(key)
+        for phase, result in phases.items():
+            print(f"  {phase:<6} {result['median_ms']:>10.3f} ms  {result['plan']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
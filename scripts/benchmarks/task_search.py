@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark title search: the full-text GIN index behind GET /api/tasks/search versus the ILIKE scan it replaces.
+
+Seeds the target database up to --tasks rows (reusing task_list_indexes.py's seeding), gives every task a
+varied three-to-five word title drawn from a fixed vocabulary, adds the title_search column and index from
+migration 0004 if missing, then prints the plan shape, match count and median latency of each query with
+ILIKE ("before") and with TaskRepository.build_search_query ("after"). Titles are rewritten, so point this
+at a dedicated benchmark database:
+
+    python scripts/benchmarks/task_search.py --database-url postgresql+asyncpg://postgres@localhost/bench_taskdb
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import and_, desc, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from task_list_indexes import plan_shape, seed
+
+from eventual_backend.core.database import Base
+from eventual_backend.models.task import Task, TaskStatus
+from eventual_backend.repositories.task_repository import RESPONSE_COLUMNS, TaskRepository, search_terms
+
+VERBS = ["deploy", "review", "write", "fix", "plan", "update", "test", "migrate", "document", "refactor"]
+NOUNS = (
+    "api billing dashboard database invoice login onboarding payment report search "
+    "service signup staging production runbook backup cache queue webhook release"
+).split()
+QUALIFIERS = ["for", "before", "after", "with", "in", "on"]
+TEAMS = ["mobile", "platform", "growth", "infra", "support", "finance", "security", "design"]
+
+# Each word is drawn independently and uniformly, so a noun matches ~5% of rows and two nouns ~0.25%
+RETITLE = """
+WITH words AS (
+    SELECT CAST(:verbs AS text[]) AS verbs, CAST(:nouns AS text[]) AS nouns,
+           CAST(:qualifiers AS text[]) AS qualifiers, CAST(:teams AS text[]) AS teams
+)
+UPDATE tasks SET title = initcap(
+    verbs[1 + floor(random() * cardinality(verbs))::int] || ' ' || nouns[1 + floor(random() * cardinality(nouns))::int]
+    || ' ' || qualifiers[1 + floor(random() * cardinality(qualifiers))::int]
+    || ' ' || teams[1 + floor(random() * cardinality(teams))::int]
+    || CASE WHEN random() < 0.5 THEN ' ' || nouns[1 + floor(random() * cardinality(nouns))::int] ELSE '' END
+)
+FROM words
+"""
+
+SEARCH_SCHEMA = [
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS title_search tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', title)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_title_search ON tasks USING gin (title_search)",
+]
+
+QUERIES = [
+    # name, q, filters
+    ("one word", "billing", {}),
+    ("one word, by date", "billing", {"order_by": "due_date_desc"}),
+    ("two words", "billing production", {}),
+    ("prefix", "webh", {}),
+    ("word + prefix", "deploy stag", {}),
+    ("rare combination", "migrate webhook security", {}),
+    ("rare, by date", "migrate webhook security", {"order_by": "due_date_desc"}),
+    ("word + status", "invoice", {"status": TaskStatus.DONE}),
+    ("word + user", "invoice", {"user_id": None}),  # filled with a real user id
+]
+
+
+async def prepare(session: AsyncSession, n_tasks: int, n_users: int) -> None:
+    await seed(session, n_tasks, n_users)
+    if await session.scalar(select(func.count()).select_from(Task).where(Task.title.like("Bench task %"))):
+        print("Giving tasks varied titles...")
+        await session.execute(
+            text(RETITLE),
+            {"verbs": VERBS, "nouns": NOUNS, "qualifiers": QUALIFIERS, "teams": TEAMS},
+        )
+        await session.commit()
+    for statement in SEARCH_SCHEMA:
+        await session.execute(text(statement))
+    await session.commit()
+
+
+def ilike_query(q: str, status=None, user_id=None, order_by=None, limit: int = 100):
+    """What searching looks like without the index: every word as a substring, newest due date first"""
+    conditions = [Task.title.ilike(f"%{term}%") for term in search_terms(q)]
+    if status:
+        conditions.append(Task.status == status)
+    if user_id:
+        conditions.append(Task.user_id == user_id)
+    return select(*RESPONSE_COLUMNS).where(and_(*conditions)).order_by(desc(Task.due_date)).limit(limit)
+
+
+async def measure(session: AsyncSession, statement, runs: int) -> tuple[str, int, float]:
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    plan = (await session.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))).scalar()[0]
+    count_sql = f"SELECT count(*) FROM ({sql.rsplit(' LIMIT ', 1)[0]}) AS matches"
+    matches = await session.scalar(text(count_sql))
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await session.execute(statement)
+        timings.append(time.perf_counter() - start)
+    return plan_shape(plan["Plan"]), matches, statistics.median(timings) * 1000
+
+
+async def run(args):
+    engine = create_async_engine(args.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        await prepare(session, args.tasks, args.users)
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE tasks"))
+        repository = TaskRepository(session)
+        user_id = await session.scalar(select(Task.user_id).limit(1))
+
+        print(f"{'query':<20} {'variant':<7} {'matches':>8} {'median ms':>10}  plan")
+        for name, q, filters in QUERIES:
+            filters = {key: value if value is not None else user_id for key, value in filters.items()}
+            for variant, statement in (
+                ("before", ilike_query(q, limit=args.limit, **filters)),
+                ("after", repository.build_search_query(q, limit=args.limit, **filters)),
+            ):
+                shape, matches, median = await measure(session, statement, args.runs)
+                print(f"{name:<20} {variant:<7} {matches:>8} {median:>10.2f}  {shape}")
+
+        # Second page through the cursor: the keyset condition on (rank, id) instead of an OFFSET
+        first = (await session.execute(repository.build_search_query("billing", limit=args.limit))).all()
+        after = (first[-1].rank, first[-1].id) if first else (0.0, uuid.uuid4())
+        shape, matches, median = await measure(
+            session, repository.build_search_query("billing", limit=args.limit, after=after), args.runs
+        )
+        print(f"{'page 2 (cursor)':<20} {'after':<7} {matches:>8} {median:>10.2f}  {shape}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--runs", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
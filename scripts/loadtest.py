@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Load-test every users and tasks endpoint and report throughput and latency percentiles per endpoint as JSON.
+
+The run seeds its own users and tasks (via POST /api/users/ and POST /api/tasks/bulk), then keeps --concurrency
+async workers issuing requests drawn from a weighted mix until --duration seconds or --requests have elapsed:
+
+  read-heavy   - mostly lists, lookups by id, per-user lists and the summary, with a trickle of writes
+  write-heavy  - mostly task creates, updates and deletes, plus user writes and bulk creates
+  retry-storm  - clients retrying POST /api/tasks/ and /bulk with a small pool of shared idempotency keys,
+                 i.e. many concurrent requests racing to create the same tasks
+
+Deletes only target rows created during the run, so the seeded dataset stays intact for the readers.
+
+    python scripts/loadtest.py --mix read-heavy --concurrency 50 --duration 30 --output read-heavy.json
+    python scripts/loadtest.py --in-process --mix retry-storm --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+# Weight of each LoadTest operation, by method name; the report labels requests by method and route template
+# ("GET /api/tasks/{task_id}"), the template being the route label of GET /metrics
+MIXES = {
+    "read-heavy": {
+        "list_tasks": 25,
+        "get_task": 20,
+        "user_tasks": 12,
+        "task_summary": 5,
+        "list_users": 8,
+        "get_user": 10,
+        "export_tasks": 1,
+        "search_tasks": 6,
+        "batch_get_tasks": 4,
+        "task_events": 3,
+        "batch_get_users": 2,
+        "users_stats": 1,
+        "user_stats": 3,
+        "create_task": 8,
+        "update_task": 5,
+        "delete_task": 2,
+        "create_user": 2,
+        "update_user": 1,
+        "delete_user": 1,
+    },
+    "write-heavy": {
+        "create_task": 30,
+        "update_task": 20,
+        "delete_task": 10,
+        "bulk_create_tasks": 4,
+        "create_user": 6,
+        "update_user": 5,
+        "delete_user": 3,
+        "list_tasks": 8,
+        "get_task": 8,
+        "user_tasks": 3,
+        "task_summary": 2,
+        "task_events": 2,
+        "list_users": 1,
+    },
+    "retry-storm": {
+        "retry_create_task": 60,
+        "retry_bulk_create_tasks": 5,
+        "get_task": 15,
+        "list_tasks": 10,
+        "task_summary": 5,
+        "create_task": 5,
+    },
+}
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.random = random.Random(args.random_seed)
+        self.user_ids: list[str] = []
+        self.task_ids: list[str] = []
+        # Rows created during the run; deletes pop from these so the seeded data is never removed
+        self.created_user_ids: list[str] = []
+        self.created_task_ids: list[str] = []
+        self.retry_keys = [f"loadtest-retry-{uuid.uuid4().hex[:8]}-{i}" for i in range(args.retry_keys)]
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def task_payload(self, user_id: str | None = None, idempotency_key: str | None = None) -> dict:
+        due = datetime.now(timezone.utc) + timedelta(hours=self.random.randint(-240, 720))
+        payload = {
+            "title": f"Load task {uuid.uuid4().hex[:8]}",
+            "status": self.random.choice(["pending", "in_progress", "done"]),
+            "due_date": due.isoformat(),
+            "user_id": user_id or self.random.choice(self.user_ids),
+        }
+        if idempotency_key:
+            payload["idempotency_key"] = idempotency_key
+        return payload
+
+    def user_payload(self) -> dict:
+        suffix = uuid.uuid4().hex[:12]
+        return {"name": f"Load User {suffix}", "email": f"load-{suffix}@example.com", "phone_number": "+15550000000"}
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            return None
+        self.samples[endpoint].append(time.perf_counter() - start)
+        self.statuses[endpoint][response.status_code] += 1
+        if response.status_code >= 500:
+            self.errors[endpoint] += 1
+        return response
+
+    async def seed(self) -> None:
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def create_user():
+            async with semaphore:
+                response = await self.client.post("/api/users/", json=self.user_payload())
+                response.raise_for_status()
+                self.user_ids.append(response.json()["id"])
+
+        await asyncio.gather(*(create_user() for _ in range(self.args.users)))
+
+        tasks = [self.task_payload(user_id) for user_id in self.user_ids for _ in range(self.args.tasks_per_user)]
+
+        async def create_batch(batch):
+            async with semaphore:
+                response = await self.client.post("/api/tasks/bulk", json={"tasks": batch}, timeout=120)
+                response.raise_for_status()
+                self.task_ids.extend(result["task"]["id"] for result in response.json()["results"])
+
+        batches = [tasks[i : i + self.args.seed_batch_size] for i in range(0, len(tasks), self.args.seed_batch_size)]
+        await asyncio.gather(*(create_batch(batch) for batch in batches))
+
+    # Operations: one per mix entry, each issuing exactly one timed request
+
+    async def list_tasks(self):
+        params = {"limit": self.random.choice([20, 100])}
+        roll = self.random.random()
+        if roll < 0.3:
+            params["status"] = self.random.choice(["pending", "in_progress", "done"])
+        elif roll < 0.6:
+            params["user_id"] = self.random.choice(self.user_ids)
+        if self.random.random() < 0.5:
+            params["order_by"] = "due_date_desc"
+        await self.request("GET /api/tasks/", "GET", "/api/tasks/", params=params)
+
+    async def get_task(self):
+        task_id = self.random.choice(self.task_ids)
+        await self.request("GET /api/tasks/{task_id}", "GET", f"/api/tasks/{task_id}")
+
+    async def user_tasks(self):
+        user_id = self.random.choice(self.user_ids)
+        await self.request("GET /api/tasks/user/{user_id}", "GET", f"/api/tasks/user/{user_id}", params={"limit": 50})
+
+    async def task_summary(self):
+        await self.request("GET /api/tasks/summary/", "GET", "/api/tasks/summary/")
+
+    async def export_tasks(self):
+        params = {"user_id": self.random.choice(self.user_ids), "format": self.random.choice(["ndjson", "csv"])}
+        await self.request("GET /api/tasks/export", "GET", "/api/tasks/export", params=params)
+
+    async def search_tasks(self):
+        params = {"q": self.random.choice(["load", "load task", "task"]), "limit": 20}
+        if self.random.random() < 0.2:
+            params["order_by"] = "due_date_asc"
+        await self.request("GET /api/tasks/search", "GET", "/api/tasks/search", params=params)
+
+    async def batch_get_tasks(self):
+        ids = self.random.sample(self.task_ids, min(len(self.task_ids), 20))
+        await self.request("GET /api/tasks/batch", "GET", "/api/tasks/batch", params={"ids": ids})
+
+    async def task_events(self):
+        task_id = self.random.choice(self.task_ids)
+        await self.request("GET /api/tasks/{task_id}/events", "GET", f"/api/tasks/{task_id}/events")
+
+    async def create_task(self):
+        response = await self.request("POST /api/tasks/", "POST", "/api/tasks/", json=self.task_payload())
+        if response is not None and response.status_code == 201:
+            self.created_task_ids.append(response.json()["id"])
+
+    async def bulk_create_tasks(self):
+        batch = [self.task_payload() for _ in range(self.args.bulk_size)]
+        response = await self.request("POST /api/tasks/bulk", "POST", "/api/tasks/bulk", json={"tasks": batch})
+        if response is not None and response.status_code == 200:
+            self.created_task_ids.extend(result["task"]["id"] for result in response.json()["results"])
+
+    async def retry_create_task(self):
+        payload = self.task_payload(self.user_ids[0], idempotency_key=self.random.choice(self.retry_keys))
+        await self.request("POST /api/tasks/", "POST", "/api/tasks/", json=payload)
+
+    async def retry_bulk_create_tasks(self):
+        keys = self.random.sample(self.retry_keys, min(len(self.retry_keys), self.args.bulk_size))
+        batch = [self.task_payload(self.user_ids[0], idempotency_key=key) for key in keys]
+        await self.request("POST /api/tasks/bulk", "POST", "/api/tasks/bulk", json={"tasks": batch})
+
+    async def update_task(self):
+        task_id = self.random.choice(self.task_ids)
+        payload = {"status": self.random.choice(["pending", "in_progress", "done"]), "title": "Updated by loadtest"}
+        await self.request("PUT /api/tasks/{task_id}", "PUT", f"/api/tasks/{task_id}", json=payload)
+
+    async def delete_task(self):
+        if not self.created_task_ids:
+            return await self.create_task()
+        task_id = self.created_task_ids.pop()
+        await self.request("DELETE /api/tasks/{task_id}", "DELETE", f"/api/tasks/{task_id}")
+
+    async def list_users(self):
+        await self.request("GET /api/users/", "GET", "/api/users/", params={"limit": self.random.choice([20, 100])})
+
+    async def get_user(self):
+        user_id = self.random.choice(self.user_ids)
+        await self.request("GET /api/users/{user_id}", "GET", f"/api/users/{user_id}")
+
+    async def batch_get_users(self):
+        ids = self.random.sample(self.user_ids, min(len(self.user_ids), 20))
+        await self.request("GET /api/users/batch", "GET", "/api/users/batch", params={"ids": ids})
+
+    async def users_stats(self):
+        await self.request("GET /api/users/stats", "GET", "/api/users/stats")
+
+    async def user_stats(self):
+        user_id = self.random.choice(self.user_ids)
+        await self.request("GET /api/users/{user_id}/stats", "GET", f"/api/users/{user_id}/stats")
+
+    async def create_user(self):
+        response = await self.request("POST /api/users/", "POST", "/api/users/", json=self.user_payload())
+        if response is not None and response.status_code == 201:
+            self.created_user_ids.append(response.json()["id"])
+
+    async def update_user(self):
+        if not self.created_user_ids:
+            return await self.create_user()
+        user_id = self.random.choice(self.created_user_ids)
+        await self.request("PUT /api/users/{user_id}", "PUT", f"/api/users/{user_id}", json=self.user_payload())
+
+    async def delete_user(self):
+        if not self.created_user_ids:
+            return await self.create_user()
+        user_id = self.created_user_ids.pop()
+        await self.request("DELETE /api/users/{user_id}", "DELETE", f"/api/users/{user_id}")
+
+    async def run(self) -> float:
+        weights = MIXES[self.args.mix]
+        operations = [getattr(self, name) for name in weights]
+        deadline = time.perf_counter() + self.args.duration
+        remaining = self.args.requests
+
+        async def worker():
+            nonlocal remaining
+            while time.perf_counter() < deadline:
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                await self.random.choices(operations, weights=list(weights.values()))[0]()
+                # In-process, a request shed by admission control completes without suspending; yield so one
+                # worker cannot spin through 503s while the admitted requests starve
+                await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint in sorted(self.samples.keys() | self.errors.keys()):
+            latencies = sorted(self.samples[endpoint])
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "errors": self.errors[endpoint],
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+                "status_codes": {str(code): count for code, count in sorted(self.statuses[endpoint].items())},
+            }
+        total = sum(len(latencies) for latencies in self.samples.values())
+        everything = sorted(latency for latencies in self.samples.values() for latency in latencies)
+        return {
+            "mix": self.args.mix,
+            "concurrency": self.args.concurrency,
+            "dataset": {"users": len(self.user_ids), "tasks": len(self.task_ids)},
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / elapsed, 2),
+            "p50_ms": round(percentile(everything, 50) * 1000, 2),
+            "p95_ms": round(percentile(everything, 95) * 1000, 2),
+            "p99_ms": round(percentile(everything, 99) * 1000, 2),
+            "endpoints": endpoints,
+        }
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.in_process:
+        from eventual_backend.main import app, lifespan
+
+        async with lifespan(app):
+            # Report unhandled errors as 500s, like a real server, instead of raising them into the worker
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=args.timeout) as client:
+                return await drive(client, args)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        return await drive(client, args)
+
+
+async def drive(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    loadtest = LoadTest(client, args)
+    await loadtest.seed()
+    print(f"Seeded {len(loadtest.user_ids)} users and {len(loadtest.task_ids)} tasks", file=sys.stderr)
+    elapsed = await loadtest.run()
+    return loadtest.report(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="drive eventual_backend.main:app over ASGI")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="read-heavy")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent workers")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run (upper bound with --requests)")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--users", type=int, default=50, help="users to seed")
+    parser.add_argument("--tasks-per-user", type=int, default=100, help="tasks to seed per user")
+    parser.add_argument("--seed-batch-size", type=int, default=1000, help="tasks per bulk request while seeding")
+    parser.add_argument("--bulk-size", type=int, default=50, help="tasks per bulk request during the run")
+    parser.add_argument("--retry-keys", type=int, default=20, help="shared idempotency keys for retry-storm")
+    parser.add_argument("--random-seed", type=int, help="make the request sequence reproducible")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    content = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(content + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()